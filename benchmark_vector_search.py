@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Vector Search Benchmark for n8n AI Agent
+Salīdzina HNSW aptuveno meklēšanu ar precīzo (pilnās pārlases) meklēšanu:
+recall@k un vaicājuma latentums katrai `ef` vērtībai.
+
+Pēc noklusējuma lieto lokālā vektoru indeksa korpusu (`flask index-workflows
+--store local`); ja tas nav atrasts vai norādīts --synthetic, ģenerē
+sintētisku klasterētu korpusu.
+
+Piemērs:
+    python benchmark_vector_search.py --ef 16,32,64,128 --queries 200
+    python benchmark_vector_search.py --synthetic 50000 --dim 256
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.hnsw_index import DEFAULT_EF_CONSTRUCTION, DEFAULT_M, HNSWIndex
+from src.local_vector_index import DEFAULT_INDEX_PATH
+
+
+def load_corpus(path):
+    """Lokālā indeksa matrica (float32) vai None"""
+    try:
+        with open(os.path.join(path, "points.json"), "r", encoding="utf-8") as fh:
+            points = json.load(fh)
+    except FileNotFoundError:
+        return None
+    count, dim = len(points["ids"]), points["dimension"]
+    if count == 0:
+        return None
+    return np.array(np.memmap(os.path.join(path, "vectors.f32"), dtype=np.float32, mode="r", shape=(count, dim)))
+
+
+def synthetic_corpus(count, dim, seed):
+    """Klasterēti vektori — tuvāk reāliem embedding nekā vienmērīgs troksnis"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(count // 200, 8), dim))
+    labels = rng.integers(0, len(centers), count)
+    return (centers[labels] + 0.6 * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+def exact_top_k(normalized, queries, k):
+    scores = queries @ normalized.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall/latentuma salīdzinājums ar precīzo meklēšanu")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Lokālā vektoru indeksa mape")
+    parser.add_argument("--synthetic", type=int, default=0, help="Sintētiskā korpusa izmērs")
+    parser.add_argument("--dim", type=int, default=256, help="Sintētisko vektoru izmērs")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=DEFAULT_M)
+    parser.add_argument("--ef-construction", type=int, default=DEFAULT_EF_CONSTRUCTION)
+    parser.add_argument("--ef", default="16,32,64,128,256", help="Komatatdalītas ef vērtības")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = None if args.synthetic else load_corpus(args.index)
+    source = args.index
+    if corpus is None:
+        corpus = synthetic_corpus(args.synthetic or 20_000, args.dim, args.seed)
+        source = "sintētisks"
+    count, dim = corpus.shape
+    print(f"Korpuss: {source}, {count} vektori × {dim}")
+
+    rng = np.random.default_rng(args.seed + 1)
+    # Vaicājumi — korpusa vektori ar troksni (līdzīgi, bet ne identiski)
+    queries = corpus[rng.integers(0, count, args.queries)]
+    queries = queries + 0.1 * np.std(corpus) * rng.normal(size=queries.shape).astype(np.float32)
+    queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    normalized = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    k = min(args.k, count)
+
+    truth = exact_top_k(normalized, queries, k)
+    latencies = []
+    for query in queries:
+        t = time.perf_counter()
+        scores = normalized @ query
+        np.argpartition(-scores, k - 1)[:k]
+        latencies.append(time.perf_counter() - t)
+    print(f"Precīzā meklēšana: vid. {np.mean(latencies) * 1000:.2f} ms, p95 {percentile(latencies, 95):.2f} ms")
+
+    index = HNSWIndex(dim, M=args.m, ef_construction=args.ef_construction)
+    start = time.perf_counter()
+    for row, vector in enumerate(corpus):
+        index.add(row, vector)
+    build = time.perf_counter() - start
+    print(f"HNSW būvēšana (M={args.m}, ef_construction={args.ef_construction}): "
+          f"{build:.1f} s ({build / count * 1000:.2f} ms/vektors)")
+
+    print(f"\n{'ef':>6} {'recall@' + str(k):>10} {'vid. ms':>9} {'p95 ms':>9}")
+    for ef in (int(value) for value in args.ef.split(",")):
+        hits = 0
+        latencies = []
+        for query, expected in zip(queries, truth):
+            t = time.perf_counter()
+            found = index.search(query, k, ef=ef)
+            latencies.append(time.perf_counter() - t)
+            hits += len(expected & {label for label, _ in found})
+        recall = hits / (len(queries) * k)
+        print(f"{ef:>6} {recall:>10.4f} {np.mean(latencies) * 1000:>9.2f} {percentile(latencies, 95):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
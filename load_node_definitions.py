@@ -1,31 +1,36 @@
 import os
 import json
 
+from src.node_parsing import iter_json_files, parallel_parse
+
 NODE_DEFINITIONS_ROOT = "./database/n8n-node-definitions/nodes"
 
-def load_node_definitions():
-    node_map = {}
+def _parse_node_type(full_path):
+    """Darbinieks: atgriež (type, name, description, defaults) vai None"""
+    try:
+        with open(full_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        node_type = data.get("type")
+        if not node_type:
+            return None
+        return (node_type, data.get("name"), data.get("description", ""), data.get("defaults", {}))
+    except Exception as e:
+        print(f"Kļūda failā {os.path.basename(full_path)}: {e}")
+        return None
 
-    for root, dirs, files in os.walk(NODE_DEFINITIONS_ROOT):
-        for filename in files:
-            if filename.endswith(".json"):
-                full_path = os.path.join(root, filename)
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        node_type = data.get("type")
-                        node_name = data.get("name")
-                        description = data.get("description", "")
-                        defaults = data.get("defaults", {})
+def load_node_definitions(workers=None):
+    node_map = {}
 
-                        if node_type:
-                            node_map[node_type] = {
-                                "name": node_name,
-                                "description": description,
-                                "defaults": defaults
-                            }
-                except Exception as e:
-                    print(f"Kļūda failā {filename}: {e}")
+    rows = parallel_parse(iter_json_files(NODE_DEFINITIONS_ROOT), _parse_node_type, workers=workers)
+    for row in rows:
+        if row is None:
+            continue
+        node_type, node_name, description, defaults = row
+        node_map[node_type] = {
+            "name": node_name,
+            "description": description,
+            "defaults": defaults
+        }
 
     print(f"Atrastie mezgli: {len(node_map)}")
     return node_map
@@ -34,4 +39,3 @@ if __name__ == "__main__":
     nodes = load_node_definitions()
     for key, val in list(nodes.items())[:10]:
         print(f"{key}: {val['name']}")
-
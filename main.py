@@ -1,5 +1,6 @@
 import os
 import sys
+import click
 from dotenv import load_dotenv
 from flask import Flask, send_from_directory
 from flask_cors import CORS
@@ -25,11 +26,47 @@ def create_app():
     
     # Inicializē datubāzi (no extensions)
     from src.extensions import db
+    from src.node_configuration_database import NodeConfigurationDatabase
     db.init_app(app)
     
     with app.app_context():
         db.create_all()
+        # Mezglu katalogs atmiņā — validācija un saraksti vairs neiet uz SQLite
+        NodeConfigurationDatabase().load_catalog()
     
+    @app.cli.command("build-catalog")
+    @click.argument("path", required=False)
+    def build_catalog(path):
+        """Saglabā mezglu katalogu binārā mmap failā darbinieku ātram startam"""
+        from src.node_configuration_database import DEFAULT_SNAPSHOT_PATH
+        path = path or DEFAULT_SNAPSHOT_PATH
+        size = NodeConfigurationDatabase().build_snapshot(path)
+        click.echo(f"Katalogs saglabāts: {path} ({size} baiti)")
+
+    @app.cli.command("index-workflows")
+    @click.argument("folder")
+    @click.option("--chunk-size", default=1000, show_default=True, help="Workflow skaits vienā porcijā")
+    @click.option("--concurrency", default=4, show_default=True, help="Vienlaicīgi embedding pieprasījumi")
+    @click.option("--store", type=click.Choice(["qdrant", "local"]), default=None,
+                  help="Vektoru krātuve (noklusējumā VECTOR_STORE)")
+    def index_workflows_command(folder, chunk_size, concurrency, store):
+        """Vektorizē visus workflow JSON failus mapē un ieraksta tos Qdrant"""
+        from src.embedding_backends import create_embedding_backend, create_openai_client
+        from src.embedding_cache import EmbeddingCache
+        from src.lexical_index import LexicalIndex
+        from src.local_vector_index import create_workflow_index
+        from src.vector_database_design import WorkflowVectorizer, index_workflows, iter_workflow_files
+        openai_client = create_openai_client()
+        backend = create_embedding_backend(openai_client)
+        vectorizer = WorkflowVectorizer(openai_client, cache=EmbeddingCache(), max_concurrency=concurrency,
+                                        backend=backend)
+        vector_db = create_workflow_index(vector_size=backend.dimension, store=store)
+        lexical_index = LexicalIndex()
+        lexical_index.load()
+        stats = index_workflows(iter_workflow_files(folder), vectorizer, vector_db, chunk_size=chunk_size,
+                                lexical_index=lexical_index)
+        click.echo(f"Indeksēti: {stats['indexed']}, neizdevās: {stats['failed']}")
+
     # Importē blueprintus PĒCĀK - kad db jau ir inicializēts
     from src.routes.user import user_bp
     from src.routes.workflow import workflow_bp
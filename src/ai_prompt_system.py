@@ -288,6 +288,12 @@ class WorkflowGenerator:
             if not validation_result["valid"]:
                 return self._fix_workflow_errors(result, validation_result["errors"])
             
+            # Viens lietojuma notikums par katru veiksmīgi ģenerētu workflow (autokompletei)
+            try:
+                self.node_db.record_usage(node["type"] for node in result["workflow"]["nodes"] if "type" in node)
+            except Exception as e:
+                print(f"Kļūda saglabājot mezglu lietojumu: {e}")
+            
             # Saglabā vēsturē
             self.generation_history.append({
                 "context": context,
@@ -376,9 +382,8 @@ class WorkflowGenerator:
         }
     
     def _is_valid_node_type(self, node_type: str) -> bool:
-        """Pārbauda, vai mezgla tips ir derīgs"""
-        config = self.node_db.get_node_configuration(node_type)
-        return config is not None
+        """Pārbauda, vai mezgla tips ir derīgs (atmiņas katalogā, bez SQL)"""
+        return node_type in self.node_db.catalog
     
     def _fix_workflow_errors(self, result: Dict[str, Any], errors: List[str]) -> Dict[str, Any]:
         """Mēģina labot workflow kļūdas"""
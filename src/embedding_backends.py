@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Embedding Backends for n8n Workflow AI Agent
+Šis modulis definē embedding ģeneratoru saskarni un divas realizācijas:
+OpenAI API un lokālu, deterministisku "hashing trick" modeli, kas strādā bez
+tīkla. Dažādu backend vektori nav savstarpēji salīdzināmi — pēc backend
+maiņas workflow kolekcija jāindeksē no jauna.
+"""
+
+import abc
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import openai
+
+# Kuru backend lietot pēc noklusējuma: "openai" vai "local"
+DEFAULT_BACKEND = os.environ.get("EMBEDDING_BACKEND", "")
+
+
+class EmbeddingError(RuntimeError):
+    """Embedding neizdevās ģenerēt (API kļūda, tīkla kļūda u.c.).
+
+    `embedded` satur {teksts: vektors} tiem tekstiem, kas tomēr izdevās
+    (daļējas kļūmes gadījumā, kad neizdevās tikai dažas paketes).
+    """
+
+    def __init__(self, message: str, embedded: Optional[Dict[str, List[float]]] = None):
+        super().__init__(message)
+        self.embedded = embedded or {}
+
+
+class EmbeddingBackend(abc.ABC):
+    """Embedding ģeneratora saskarne.
+
+    `name` tiek izmantots keša atslēgā, tāpēc tam jāmainās līdz ar modeli vai
+    tā parametriem. `max_batch_size`/`max_batch_tokens` nosaka, kā
+    WorkflowVectorizer dala tekstus pieprasījumos.
+    """
+
+    name: str = ""
+    dimension: int = 0
+    max_batch_size: int = 512
+    max_batch_tokens: int = 100_000
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Atgriež pa vienam vektoram katram tekstam; kļūdas gadījumā ceļ EmbeddingError"""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embedding API (noklusējumā text-embedding-ada-002, 1536 dimensijas)"""
+
+    # API pieļauj līdz 2048 ievadēm vienā pieprasījumā
+    max_batch_size = 512
+    max_batch_tokens = 100_000
+
+    def __init__(self, openai_client: openai.OpenAI, model: str = "text-embedding-ada-002",
+                 dimension: int = 1536):
+        self.openai_client = openai_client
+        self.name = model
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        try:
+            response = self.openai_client.embeddings.create(
+                model=self.name,
+                input=texts
+            )
+        except Exception as e:
+            raise EmbeddingError(f"OpenAI embedding kļūda: {e}") from e
+        return [item.embedding for item in response.data]
+
+
+# camelCase robežas ("telegramTrigger" → "telegram Trigger")
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(_CAMEL_BOUNDARY.sub(" ", text).lower())
+
+
+def _features(text: str) -> Counter:
+    """Vārdi, vārdu pāri un vārdu rakstzīmju trigrammas (locījumiem un drukas kļūdām)"""
+    tokens = _tokens(text)
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    for token in tokens:
+        padded = f"#{token}#"
+        if len(padded) > 4:
+            features.update(f"#3{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """Lokāls embedding: parakstīts "hashing trick" ar sublineāru TF un L2 normu.
+
+    Nav jātrenē un nav stāvokļa — tas pats teksts vienmēr dod to pašu vektoru
+    jebkurā procesā. Tukšam tekstam vektors ir nulles vektors.
+    """
+
+    max_batch_size = 256
+    max_batch_tokens = 1_000_000
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+        self.name = f"local-hashing-v1-{dimension}"
+        self._slot = lru_cache(maxsize=65536)(self._hash_feature)
+
+    def _hash_feature(self, feature: str) -> Tuple[int, float]:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return value % self.dimension, (1.0 if value >> 63 else -1.0)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        features = _features(text)
+        if not features:
+            return np.zeros(self.dimension, dtype=np.float32)
+        slots = [self._slot(feature) for feature in features]
+        indices = np.fromiter((index for index, _ in slots), dtype=np.int64, count=len(slots))
+        weights = np.fromiter(
+            (sign * (1.0 + math.log(count)) for (_, sign), count in zip(slots, features.values())),
+            dtype=np.float64,
+            count=len(slots),
+        )
+        vector = np.bincount(indices, weights=weights, minlength=self.dimension)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text).tolist() for text in texts]
+
+
+def create_openai_client() -> Optional[openai.OpenAI]:
+    """OpenAI klients, ja ir OPENAI_API_KEY; citādi None (bezsaistes režīms ar lokālo backend)"""
+    if not os.environ.get("OPENAI_API_KEY"):
+        return None
+    return openai.OpenAI()
+
+
+def create_embedding_backend(openai_client: Optional[openai.OpenAI] = None,
+                             backend: Optional[str] = None) -> EmbeddingBackend:
+    """Izveido backend pēc nosaukuma vai EMBEDDING_BACKEND vides mainīgā.
+
+    Ja nekas nav norādīts, lieto OpenAI, kad ir klients un OPENAI_API_KEY,
+    citādi — lokālo modeli.
+    """
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if not backend:
+        backend = "openai" if openai_client is not None and os.environ.get("OPENAI_API_KEY") else "local"
+
+    if backend == "openai":
+        if openai_client is None:
+            raise ValueError("OpenAI embedding backend prasa openai klientu")
+        return OpenAIEmbeddingBackend(openai_client)
+    if backend == "local":
+        return HashingEmbeddingBackend()
+    raise ValueError(f"Nezināms embedding backend: {backend}")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache for n8n Workflow AI Agent
+Šis modulis nodrošina satura adresētu embedding kešu: atmiņas LRU līmenis un
+SQLite diska līmenis ar izmēra ierobežojumu. Atslēga ir (modelis, normalizētā
+teksta hash), tāpēc tas pats teksts netiek sūtīts uz embedding API atkārtoti.
+Abi līmeņi glabā float32 vērtības, tāpēc trāpījums atgriež to pašu vektoru
+neatkarīgi no tā, kurā līmenī tas atrasts.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+# Noklusējuma diska kešs blakus aplikācijas datubāzei
+DEFAULT_CACHE_PATH = os.environ.get("EMBEDDING_CACHE_PATH", "database/embedding_cache.db")
+
+# last_used tiek atjaunināts ne biežāk kā reizi šajā intervālā (sekundes)
+_TOUCH_INTERVAL = 60.0
+
+
+def normalize_text(text: str) -> str:
+    """Normalizē tekstu kešošanai: Unicode NFC un saspiesta atstarpju secība"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model: str, text: str) -> str:
+    """Satura adrese: sha256 no modeļa un normalizētā teksta"""
+    payload = f"{model}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """Divu līmeņu embedding kešs (LRU atmiņā + SQLite uz diska)"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, memory_items: int = 2048,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+            self._conn.commit()
+            self._disk_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+
+    # — atmiņas līmenis —
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # — publiskā saskarne —
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Atgriež kešoto embedding vai None"""
+        return self.get_many(model, [text]).get(text)
+
+    def get_many(self, model: str, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Atgriež {teksts: embedding} tiem tekstiem, kas ir kešā"""
+        found: Dict[str, List[float]] = {}
+        pending: Dict[str, List[str]] = {}
+        with self._lock:
+            for text in texts:
+                key = cache_key(model, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = vector
+                else:
+                    pending.setdefault(key, []).append(text)
+
+            if pending and self._conn is not None:
+                keys = list(pending)
+                now = time.time()
+                touched = []
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, blob, last_used in rows:
+                        vector = array("f", blob).tolist()
+                        self._remember(key, vector)
+                        for text in pending.pop(key):
+                            found[text] = vector
+                        if now - last_used > _TOUCH_INTERVAL:
+                            touched.append((now, key))
+                if touched:
+                    self._conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", touched)
+                    self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += sum(len(texts) for texts in pending.values())
+        return found
+
+    def put(self, model: str, text: str, vector: List[float]) -> List[float]:
+        """Saglabā embedding abos līmeņos; atgriež saglabāto (float32) vektoru"""
+        return self.put_many(model, {text: vector})[text]
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> Dict[str, List[float]]:
+        """Saglabā vairākus embedding vienā transakcijā.
+
+        Atgriež {teksts: vektors} ar float32 noapaļotajām vērtībām — tieši to,
+        ko vēlāk atgriezīs `get_many` no jebkura līmeņa.
+        """
+        if not vectors:
+            return {}
+        now = time.time()
+        rows = []
+        stored: Dict[str, List[float]] = {}
+        with self._lock:
+            for text, vector in vectors.items():
+                key = cache_key(model, text)
+                packed = array("f", vector)
+                stored[text] = packed.tolist()
+                self._remember(key, stored[text])
+                rows.append((key, model, len(packed), packed.tobytes(), now))
+
+            if self._conn is not None:
+                existing = self._conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE key IN ({','.join('?' * len(rows))})",
+                    [row[0] for row in rows],
+                ).fetchone()[0]
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+                self._disk_bytes += sum(len(row[3]) for row in rows) - existing
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict()
+                self._conn.commit()
+        return stored
+
+    def _evict(self):
+        """Dzēš vecākos (pēc last_used) ierakstus, līdz diska kešs ir 90% no limita"""
+        target = int(self.max_disk_bytes * 0.9)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used"):
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+
+    def stats(self) -> Dict[str, int]:
+        """Keša statistika"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
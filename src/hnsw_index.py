@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+HNSW Index for n8n Workflow AI Agent
+Šis modulis implementē HNSW (Hierarchical Navigable Small World) grafu
+aptuvenai tuvāko kaimiņu meklēšanai ar kosinusa līdzību. Grafs ir tīrā
+Python/NumPy: kaimiņu saraksti ir Python saraksti, bet līdzības katram
+apskatītajam kaimiņu sarakstam tiek aprēķinātas ar vienu NumPy reizinājumu.
+
+Atbalsta pakāpeniskus ievietojumus, atjauninājumus (mezgls tiek pārvietots un
+tā kaimiņi pārsaistīti), dzēšanu (dzēstie mezgli paliek grafā navigācijai, bet
+netiek atgriezti) un saglabāšanu/ielādi vienā .npz failā.
+Grafs var glabāt savu vektoru kopiju vai lasīt vektorus no ārējas matricas
+(`vectors`), kur etiķetes ir rindu numuri — tad atmiņā ir tikai kaimiņu saraksti.
+Ievietošana un meklēšana notiek zem slēdzenes, tāpēc tās drīkst izsaukt no
+vairākiem pavedieniem.
+"""
+
+import heapq
+import json
+import math
+import os
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Noklusējuma parametri (M — kaimiņu skaits augšējos slāņos, 0. slānī 2*M)
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 100
+DEFAULT_EF_SEARCH = 64
+
+# Mezglu saraksts → normalizēti vektori (viena momentuzņēmuma robežās)
+VectorLookup = Callable[[List[int]], np.ndarray]
+
+
+class HNSWIndex:
+    """HNSW grafs ar kosinusa līdzību; etiķetes (labels) ir jebkuras JSON vērtības.
+
+    Ja norādīts *vectors*, tas atgriež (matrica, normas), un etiķetes ir
+    matricas rindu numuri: grafs vektorus lasa no turienes un savu kopiju
+    neglabā. Ievietojot rindai jau jābūt matricā.
+    """
+
+    def __init__(self, dim: int, M: int = DEFAULT_M, ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+                 ef_search: int = DEFAULT_EF_SEARCH, seed: int = 42,
+                 vectors: Optional[Callable[[], Tuple[np.ndarray, np.ndarray]]] = None):
+        self.dim = dim
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1.0 / math.log(max(M, 2))
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._source = vectors
+
+        # Normalizēti vektori, ietilpība aug divkārt (tikai bez ārējās matricas)
+        self._data = np.zeros((64 if vectors is None else 0, dim), dtype=np.float32)
+        self._count = 0
+        self._levels: List[int] = []
+        self._links: List[List[List[int]]] = []  # mezgls → slānis → kaimiņi
+        self._labels: List[Any] = []
+        self._deleted: List[bool] = []
+        self._node_by_label: Dict[Any, int] = {}
+        self._entry = -1
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        """Aktīvo (nedzēsto) ierakstu skaits"""
+        return len(self._node_by_label)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._node_by_label
+
+    @property
+    def deleted_count(self) -> int:
+        return self._count - len(self._node_by_label)
+
+    # — palīgfunkcijas —
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def _random_level(self) -> int:
+        return int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+
+    def _lookup(self) -> VectorLookup:
+        """Vektoru piekļuve mezgliem: sava kopija vai ārējās matricas rindas"""
+        if self._source is None:
+            return self._data.__getitem__
+        matrix, norms = self._source()
+        labels = self._labels
+
+        def lookup(nodes: List[int]) -> np.ndarray:
+            rows = [labels[node] for node in nodes]
+            return matrix[rows] / np.maximum(norms[rows], 1e-12)[:, None]
+        return lookup
+
+    def _search_layer(self, vectors: VectorLookup, query: np.ndarray, entry_points: List[int], ef: int,
+                      level: int) -> List[Tuple[float, int]]:
+        """Alkatīgā meklēšana vienā slānī; atgriež līdz *ef* (līdzība, mezgls) dilstošā secībā"""
+        links = self._links
+        heappush, heappop, heapreplace = heapq.heappush, heapq.heappop, heapq.heapreplace
+        visited = set(entry_points)
+        sims = (vectors(entry_points) @ query).tolist()
+        candidates = [(-sim, node) for sim, node in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = heapq.nlargest(ef, zip(sims, entry_points))
+        heapq.heapify(results)
+        full = len(results) >= ef
+        worst = results[0][0]
+
+        while candidates:
+            neg_sim, node = heappop(candidates)
+            if full and -neg_sim < worst:
+                break
+            neighbours = [n for n in links[node][level] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+            for sim, neighbour in zip((vectors(neighbours) @ query).tolist(), neighbours):
+                if not full:
+                    heappush(candidates, (-sim, neighbour))
+                    heappush(results, (sim, neighbour))
+                    full = len(results) >= ef
+                    worst = results[0][0]
+                elif sim > worst:
+                    heappush(candidates, (-sim, neighbour))
+                    heapreplace(results, (sim, neighbour))
+                    worst = results[0][0]
+
+        return sorted(results, reverse=True)
+
+    def _select_neighbours(self, vectors: VectorLookup, candidates: List[Tuple[float, int]],
+                           count: int) -> List[int]:
+        """Kaimiņu izvēles heiristika: ņem kandidātu, ja tas ir tuvāks vaicājumam nekā jau izvēlētajiem.
+
+        Atmestie kandidāti aizpilda atlikušās vietas (keepPrunedConnections).
+        """
+        if len(candidates) <= count:
+            return [node for _, node in candidates]
+        sims = np.array([sim for sim, _ in candidates], dtype=np.float32)
+        nodes = [node for _, node in candidates]
+        selected_vectors = vectors(nodes)
+        gram = selected_vectors @ selected_vectors.T
+        # Katram kandidātam — lielākā līdzība ar jau izvēlētajiem
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        pruned: List[int] = []
+        for i, node in enumerate(nodes):
+            if len(selected) >= count:
+                break
+            if closest[i] >= sims[i]:
+                pruned.append(node)
+            else:
+                selected.append(node)
+                np.maximum(closest, gram[i], out=closest)
+        for node in pruned:
+            if len(selected) >= count:
+                break
+            selected.append(node)
+        return selected
+
+    def _descend(self, vectors: VectorLookup, query: np.ndarray, target_level: int) -> List[int]:
+        """Alkatīgi nolaižas no ieejas punkta līdz *target_level*"""
+        entry = [self._entry]
+        for level in range(self._max_level, target_level, -1):
+            entry = [self._search_layer(vectors, query, entry, 1, level)[0][1]]
+        return entry
+
+    # — rakstīšana —
+
+    def add(self, label: Any, vector: Sequence[float]):
+        """Ievieto vektoru; esošai etiķetei mezgls tiek pārvietots uz jauno vektoru"""
+        query = self._normalize(vector)
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Vektora izmērs {query.shape[0]} nesakrīt ar indeksa izmēru {self.dim}")
+        with self._lock:
+            node = self._node_by_label.get(label)
+            if node is None:
+                self._add(label, query)
+            else:
+                self._update(node, query)
+
+    def _add(self, label: Any, query: np.ndarray):
+        node = self._count
+        if self._source is None:
+            if node >= len(self._data):
+                grown = np.zeros((len(self._data) * 2, self.dim), dtype=np.float32)
+                grown[:node] = self._data[:node]
+                self._data = grown
+            self._data[node] = query
+        level = self._random_level()
+        self._levels.append(level)
+        self._links.append([[] for _ in range(level + 1)])
+        self._labels.append(label)
+        self._deleted.append(False)
+        self._count += 1
+        self._node_by_label[label] = node
+
+        if self._entry < 0:
+            self._entry, self._max_level = node, level
+            return
+
+        self._connect(self._lookup(), node, query)
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+
+    def _update(self, node: int, query: np.ndarray):
+        """Pārvieto mezglu uz jaunu vektoru, saglabājot tā numuru un slāņus.
+
+        Ar ārēju matricu rinda jau satur jauno vektoru, tāpēc vecais mezgls nedrīkst
+        palikt grafā kā dzēsts — tas lasītu jauno vektoru, bet vestu uz veco apkārtni.
+        Vecie kaimiņi izvēlas jaunus kaimiņus no savas un mezgla apkārtnes, bet pats
+        mezgls tiek savienots no jauna kā ievietojot.
+        """
+        if self._source is None:
+            self._data[node] = query
+        if self._count == 1:
+            return
+        vectors = self._lookup()
+        for layer in range(self._levels[node], -1, -1):
+            limit = self.M0 if layer == 0 else self.M
+            neighbours = self._links[node][layer]
+            candidates = set(neighbours)
+            for neighbour in neighbours:
+                candidates.update(self._links[neighbour][layer])
+            candidates.discard(node)
+            for neighbour in neighbours:
+                pool = [candidate for candidate in candidates if candidate != neighbour]
+                if not pool:
+                    continue
+                sims = (vectors(pool) @ vectors([neighbour])[0]).tolist()
+                ranked = sorted(zip(sims, pool), reverse=True)[:self.ef_construction]
+                self._links[neighbour][layer] = self._select_neighbours(vectors, ranked, limit)
+        self._connect(vectors, node, query)
+
+    def _connect(self, vectors: VectorLookup, node: int, query: np.ndarray):
+        """Atrod mezglam kaimiņus katrā tā slānī un pievieno atpakaļsaites"""
+        level = self._levels[node]
+        entry = self._descend(vectors, query, level)
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(vectors, query, entry, self.ef_construction, layer)
+            candidates = [(sim, n) for sim, n in found if n != node]
+            neighbours = self._select_neighbours(vectors, candidates, self.M)
+            self._links[node][layer] = neighbours
+            limit = self.M0 if layer == 0 else self.M
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                if node in links:
+                    continue
+                links.append(node)
+                if len(links) > limit:
+                    sims = (vectors(links) @ vectors([neighbour])[0]).tolist()
+                    ranked = sorted(zip(sims, links), reverse=True)
+                    self._links[neighbour][layer] = self._select_neighbours(vectors, ranked, limit)
+            entry = [n for _, n in found]
+
+    def delete(self, label: Any) -> bool:
+        """Atzīmē etiķeti kā dzēstu; mezgls paliek grafā navigācijai"""
+        with self._lock:
+            node = self._node_by_label.pop(label, None)
+            if node is None:
+                return False
+            self._deleted[node] = True
+            return True
+
+    # — meklēšana —
+
+    def search(self, query: Sequence[float], k: int = 10, ef: Optional[int] = None,
+               allowed: Optional[Callable[[Any], bool]] = None) -> List[Tuple[Any, float]]:
+        """Atgriež līdz *k* (etiķete, kosinusa līdzība) dilstošā secībā.
+
+        Dzēstie un *allowed* noraidītie mezgli tiek izlaisti; ja rezultātu
+        nepietiek, *ef* tiek dubultots, līdz apskatīts viss grafs.
+        """
+        query = self._normalize(query)
+        with self._lock:
+            if not self._node_by_label or k <= 0:
+                return []
+            vectors = self._lookup()
+            entry = self._descend(vectors, query, 0)
+            ef = max(ef or self.ef_search, k)
+            while True:
+                found = self._search_layer(vectors, query, entry, ef, 0)
+                hits = [
+                    (self._labels[node], sim)
+                    for sim, node in found
+                    if not self._deleted[node] and (allowed is None or allowed(self._labels[node]))
+                ]
+                if len(hits) >= k or ef >= self._count:
+                    return hits[:k]
+                ef *= 2
+
+    # — saglabāšana —
+
+    def save(self, path: str):
+        """Saglabā grafu vienā .npz failā (atomiski); ar ārēju matricu — bez vektoriem"""
+        with self._lock:
+            self._save(path)
+
+    def _save(self, path: str):
+        counts: List[int] = []
+        flat: List[int] = []
+        for node_links in self._links:
+            for neighbours in node_links:
+                counts.append(len(neighbours))
+                flat.extend(neighbours)
+        meta = {
+            "dim": self.dim,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "entry": self._entry,
+            "max_level": self._max_level,
+            "labels": self._labels,
+        }
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as fh:
+            np.savez(
+                fh,
+                data=self._data[:self._count],
+                levels=np.asarray(self._levels, dtype=np.int32),
+                counts=np.asarray(counts, dtype=np.int32),
+                links=np.asarray(flat, dtype=np.int32),
+                deleted=np.asarray(self._deleted, dtype=bool),
+                meta=np.asarray(json.dumps(meta)),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, vectors: Optional[Callable[[], Tuple[np.ndarray, np.ndarray]]] = None) -> "HNSWIndex":
+        """Ielādē grafu, kas saglabāts ar `save`; *vectors* — kā konstruktorā"""
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(str(archive["meta"]))
+            index = cls(meta["dim"], M=meta["M"], ef_construction=meta["ef_construction"],
+                        ef_search=meta["ef_search"], vectors=vectors)
+            data = archive["data"] if vectors is None else ()
+            levels = archive["levels"].tolist()
+            counts = archive["counts"].tolist()
+            flat = archive["links"].tolist()
+            deleted = archive["deleted"].tolist()
+
+        index._data = np.array(data, dtype=np.float32, copy=True) if len(data) else index._data
+        index._count = len(levels)
+        index._levels = levels
+        position = 0
+        cursor = 0
+        for level in levels:
+            node_links = []
+            for _ in range(level + 1):
+                count = counts[cursor]
+                node_links.append(flat[position:position + count])
+                position += count
+                cursor += 1
+            index._links.append(node_links)
+        index._labels = meta["labels"]
+        index._deleted = deleted
+        index._node_by_label = {
+            label: node for node, label in enumerate(index._labels) if not deleted[node]
+        }
+        index._entry = meta["entry"]
+        index._max_level = meta["max_level"]
+        return index
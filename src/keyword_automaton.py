@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Keyword Automaton for n8n Workflow AI Agent
+Šis modulis implementē Aho-Corasick automātu vairāku atslēgvārdu meklēšanai
+tekstā vienā piegājienā: meklēšanas laiks ir atkarīgs no teksta garuma un
+atrasto sakritību skaita, nevis no vārdnīcas izmēra.
+
+Katram šablonam var būt vairākas vērtības (viens vārds var būt gan
+atslēgvārds, gan nolūka vārds), un šablons var prasīt vārda robežas (kā
+regulārās izteiksmes `\\b`); pārējie šabloni tiek meklēti kā apakšvirknes.
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+def is_word_char(char: str) -> bool:
+    """Vai rakstzīme ir vārda daļa (tāpat kā `\\w` regulārajās izteiksmēs)"""
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automāts: šabloni → vērtības; tiek kompilēts vienreiz"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any, bool]]):
+        """*patterns* — (šablons, vērtība, whole_word) trijnieki; šabloni tiek pārvērsti mazajos burtos"""
+        # Stāvokļu pārejas, kļūdu saites un izvadi (šablona garums, vērtība, whole_word)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any, bool]]] = [[]]
+        self._patterns = 0
+        for pattern, value, whole_word in patterns:
+            self._add(pattern.lower(), value, whole_word)
+        self._build()
+
+    def __len__(self) -> int:
+        return self._patterns
+
+    def _add(self, pattern: str, value: Any, whole_word: bool):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value, whole_word))
+        self._patterns += 1
+
+    def _build(self):
+        """Kļūdu saites platumā; katra stāvokļa izvadam pievieno tā kļūdu saites izvadu"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Visas sakritības (start, end, vērtība) tekstā, t.sk. pārklājošās; teksta beigu secībā.
+
+        Teksts netiek pārveidots — izsaucējs to padod mazajos burtos.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value, whole_word in output[state]:
+                start = index + 1 - length
+                if whole_word and (
+                    (start > 0 and is_word_char(text[start - 1]))
+                    or (index + 1 < len(text) and is_word_char(text[index + 1]))
+                ):
+                    continue
+                yield start, index + 1, value
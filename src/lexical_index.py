@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Lexical Index for n8n Workflow AI Agent
+Šis modulis nodrošina retināto (BM25) workflow indeksu: apgrieztais indekss
+pār workflow nosaukumiem, mezglu tipiem, mezglu nosaukumiem un parametru
+kopsavilkumu. Tas papildina vektoru meklēšanu — precīzi servisu nosaukumi
+("airtable webhook") tiek atrasti bez embedding pieprasījuma — un abu
+meklēšanu rezultāti tiek apvienoti ar reciprocal rank fusion (RRF).
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.vector_database_design import WorkflowVector, workflow_metadata
+from src.workflow_blob_store import content_hash
+
+# Noklusējuma indeksa fails blakus pārējām indeksa datnēm
+DEFAULT_LEXICAL_PATH = os.environ.get("LEXICAL_INDEX_PATH", "database/lexical_index.json")
+
+# BM25 parametri (standarta vērtības)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# RRF konstante: lielāka vērtība mazina augšējo vietu pārsvaru
+RRF_K = 60
+
+# camelCase robežas ("airtableTrigger" → "airtable Trigger")
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"\w+")
+# Parametri ar kodu vai garu brīvu tekstu kopsavilkumā netiek iekļauti
+_SKIPPED_PARAMETERS = {"functionCode", "jsCode", "pythonCode", "code", "query", "jsonBody", "body"}
+_MAX_PARAMETER_LENGTH = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """Mazie burti, camelCase un pieturzīmes kā vārdu robežas"""
+    return _WORD.findall(_CAMEL_BOUNDARY.sub(" ", text).lower())
+
+
+def node_type_tokens(node_type: str) -> List[str]:
+    """"n8n-nodes-base.airtableTrigger" → ["airtable", "trigger"] (pakotnes prefikss tiek izmests)"""
+    return tokenize(node_type.rsplit(".", 1)[-1])
+
+
+def _parameter_values(parameters: Any) -> Iterable[str]:
+    """Īsās parametru teksta vērtības (resource, operation, event u.c.); izteiksmes un kods tiek izlaisti"""
+    if isinstance(parameters, dict):
+        for key, value in parameters.items():
+            if key not in _SKIPPED_PARAMETERS:
+                yield from _parameter_values(value)
+    elif isinstance(parameters, list):
+        for value in parameters:
+            yield from _parameter_values(value)
+    elif isinstance(parameters, str):
+        if parameters and len(parameters) <= _MAX_PARAMETER_LENGTH and not parameters.startswith("="):
+            yield parameters
+
+
+def workflow_terms(workflow_json: Dict[str, Any]) -> Counter:
+    """Workflow termini ar svariem: nosaukums un mezglu tipi skaitās divreiz"""
+    terms = Counter()
+    terms.update(tokenize(workflow_json.get("name", "")) * 2)
+    for node in workflow_json.get("nodes", []):
+        terms.update(node_type_tokens(node.get("type", "")) * 2)
+        terms.update(tokenize(node.get("name", "")))
+        for value in _parameter_values(node.get("parameters", {})):
+            terms.update(tokenize(value))
+    return terms
+
+
+class LexicalIndex:
+    """BM25 apgrieztais indekss workflow meklēšanai; rezultātu forma kā vektoru indeksam"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_LEXICAL_PATH, k1: float = BM25_K1, b: float = BM25_B):
+        self.path = path  # None — tikai atmiņā
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._terms: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        # Termini, kas parādās mezglu tipos — pēc tiem atpazīst "tīrus" servisu vaicājumus
+        self._node_terms: Counter = Counter()
+        self._node_terms_by_doc: Dict[str, List[str]] = {}
+        # Palielinās ar katru izmaiņu (rezultātu kešu invalidācijai)
+        self.version = 0
+        self._saved_version = 0  # versija, kas ierakstīta diskā (skat. `flush`)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    # — glabāšana —
+
+    def load(self) -> bool:
+        """Ielādē indeksu no diska; False, ja fails nav atrasts"""
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                documents = json.load(fh)["documents"]
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            for document in documents:
+                self._add_document(document["id"], Counter(document["terms"]), document["node_terms"],
+                                   document["metadata"])
+            self.version += 1
+            self._saved_version = self.version
+        print(f"Leksiskais indekss ielādēts: {len(documents)} workflow")
+        return True
+
+    def save(self):
+        """Saglabā indeksu (atomiski)"""
+        if self.path is None:
+            return
+        with self._lock:
+            version = self.version
+            documents = [
+                {"id": doc_id, "terms": self._terms[doc_id], "node_terms": self._node_terms_by_doc[doc_id],
+                 "metadata": self._metadata[doc_id]}
+                for doc_id in self._lengths
+            ]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"documents": documents}, fh)
+        os.replace(tmp_path, self.path)
+        self._saved_version = version
+
+    def flush(self):
+        """Saglabā indeksu, ja tas mainīts kopš pēdējās saglabāšanas (reizi indeksēšanas beigās)"""
+        if self.version != self._saved_version:
+            self.save()
+
+    # — rakstīšana —
+
+    def _remove_document(self, doc_id: str):
+        for term in self._terms.pop(doc_id, {}):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id, 0)
+        self._node_terms.subtract(self._node_terms_by_doc.pop(doc_id, []))
+        self._metadata.pop(doc_id, None)
+
+    def _add_document(self, doc_id: str, terms: Counter, node_terms: List[str], metadata: Dict[str, Any]):
+        self._remove_document(doc_id)
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        length = sum(terms.values())
+        self._terms[doc_id] = dict(terms)
+        self._lengths[doc_id] = length
+        self._total_length += length
+        self._node_terms.update(node_terms)
+        self._node_terms_by_doc[doc_id] = node_terms
+        self._metadata[doc_id] = metadata
+
+    def add_workflows(self, workflow_vectors: Iterable[WorkflowVector]) -> int:
+        """Pievieno vai aizstāj workflow; metadati sakrīt ar vektoru indeksa payload.
+
+        Izmaiņas tiek ierakstītas diskā ar `flush` (vai `save`), nevis pēc katras porcijas.
+        """
+        count = 0
+        with self._lock:
+            for workflow_vector in workflow_vectors:
+                workflow_json = workflow_vector.json_content
+                node_terms = sorted({
+                    term for node in workflow_json.get("nodes", [])
+                    for term in node_type_tokens(node.get("type", ""))
+                })
+                # Hash jau aprēķināts, ierakstot blob krātuvē (WorkflowIndex._payload)
+                digest = workflow_vector.content_hash or content_hash(workflow_json)
+                metadata = dict(workflow_metadata(workflow_vector), content_hash=digest)
+                self._add_document(workflow_vector.id, workflow_terms(workflow_json), node_terms, metadata)
+                count += 1
+            self.version += 1
+        return count
+
+    # — meklēšana —
+
+    def is_exact_node_query(self, query: str) -> bool:
+        """Vai visi vaicājuma vārdi ir indeksēto mezglu tipu termini (piem., "airtable webhook")"""
+        tokens = tokenize(query)
+        with self._lock:
+            return bool(tokens) and all(self._node_terms[token] > 0 for token in tokens)
+
+    def search(self, query: str, limit: int = 10,
+               category_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """BM25 top-k: [{"id", "score", "metadata"}] dilstošā secībā"""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._lengths)
+            if not count or limit <= 0:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            if category_filter:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if self._metadata[doc_id].get("category") == category_filter
+                }
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+            return [{"id": doc_id, "score": score, "metadata": self._metadata[doc_id]} for doc_id, score in top]
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Dict[str, Any]]], k: int = RRF_K,
+                           names: Sequence[str] = ("vector", "lexical")) -> List[Dict[str, Any]]:
+    """Apvieno ranžētus sarakstus: score = Σ 1 / (k + vieta).
+
+    Rezultāta `score` ir normalizēts pret maksimālo iespējamo (pirmā vieta
+    visos sarakstos) un ir robežās (0, 1]; katra avota sākotnējais rezultāts
+    saglabājas laukā `<nosaukums>_score`.
+    """
+    merged: Dict[Any, Dict[str, Any]] = {}
+    fused: Dict[Any, float] = {}
+    for name, results in zip(names, result_lists):
+        for rank, result in enumerate(results, 1):
+            entry = merged.setdefault(result["id"], {"id": result["id"], "metadata": result["metadata"]})
+            entry[f"{name}_score"] = result["score"]
+            fused[result["id"]] = fused.get(result["id"], 0.0) + 1.0 / (k + rank)
+
+    best = sum(1.0 / (k + 1) for results in result_lists if results) or 1.0
+    ordered = sorted(merged, key=lambda doc_id: fused[doc_id], reverse=True)
+    for doc_id in ordered:
+        merged[doc_id]["score"] = fused[doc_id] / best
+    return [merged[doc_id] for doc_id in ordered]
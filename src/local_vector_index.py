@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Local Vector Index for n8n Workflow AI Agent
+Šis modulis nodrošina procesa iekšēju workflow vektoru indeksu ar tādu pašu
+saskarni kā QdrantWorkflowDatabase. Vektori glabājas vienā float32 matricā
+(uz diska, atvērta ar mmap), normas ir aprēķinātas iepriekš, un kosinusa
+top-k tiek aprēķināts ar vienu matricas reizinājumu un `argpartition`.
+Kategoriju filtrs izmanto iepriekš sagatavotas bitkartes. Lieliem
+korpusiem var ieslēgt HNSW grafu (`use_hnsw`), kas aizstāj pilno pārlasi ar
+aptuvenu meklēšanu (grafs lasa vektorus no tās pašas matricas), vai
+kvantizāciju (`quantization`): pilnā pārlase notiek pār int8/PQ kodiem
+atmiņā, un tikai labākie kandidāti tiek pārvērtēti ar float32 vektoriem no
+diska. Grafs un kodi tiek saglabāti ar `flush` indeksēšanas beigās.
+
+Mazām un vidējām instalācijām (desmitiem tūkstošu workflow) Qdrant nav
+vajadzīgs; ja Qdrant ir konfigurēts, bet nav pieejams, `create_workflow_index`
+atgriež šo indeksu.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.hnsw_index import DEFAULT_EF_SEARCH, DEFAULT_M, HNSWIndex
+from src.vector_database_design import (
+    DEFAULT_QUANTIZATION, EMBEDDING_SIZE, RESCORE_OVERSAMPLING, QdrantWorkflowDatabase, WorkflowIndex, WorkflowVector
+)
+from src.vector_quantization import encode_matrix, normalize_rows, quantizer_from_arrays, rescore, train_quantizer
+from src.workflow_blob_store import WorkflowBlobStore
+
+# Noklusējuma indeksa mape blakus aplikācijas datubāzei
+DEFAULT_INDEX_PATH = os.environ.get("LOCAL_VECTOR_INDEX_PATH", "database/vector_index")
+# Kuru vektoru krātuvi lietot: "qdrant" (ar lokālo rezervi) vai "local"
+DEFAULT_VECTOR_STORE = os.environ.get("VECTOR_STORE", "qdrant")
+# HNSW grafs aptuvenai meklēšanai ("1" — ieslēgts)
+DEFAULT_USE_HNSW = os.environ.get("LOCAL_VECTOR_INDEX_HNSW", "") == "1"
+# Zem šī punktu skaita pilnā pārlase ir gan precīza, gan pietiekami ātra
+HNSW_MIN_POINTS = 20_000
+# Kvantizators tiek apmācīts tikai tad, kad ir pietiekami daudz vektoru (PQ — 256 centroīdi)
+QUANTIZATION_MIN_POINTS = 1024
+# Cik vektoru paraugs tiek lietots kvantizatora apmācībai
+QUANTIZATION_SAMPLE = 20_000
+
+_VECTORS_FILE = "vectors.f32"
+_POINTS_FILE = "points.json"
+_HNSW_FILE = "hnsw.npz"
+_CODES_FILE = "quantized.npz"
+# Cik rindu vienā blokā tiek kopēts, pārrakstot vektoru failu
+_COPY_ROWS = 4096
+
+
+class _IndexState:
+    """Viena nemainīga indeksa versija; meklētāji strādā ar to bez slēdzenes"""
+
+    __slots__ = ("matrix", "norms", "ids", "payloads", "row_by_id", "bitmaps", "codes")
+
+    def __init__(self, matrix: np.ndarray, norms: np.ndarray, ids: List[Any], payloads: List[Dict[str, Any]]):
+        self.matrix = matrix
+        self.codes: Optional[np.ndarray] = None  # kvantizētie vektori (ja kvantizācija ieslēgta)
+        self.norms = norms
+        self.ids = ids
+        self.payloads = payloads
+        self.row_by_id = {point_id: row for row, point_id in enumerate(ids)}
+
+        categories = np.array([payload.get("category") or "" for payload in payloads], dtype=object)
+        self.bitmaps: Dict[str, np.ndarray] = {
+            category: categories == category for category in set(categories.tolist())
+        }
+
+
+class LocalVectorIndex(WorkflowIndex):
+    """NumPy workflow vektoru indekss ar QdrantWorkflowDatabase saskarni"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH, vector_size: int = EMBEDDING_SIZE,
+                 blob_store: Optional[WorkflowBlobStore] = None, use_hnsw: bool = DEFAULT_USE_HNSW,
+                 hnsw_m: int = DEFAULT_M, hnsw_ef: int = DEFAULT_EF_SEARCH,
+                 hnsw_min_points: int = HNSW_MIN_POINTS, quantization: Optional[str] = DEFAULT_QUANTIZATION,
+                 rescore_oversampling: Optional[int] = None,
+                 quantization_min_points: int = QUANTIZATION_MIN_POINTS):
+        super().__init__(vector_size, blob_store)
+        if quantization not in (None, "int8", "pq"):
+            raise ValueError(f"Nezināms kvantizācijas veids: {quantization}")
+        self.path = path  # None — tikai atmiņā
+        self._write_lock = threading.Lock()
+        self._state = _IndexState(np.zeros((0, vector_size), dtype=np.float32),
+                                  np.zeros(0, dtype=np.float32), [], [])
+        # HNSW etiķetes ir matricas rindu numuri; vektori — no publicētā stāvokļa matricas
+        self._hnsw = (HNSWIndex(vector_size, M=hnsw_m, ef_search=hnsw_ef, vectors=self._graph_vectors)
+                      if use_hnsw else None)
+        self._unsaved = False  # grafs/kodi mainīti kopš pēdējā `flush`
+        self.hnsw_min_points = hnsw_min_points
+        self.quantization = quantization
+        self.rescore_oversampling = rescore_oversampling or RESCORE_OVERSAMPLING.get(quantization, 1)
+        self.quantization_min_points = quantization_min_points
+        self._quantizer = None
+        self._quantizer_trained_on = 0  # pēc tam, kad korpuss dubultojas, kvantizators tiek apmācīts no jauna
+
+    # — glabāšana —
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _graph_vectors(self):
+        state = self._state
+        return state.matrix, state.norms
+
+    def _open_matrix(self, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        return np.memmap(self._file(_VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, self.vector_size))
+
+    def initialize_collection(self) -> bool:
+        """Ielādē indeksu no diska (vai izveido tukšu); vienmēr izdodas"""
+        if self.path is None:
+            return True
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with open(self._file(_POINTS_FILE), "r", encoding="utf-8") as fh:
+                points = json.load(fh)
+        except FileNotFoundError:
+            return True
+        if points["dimension"] != self.vector_size:
+            raise ValueError(
+                f"Lokālā indeksa izmērs {points['dimension']} nesakrīt ar embedding izmēru {self.vector_size}"
+            )
+
+        matrix = self._open_matrix(len(points["ids"]))
+        norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+        self._state = _IndexState(matrix, norms, points["ids"], points["payloads"])
+        if self._hnsw is not None:
+            self._load_hnsw()
+        if self.quantization:
+            self._load_codes()
+        print(f"Lokālais vektoru indekss ielādēts: {len(points['ids'])} workflow")
+        return True
+
+    def _load_hnsw(self):
+        """Ielādē saglabāto HNSW grafu; ja tā nav vai tas neatbilst matricai, pārbūvē"""
+        state = self._state
+        try:
+            graph = HNSWIndex.load(self._file(_HNSW_FILE), vectors=self._graph_vectors)
+            if graph.dim == self.vector_size and len(graph) == len(state.ids):
+                graph.ef_search = self._hnsw.ef_search
+                self._hnsw = graph
+                return
+        except FileNotFoundError:
+            pass
+        print(f"Būvē HNSW grafu {len(state.ids)} workflow...")
+        for row in range(len(state.ids)):
+            self._hnsw.add(row, state.matrix[row])
+        self._hnsw.save(self._file(_HNSW_FILE))
+
+    def _load_codes(self):
+        """Ielādē saglabātos kodus; ja tie neatbilst matricai, kvantizē no jauna"""
+        state = self._state
+        try:
+            with np.load(self._file(_CODES_FILE), allow_pickle=False) as archive:
+                arrays = {name: archive[name] for name in archive.files}
+            if (str(arrays["kind"]) == self.quantization and len(arrays["codes"]) == len(state.ids)
+                    and int(arrays["dimension"]) == self.vector_size):
+                self._quantizer = quantizer_from_arrays(arrays)
+                self._quantizer_trained_on = int(arrays["trained_on"])
+                state.codes = arrays["codes"]
+                return
+        except FileNotFoundError:
+            pass
+        state.codes = self._quantize(state, np.zeros((0, self.vector_size), dtype=np.float32), {})
+        self._save_codes(state)
+
+    def _save_codes(self, state: _IndexState):
+        if self.path is None or state.codes is None:
+            return
+        tmp_path = f"{self._file(_CODES_FILE)}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, codes=state.codes, dimension=np.asarray(self.vector_size),
+                     trained_on=np.asarray(self._quantizer_trained_on), **self._quantizer.to_arrays())
+        os.replace(tmp_path, self._file(_CODES_FILE))
+
+    def _quantize(self, state: _IndexState, new_vectors: np.ndarray,
+                  updated: Dict[int, np.ndarray]) -> Optional[np.ndarray]:
+        """Kodi jaunajam stāvoklim: jaunās un mainītās rindas tiek kodētas, pārējās paņemtas no iepriekšējā.
+
+        Kvantizators tiek (pār)apmācīts, kad korpuss sasniedz minimumu un
+        pēc tam katru reizi, kad tas dubultojas (kopējās izmaksas — O(N)).
+        """
+        count = len(state.ids)
+        if count < self.quantization_min_points:
+            return None
+        previous = self._state.codes
+        if self._quantizer is None or previous is None or count >= 2 * self._quantizer_trained_on:
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(count, min(count, QUANTIZATION_SAMPLE), replace=False))
+            self._quantizer = train_quantizer(self.quantization, normalize_rows(state.matrix[sample], state.norms[sample]))
+            self._quantizer_trained_on = count
+            return encode_matrix(self._quantizer, state.matrix, state.norms)
+
+        old_count = count - len(new_vectors)
+        codes = np.empty((count, self._quantizer.code_size), dtype=np.uint8)
+        codes[:old_count] = previous[:old_count]
+        if len(new_vectors):
+            codes[old_count:] = self._quantizer.encode(normalize_rows(new_vectors))
+        for row, vector in updated.items():
+            codes[row] = self._quantizer.encode(normalize_rows(vector[None, :]))[0]
+        return codes
+
+    def _persist(self, state: _IndexState, appended: np.ndarray, updated: Dict[int, np.ndarray]):
+        """Ieraksta jaunā stāvokļa vektorus; punktu saraksts tiek aizstāts atomiski.
+
+        Jaunas rindas tiek pievienotas faila beigās. Ja kāda esoša rinda
+        mainās, tiek uzrakstīts jauns fails un aizstāj veco: lasītāji vēl tur
+        iepriekšējo stāvokli ar mmap pār veco failu, un tā rindas nedrīkst
+        mainīties zem tiem (aizstātā faila saturs paliek, kamēr tas ir atvērts).
+        *state.matrix* šeit vēl ir iepriekšējā stāvokļa matrica.
+        """
+        row_bytes = self.vector_size * 4
+        old_count = len(state.ids) - len(appended)
+        if updated:
+            rows = np.fromiter(updated, dtype=np.int64, count=len(updated))
+            replacements = np.stack(list(updated.values()))
+            tmp_path = f"{self._file(_VECTORS_FILE)}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as fh:
+                for start in range(0, old_count, _COPY_ROWS):
+                    block = np.array(state.matrix[start:start + _COPY_ROWS], dtype=np.float32)
+                    inside = (rows >= start) & (rows < start + len(block))
+                    block[rows[inside] - start] = replacements[inside]
+                    fh.write(block.tobytes())
+                fh.write(appended.tobytes())
+            os.replace(tmp_path, self._file(_VECTORS_FILE))
+        else:
+            with open(self._file(_VECTORS_FILE), "ab") as fh:
+                # Failā var būt rindas no pārtrauktas rakstīšanas — tās tiek pārrakstītas
+                fh.truncate(old_count * row_bytes)
+                fh.write(appended.tobytes())
+
+        tmp_path = f"{self._file(_POINTS_FILE)}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"dimension": self.vector_size, "ids": state.ids, "payloads": state.payloads}, fh)
+        os.replace(tmp_path, self._file(_POINTS_FILE))
+
+    # — rakstīšana —
+
+    def add_workflow(self, workflow_vector: WorkflowVector):
+        """Pievieno workflow vektoru indeksam"""
+        if self.add_workflows([workflow_vector]):
+            self.flush()
+            print(f"Pievienots workflow: {workflow_vector.metadata.name}")
+
+    def add_workflows(self, workflow_vectors: Iterable[WorkflowVector], batch_size: int = 0) -> int:
+        """Pievieno vai aizstāj workflow vektorus; atgriež skaitu. `batch_size` — saderībai ar Qdrant"""
+        workflow_vectors = list(workflow_vectors)
+        if not workflow_vectors:
+            return 0
+        vectors = np.asarray([workflow_vector.vector for workflow_vector in workflow_vectors], dtype=np.float32)
+        if vectors.shape[1] != self.vector_size:
+            raise ValueError(f"Vektora izmērs {vectors.shape[1]} nesakrīt ar indeksa izmēru {self.vector_size}")
+        payloads = [self._payload(workflow_vector) for workflow_vector in workflow_vectors]
+
+        with self._write_lock:
+            state = self._state
+            ids = list(state.ids)
+            all_payloads = list(state.payloads)
+            row_by_id = dict(state.row_by_id)
+            appended: List[int] = []
+            updated: Dict[int, np.ndarray] = {}
+            for i, workflow_vector in enumerate(workflow_vectors):
+                row = row_by_id.get(workflow_vector.id)
+                if row is None:
+                    row_by_id[workflow_vector.id] = len(ids)
+                    ids.append(workflow_vector.id)
+                    all_payloads.append(payloads[i])
+                    appended.append(i)
+                elif row >= len(state.ids):
+                    # Tas pats id šajā pašā partijā — pēdējais uzvar
+                    all_payloads[row] = payloads[i]
+                    appended[row - len(state.ids)] = i
+                else:
+                    all_payloads[row] = payloads[i]
+                    updated[row] = vectors[i]
+
+            new_vectors = vectors[appended] if appended else np.zeros((0, self.vector_size), dtype=np.float32)
+            norms = np.concatenate([state.norms, np.linalg.norm(new_vectors, axis=1).astype(np.float32)])
+            for row, vector in updated.items():
+                norms[row] = np.linalg.norm(vector)
+
+            if not self._unsaved:
+                self._discard_saved()
+                self._unsaved = True
+            if self.path is None:
+                matrix = np.concatenate([state.matrix, new_vectors])
+                for row, vector in updated.items():
+                    matrix[row] = vector
+                new_state = _IndexState(matrix, norms, ids, all_payloads)
+            else:
+                new_state = _IndexState(state.matrix, norms, ids, all_payloads)
+                self._persist(new_state, new_vectors, updated)
+                new_state.matrix = self._open_matrix(len(ids))
+            if self.quantization:
+                new_state.codes = self._quantize(new_state, new_vectors, updated)
+            self._state = new_state
+            self.version += 1
+
+            # Grafā tiek ievietotas tikai rindas, kas jau ir publicētajā stāvoklī
+            if self._hnsw is not None:
+                for offset, vector in enumerate(new_vectors):
+                    self._hnsw.add(len(state.ids) + offset, vector)
+                for row, vector in updated.items():
+                    self._hnsw.add(row, vector)
+        return len(workflow_vectors)
+
+    def _discard_saved(self):
+        """Dzēš saglabāto grafu un kodus pirms pirmās izmaiņas kopš `flush`.
+
+        Tie apraksta iepriekšējo stāvokli (atjauninātām rindām punktu skaits
+        nemainās), tāpēc pēc pārtrauktas indeksēšanas tie jāpārbūvē.
+        """
+        if self.path is None:
+            return
+        for name in (_HNSW_FILE, _CODES_FILE):
+            try:
+                os.remove(self._file(name))
+            except FileNotFoundError:
+                pass
+
+    def flush(self):
+        """Saglabā HNSW grafu un kvantizētos kodus (reizi indeksēšanas beigās, nevis pēc katras partijas).
+
+        Ja process apstājas pirms tam, saglabāto failu nav un ielādē tie tiek pārbūvēti.
+        """
+        if self.path is None:
+            return
+        with self._write_lock:
+            if not self._unsaved:
+                return
+            if self.quantization:
+                self._save_codes(self._state)
+            if self._hnsw is not None:
+                self._hnsw.save(self._file(_HNSW_FILE))
+            self._unsaved = False
+
+    # — meklēšana —
+
+    @staticmethod
+    def _result(state: _IndexState, row: int, score: float) -> Dict[str, Any]:
+        return {"id": state.ids[row], "score": score, "metadata": state.payloads[row]}
+
+    def _top_k_hnsw(self, state: _IndexState, queries: np.ndarray, limit: int,
+                    bitmap: Optional[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Aptuvenais top-k caur HNSW grafu; filtrs tiek pārbaudīts grafa pārlases laikā.
+
+        Grafā jau var būt rindas no jaunāka stāvokļa nekā *state* — tās tiek izlaistas.
+        """
+        count = len(state.ids)
+
+        def allowed(row: int) -> bool:
+            return row < count and (bitmap is None or bool(bitmap[row]))
+        return [
+            [self._result(state, row, score) for row, score in self._hnsw.search(query, limit, allowed=allowed)]
+            for query in queries
+        ]
+
+    def _top_k_quantized(self, state: _IndexState, queries: np.ndarray, limit: int,
+                         rows: Optional[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """Kandidāti pēc kvantizētajiem kodiem, tad precīzā pārvērtēšana ar float32 vektoriem"""
+        codes = state.codes if rows is None else state.codes[rows]
+        candidates = min(limit * self.rescore_oversampling, len(codes))
+        batches = []
+        for query in normalize_rows(queries):
+            approximate = self._quantizer.scores(codes, query)
+            top = np.argpartition(-approximate, candidates - 1)[:candidates]
+            if rows is not None:
+                top = rows[top]
+            ordered, scores = rescore(state.matrix, state.norms, top, query, limit)
+            batches.append([self._result(state, int(row), float(score)) for row, score in zip(ordered, scores)])
+        return batches
+
+    def _top_k(self, state: _IndexState, queries: np.ndarray, limit: int,
+               category_filter: Optional[str]) -> List[List[Dict[str, Any]]]:
+        """Kosinusa top-k visiem vaicājumiem ar vienu matricas reizinājumu (vai HNSW lieliem korpusiem)"""
+        bitmap = None
+        if category_filter:
+            bitmap = state.bitmaps.get(category_filter)
+            rows = np.flatnonzero(bitmap) if bitmap is not None else np.zeros(0, dtype=np.int64)
+            if bitmap is None:
+                return [[] for _ in range(len(queries))]
+        else:
+            rows = None
+
+        candidates = len(state.ids) if rows is None else len(rows)
+        if (self._hnsw is not None and candidates >= self.hnsw_min_points
+                and len(self._hnsw) == len(state.ids)):
+            return self._top_k_hnsw(state, queries, limit, bitmap)
+        if state.codes is not None and 0 < limit * self.rescore_oversampling < candidates:
+            return self._top_k_quantized(state, queries, limit, rows)
+
+        if rows is None:
+            matrix, norms = state.matrix, state.norms
+        else:
+            matrix, norms = state.matrix[rows], state.norms[rows]
+
+        count = len(norms)
+        k = min(limit, count)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        query_norms = np.linalg.norm(queries, axis=1)
+        scores = (matrix @ queries.T).T
+        scores /= np.maximum(norms, 1e-12)[None, :]
+        scores /= np.maximum(query_norms, 1e-12)[:, None]
+
+        if k < count:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(count), (len(queries), count))
+        batches = []
+        for query_index, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[query_index, candidates], kind="stable")]
+            batches.append([
+                self._result(state, row if rows is None else rows[row], float(scores[query_index, row]))
+                for row in ordered
+            ])
+        return batches
+
+    def search_similar_workflows(self, query_vector: List[float], limit: int = 5,
+                                 category_filter: Optional[str] = None, hydrate: bool = True) -> List[Dict[str, Any]]:
+        """Meklē līdzīgus workflow (tāda pati rezultātu forma kā Qdrant)"""
+        return self.search_many([query_vector], limit, category_filter, hydrate)[0]
+
+    def search_many(self, query_vectors: Sequence[List[float]], limit: int = 5,
+                    category_filter: Optional[str] = None, hydrate: bool = True) -> List[List[Dict[str, Any]]]:
+        """Meklē vairākiem vaicājuma vektoriem vienlaikus"""
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(len(query_vectors), self.vector_size)
+        batches = self._top_k(self._state, queries, limit, category_filter)
+        return [self.hydrate(results) if hydrate else results for results in batches]
+
+    def get_workflow_by_id(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Iegūst workflow pēc ID"""
+        state = self._state
+        row = state.row_by_id.get(workflow_id)
+        if row is None:
+            return None
+        hydrated = self.hydrate([{"id": workflow_id, "metadata": state.payloads[row]}])
+        return hydrated[0] if hydrated else None
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """Iegūst indeksa statistiku; `index_bytes` — meklēšanai atmiņā vajadzīgie vektoru baiti"""
+        state = self._state
+        full_bytes = len(state.ids) * self.vector_size * 4
+        return {
+            "total_workflows": len(state.ids),
+            "vector_size": self.vector_size,
+            "distance_metric": "Cosine",
+            "backend": "local-hnsw" if self._hnsw is not None else "local",
+            "quantization": self.quantization if state.codes is not None else None,
+            "index_bytes": state.codes.nbytes if state.codes is not None else full_bytes,
+            "full_precision_bytes": full_bytes
+        }
+
+
+def create_workflow_index(vector_size: int = EMBEDDING_SIZE, store: Optional[str] = None,
+                          index_path: str = DEFAULT_INDEX_PATH) -> WorkflowIndex:
+    """Izveido workflow vektoru krātuvi pēc VECTOR_STORE.
+
+    "qdrant" — Qdrant, bet, ja tas nav sasniedzams, lokālais indekss;
+    "local" — uzreiz lokālais indekss.
+    """
+    store = (store or DEFAULT_VECTOR_STORE).lower()
+    if store == "qdrant":
+        database = QdrantWorkflowDatabase(host=os.environ.get("QDRANT_HOST", "localhost"),
+                                          port=int(os.environ.get("QDRANT_PORT", 6333)),
+                                          vector_size=vector_size)
+        if database.initialize_collection():
+            return database
+        print("Qdrant nav pieejams — tiek lietots lokālais vektoru indekss")
+    elif store != "local":
+        raise ValueError(f"Nezināma vektoru krātuve: {store}")
+
+    index = LocalVectorIndex(index_path, vector_size=vector_size)
+    index.initialize_collection()
+    return index
@@ -0,0 +1,138 @@
+"""
+node_autocomplete.py
+
+Prefiksu autokomplete mezglu tipiem ("tele" → Telegram, Telegram Trigger).
+Indekss ir sakārtots atslēgu masīvs (name, display_name, īsais tips un
+display_name vārdi), prefiksa diapazonu atrod ar bisect, bet rezultātus
+ranžē pēc lietošanas biežuma. Indekss tiek būvēts vienreiz katrai kataloga
+versijai un dzīvo tikai atmiņā.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+# Augstākais BMP kods — prefiksa diapazona augšējā robeža
+_PREFIX_END = "\uffff"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _keys(node_id: str, name: str, display_name: str) -> set[str]:
+    """Visas atslēgas, pēc kurām mezglu var atrast ar prefiksu."""
+    keys = {_normalize(node_id), _normalize(name), _normalize(display_name)}
+    short_type = name.rsplit(".", 1)[-1]
+    keys.add(short_type.lower())
+    keys.add(_normalize(display_name).replace(" ", ""))
+    keys.update(word for word in re.findall(r"\w+", display_name.lower()) if len(word) > 1)
+    keys.discard("")
+    return keys
+
+
+class NodeUsage:
+    """Mezglu tipu lietošanas biežums (cik workflow tie izmantoti).
+
+    Šī ir procesa kopija; pastāvīgie skaitītāji glabājas datubāzē
+    (`NodeConfigurationDatabase.record_usage`) un tiek periodiski pārlādēti
+    ar `replace`, lai visi darbinieki ranžētu vienādi.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self.loaded_at: float = 0.0  # 0 — vēl nav ielādēts no DB
+
+    def record(self, node_types: Iterable[str]) -> None:
+        with self._lock:
+            self._counts.update(node_types)
+
+    def replace(self, counts: Dict[str, int]) -> None:
+        """Aizstāj skaitītājus ar datubāzē saglabātajiem."""
+        with self._lock:
+            self._counts = Counter(counts)
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self, max_age: float) -> bool:
+        return not self.loaded_at or time.monotonic() - self.loaded_at > max_age
+
+    def get(self, node_type: str) -> int:
+        return self._counts.get(node_type, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self.loaded_at = 0.0
+
+
+class AutocompleteIndex:
+    """Sakārtots (atslēga, node_id) masīvs vienai kataloga versijai."""
+
+    __slots__ = ("version", "_keys", "_node_ids")
+
+    def __init__(self, catalog) -> None:
+        entries = sorted(
+            (key, record.node_id)
+            for record in catalog
+            for key in _keys(record.node_id, record.name, record.display_name)
+        )
+        self.version: str = catalog.version
+        self._keys: List[str] = [key for key, _ in entries]
+        self._node_ids: List[str] = [node_id for _, node_id in entries]
+
+    def search(self, query: str, limit: int = 10, usage: Optional[NodeUsage] = None) -> List[str]:
+        """Atgriež līdz *limit* node_id, kuru kāda atslēga sākas ar *query*.
+
+        Secība: lietošanas biežums, tad precīza atslēgas sakritība, tad
+        īsākā atbilstošā atslēga, tad node_id.
+        """
+        prefix = _normalize(query)
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + _PREFIX_END, lo)
+
+        # Katram mezglam paturam labāko (īsāko) atbilstošo atslēgu
+        best: Dict[str, int] = {}
+        for i in range(lo, hi):
+            node_id = self._node_ids[i]
+            length = len(self._keys[i])
+            if length < best.get(node_id, length + 1):
+                best[node_id] = length
+
+        plen = len(prefix)
+        return heapq.nsmallest(
+            limit,
+            best,
+            key=lambda node_id: (
+                -(usage.get(node_id) if usage else 0),
+                best[node_id] != plen,
+                best[node_id],
+                node_id,
+            ),
+        )
+
+
+# Procesa mēroga lietošanas statistika un indekss pēdējai kataloga versijai
+node_usage = NodeUsage()
+_index: Optional[AutocompleteIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index(catalog) -> AutocompleteIndex:
+    """Indekss dotajai kataloga versijai; pārbūvē tikai, ja versija mainījusies."""
+    global _index
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            if _index is None or _index.version != catalog.version:
+                _index = AutocompleteIndex(catalog)
+            index = _index
+    return index
@@ -0,0 +1,363 @@
+"""
+node_catalog.py
+
+Nemainīgs (read-only) n8n mezglu kataloga momentuzņēmums procesa atmiņā.
+Validācija un mezglu saraksti lasa tikai no šejienes, nevis no SQLite.
+Pēc katras ielādes tiek uzbūvēts jauns momentuzņēmums un atomiski nomainīts
+pret veco — lasītāji vienmēr redz vienu konsekventu versiju.
+
+Katalogu var arī saglabāt vienā bināra formāta failā (`write_snapshot`), ko
+darbinieki atver ar mmap (`MappedNodeCatalog`) — lapas tiek koplietotas starp
+procesiem un startā nav jāparsē ne JSON, ne jālasa SQLite.
+
+Modulis apzināti nezina neko par SQLAlchemy; rindas tam padod
+`NodeConfigurationDatabase.reload_catalog()`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+# Lauku secība — tāda pati kā `NodeDefinition.to_dict()` (bez json_data)
+RECORD_FIELDS: tuple[str, ...] = (
+    "node_id",
+    "name",
+    "display_name",
+    "description",
+    "category",
+    "subcategory",
+    "icon",
+    "version",
+)
+
+
+class NodeRecord:
+    """Kompakts, nemainīgs mezgla ieraksts (bez __dict__)."""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(
+        self,
+        node_id: str,
+        name: str,
+        display_name: str,
+        description: Optional[str] = "",
+        category: Optional[str] = "",
+        subcategory: Optional[str] = "",
+        icon: Optional[str] = "",
+        version: Optional[str] = "",
+    ) -> None:
+        set_ = object.__setattr__
+        set_(self, "node_id", node_id)
+        set_(self, "name", name)
+        set_(self, "display_name", display_name)
+        set_(self, "description", description or "")
+        set_(self, "category", category or "")
+        set_(self, "subcategory", subcategory or "")
+        set_(self, "icon", icon or "")
+        set_(self, "version", version or "")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("NodeRecord ir nemainīgs")
+
+    def __repr__(self) -> str:
+        return f"<NodeRecord {self.node_id}>"
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, field) for field in RECORD_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+
+class NodeCatalog:
+    """Viena kataloga versija: O(1) uzmeklēšana pēc node_id un sakārtots saraksts.
+
+    `version` ir satura hash — vienāds katalogs dod vienādu versiju arī
+    dažādos procesos (noder ETag un kešu invalidācijai).
+    """
+
+    __slots__ = ("version", "loaded_at", "_by_id", "_ids")
+
+    def __init__(self, records: Iterable[NodeRecord]) -> None:
+        by_id = {record.node_id: record for record in records}
+        ids = tuple(sorted(by_id))
+
+        digest = hashlib.sha1()
+        for node_id in ids:
+            digest.update(repr(by_id[node_id].as_tuple()).encode("utf-8"))
+            digest.update(b"\0")
+
+        self._by_id: Dict[str, NodeRecord] = by_id
+        self._ids: tuple[str, ...] = ids
+        self.version: str = digest.hexdigest()[:16]
+        self.loaded_at: float = time.time()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "NodeCatalog":
+        """Rindas `RECORD_FIELDS` secībā → katalogs."""
+        return cls(NodeRecord(*row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._by_id
+
+    def __iter__(self) -> Iterator[NodeRecord]:
+        by_id = self._by_id
+        return (by_id[node_id] for node_id in self._ids)
+
+    def get(self, node_id: str) -> Optional[NodeRecord]:
+        return self._by_id.get(node_id)
+
+    @property
+    def ids(self) -> tuple[str, ...]:
+        """Visi node_id augošā secībā."""
+        return self._ids
+
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        ids = self._ids if limit is None else self._ids[:limit]
+        return [self._by_id[node_id].to_dict() for node_id in ids]
+
+    def page(self, after: Optional[str], limit: int) -> tuple[List[NodeRecord], Optional[str]]:
+        """Keyset lapa: līdz *limit* ierakstiem ar node_id > *after*.
+
+        Atgriež (ieraksti, nākamais kursors); kursors ir *None* pēdējā lapā.
+        """
+        start = bisect.bisect_right(self._ids, after) if after else 0
+        ids = self._ids[start:start + limit]
+        next_cursor = ids[-1] if ids and start + limit < len(self._ids) else None
+        return [self._by_id[node_id] for node_id in ids], next_cursor
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Binārais momentuzņēmums (mmap)
+# ────────────────────────────────────────────────────────────────────────────────
+#
+#  Faila izkārtojums (little-endian):
+#    galvene   magic[8] | formāts u16 | lauku skaits u16 | versija[16] | ierakstu skaits u32
+#              | ierakstu tabulas nobīde u64 | virkņu tabulas nobīde u64
+#    ieraksti  fiksēta platuma: katram laukam (nobīde u32, garums u32) virkņu tabulā;
+#              sakārtoti pēc node_id baitiem, tāpēc tabula kalpo arī kā nobīžu
+#              indekss bināram meklējumam
+#    virknes   UTF-8 baiti bez atdalītājiem; vienādas virknes glabājas vienreiz
+
+SNAPSHOT_MAGIC = b"N8NCATLG"
+SNAPSHOT_FORMAT = 1
+_HEADER = struct.Struct("<8sHH16sIQQ")
+_RECORD = struct.Struct("<" + "II" * len(RECORD_FIELDS))
+
+
+def write_snapshot(catalog: "Catalog", path: str) -> int:
+    """Saglabā katalogu bināra momentuzņēmuma failā; atgriež faila izmēru baitos.
+
+    Ieraksts notiek pagaidu failā un tiek atomiski pārdēvēts, tāpēc darbinieki,
+    kas vecāko failu jau atvēruši ar mmap, netiek ietekmēti.
+    """
+    strings: Dict[str, tuple[int, int]] = {}
+    blob = bytearray()
+    records = bytearray()
+
+    def intern(value: str) -> tuple[int, int]:
+        ref = strings.get(value)
+        if ref is None:
+            data = value.encode("utf-8")
+            ref = strings[value] = (len(blob), len(data))
+            blob.extend(data)
+        return ref
+
+    # Kārto pēc UTF-8 baitiem — tā salīdzina arī lasītājs
+    ordered = sorted(catalog, key=lambda record: record.node_id.encode("utf-8"))
+    for record in ordered:
+        refs: List[int] = []
+        for value in record.as_tuple():
+            refs.extend(intern(value))
+        records.extend(_RECORD.pack(*refs))
+
+    records_offset = _HEADER.size
+    strings_offset = records_offset + len(records)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT,
+        len(RECORD_FIELDS),
+        catalog.version.encode("ascii")[:16],
+        len(ordered),
+        records_offset,
+        strings_offset,
+    )
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as fh:
+        fh.write(header)
+        fh.write(records)
+        fh.write(blob)
+    os.replace(tmp_path, path)
+    return strings_offset + len(blob)
+
+
+class MappedNodeCatalog:
+    """Tikai lasāms katalogs virs mmap momentuzņēmuma; ieraksti tiek dekodēti pēc pieprasījuma.
+
+    Publiskā saskarne sakrīt ar `NodeCatalog`.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Atver momentuzņēmumu; bojātam vai nepilnīgam failam — ValueError (izsaucējs lasa DB)."""
+        self.path = path
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} ir tukšs vai saīsināts (nav pilnas galvenes)")
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            version, count, records_offset, strings_offset = self._validate()
+        except ValueError:
+            self._mm.close()
+            raise
+
+        self.version: str = version
+        self.loaded_at: float = time.time()
+        self._count = count
+        self._records_offset = records_offset
+        self._strings_offset = strings_offset
+        self._ids: Optional[tuple[str, ...]] = None
+
+    def _validate(self) -> tuple[str, int, int, int]:
+        """Pārbauda galveni, tabulu robežas un visas virkņu atsauces pret faila izmēru."""
+        size = len(self._mm)
+        magic, fmt, field_count, version, count, records_offset, strings_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT or field_count != len(RECORD_FIELDS):
+            raise ValueError(f"{self.path} nav saderīgs kataloga momentuzņēmums")
+        if records_offset != _HEADER.size or strings_offset != records_offset + count * _RECORD.size:
+            raise ValueError(f"{self.path}: ierakstu tabulas robežas neatbilst galvenei")
+        if strings_offset > size:
+            raise ValueError(f"{self.path} ir saīsināts ({size} baiti, gaidīti vismaz {strings_offset})")
+        strings_size = size - strings_offset
+        table = memoryview(self._mm)[records_offset:strings_offset]
+        try:
+            for refs in _RECORD.iter_unpack(table):
+                if any(refs[i] + refs[i + 1] > strings_size for i in range(0, len(refs), 2)):
+                    raise ValueError(f"{self.path}: virkņu atsauce ārpus faila (saīsināts?)")
+        finally:
+            table.release()
+        try:
+            return version.rstrip(b"\0").decode("ascii"), count, records_offset, strings_offset
+        except UnicodeDecodeError:
+            raise ValueError(f"{self.path}: nederīga versija galvenē") from None
+
+    def close(self) -> None:
+        self._mm.close()
+
+    # — zema līmeņa piekļuve —
+
+    def _refs(self, index: int) -> tuple:
+        return _RECORD.unpack_from(self._mm, self._records_offset + index * _RECORD.size)
+
+    def _node_id_bytes(self, index: int) -> bytes:
+        offset, length = _RECORD.unpack_from(self._mm, self._records_offset + index * _RECORD.size)[:2]
+        start = self._strings_offset + offset
+        return self._mm[start:start + length]
+
+    def _record(self, index: int) -> NodeRecord:
+        refs = self._refs(index)
+        base = self._strings_offset
+        mm = self._mm
+        values = [
+            mm[base + refs[i]:base + refs[i] + refs[i + 1]].decode("utf-8")
+            for i in range(0, len(refs), 2)
+        ]
+        return NodeRecord(*values)
+
+    def _bisect_left(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._node_id_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, node_id: str) -> int:
+        key = node_id.encode("utf-8")
+        index = self._bisect_left(key)
+        return index if index < self._count and self._node_id_bytes(index) == key else -1
+
+    # — NodeCatalog saskarne —
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and self._find(node_id) >= 0
+
+    def __iter__(self) -> Iterator[NodeRecord]:
+        return (self._record(index) for index in range(self._count))
+
+    def get(self, node_id: str) -> Optional[NodeRecord]:
+        index = self._find(node_id)
+        return self._record(index) if index >= 0 else None
+
+    @property
+    def ids(self) -> tuple[str, ...]:
+        if self._ids is None:
+            self._ids = tuple(self._node_id_bytes(i).decode("utf-8") for i in range(self._count))
+        return self._ids
+
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        stop = self._count if limit is None else min(limit, self._count)
+        return [self._record(index).to_dict() for index in range(stop)]
+
+    def page(self, after: Optional[str], limit: int) -> tuple[List[NodeRecord], Optional[str]]:
+        start = 0
+        if after:
+            key = after.encode("utf-8")
+            start = self._bisect_left(key)
+            if start < self._count and self._node_id_bytes(start) == key:
+                start += 1
+        stop = min(start + limit, self._count)
+        records = [self._record(index) for index in range(start, stop)]
+        next_cursor = records[-1].node_id if records and stop < self._count else None
+        return records, next_cursor
+
+
+Catalog = Union[NodeCatalog, MappedNodeCatalog]
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+#  Procesa mēroga aktīvais katalogs
+# ────────────────────────────────────────────────────────────────────────────────
+
+_current: Optional[Catalog] = None
+# Iepriekšējais mmap katalogs: tiek aizvērts nākamajā nomaiņā, nevis uzreiz,
+# jo pieprasījumi, kas to paņēma pirms nomaiņas, var to vēl lasīt
+_retired: Optional[MappedNodeCatalog] = None
+_swap_lock = threading.Lock()
+
+
+def current_catalog() -> Optional[Catalog]:
+    """Atgriež aktīvo momentuzņēmumu vai *None*, ja tas vēl nav ielādēts."""
+    return _current
+
+
+def swap_catalog(catalog: Catalog) -> Catalog:
+    """Atomiski nomaina aktīvo katalogu; veco turpina lietot tie, kam tas jau ir rokās.
+
+    Aizstātā mmap kartēšana tiek aizvērta vienu nomaiņu vēlāk (atvērtas ir
+    ne vairāk kā divas).
+    """
+    global _current, _retired
+    with _swap_lock:
+        previous, _current = _current, catalog
+        if _retired is not None and _retired is not catalog:
+            _retired.close()
+        _retired = previous if isinstance(previous, MappedNodeCatalog) and previous is not catalog else None
+    return catalog
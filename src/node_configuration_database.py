@@ -8,12 +8,65 @@ vaicājumu slāni MCP aģentam. Tas izmanto jau inicializēto `db` objektu no
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects import postgresql, sqlite
 
 from src.extensions import db  # jau inicializētais Flask‑SQLAlchemy objekts
+from src.node_autocomplete import get_index, node_usage
+from src.node_catalog import (
+    RECORD_FIELDS,
+    Catalog,
+    MappedNodeCatalog,
+    NodeCatalog,
+    NodeRecord,
+    current_catalog,
+    swap_catalog,
+    write_snapshot,
+)
+from src.node_parsing import iter_json_files, parallel_parse
+from src.node_validation import NodeValidator, ParameterRule
+
+# Kolonnu secība normalizētajām rindām (tuple), ko izmanto masveida ielāde
+NODE_ROW_FIELDS: tuple[str, ...] = (
+    "node_id",
+    "name",
+    "display_name",
+    "description",
+    "category",
+    "subcategory",
+    "icon",
+    "version",
+    "json_data",
+)
+
+# Kolonnu secība normalizētajām parametru rindām (`node_parameters`)
+PARAMETER_ROW_FIELDS: tuple[str, ...] = (
+    "node_id",
+    "position",
+    "name",
+    "type",
+    "required",
+    "default_value",
+    "options",
+    "display_options",
+)
+
+# Binārā kataloga momentuzņēmuma ceļš (skat. `flask build-catalog`)
+DEFAULT_SNAPSHOT_PATH = os.environ.get("NODE_CATALOG_SNAPSHOT", "database/node_catalog.bin")
+
+# Cik sekundes procesa lietošanas skaitītāju kopija drīkst atšķirties no DB
+USAGE_REFRESH_SECONDS = float(os.environ.get("NODE_USAGE_REFRESH_SECONDS", "60"))
+
+# Dialekti, kuriem ir `INSERT ... ON CONFLICT DO UPDATE`
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
 
 # ────────────────────────────────────────────────────────────────────────────────
 #  SQLAlchemy modeļi
@@ -33,7 +86,9 @@ class NodeDefinition(db.Model):
     subcategory = db.Column(db.String(128))
     icon = db.Column(db.String(256))
     version = db.Column(db.String(32))
-    json_data = db.Column(db.Text, nullable=False)  # pilnais .json — noder preview
+    # pilnais .json — noder preview; atlikts (deferred), lai saraksti un meklēšana
+    # to nevelk cauri ORM. Lasa ar `NodeConfigurationDatabase.get_definition_json`.
+    json_data = db.deferred(db.Column(db.Text, nullable=False))
 
     # — helpers —
     def to_dict(self) -> Dict[str, Any]:
@@ -49,6 +104,252 @@ class NodeDefinition(db.Model):
         }
 
 
+class NodeParameter(db.Model):
+    """Mezgla `properties` masīvs normalizētā formā — avots kompilētajiem validatoriem."""
+
+    __tablename__ = "node_parameters"
+
+    id = db.Column(db.Integer, primary_key=True)
+    node_id = db.Column(db.String(255), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)  # secība `properties` masīvā
+    name = db.Column(db.String(255), nullable=False)
+    type = db.Column(db.String(64))
+    required = db.Column(db.Boolean, nullable=False, default=False)
+    default_value = db.Column(db.Text)  # JSON
+    options = db.Column(db.Text)  # JSON saraksts ar atļautajām vērtībām (options/multiOptions)
+    display_options = db.Column(db.Text)  # JSON {"show": {...}, "hide": {...}}
+
+
+# ── FTS5 pilnteksta indekss (tikai SQLite) ─────────────────────────────────────
+#  Ārējā satura (external content) tabula: teksts glabājas tikai node_definitions,
+#  indekss tiek uzturēts ar trigeriem, tāpēc arī ON CONFLICT/bulk DELETE to atjauno.
+
+FTS_TABLE = "node_definitions_fts"
+# bm25 svari kolonnām: name, display_name, description, category
+_FTS_WEIGHTS = (10.0, 8.0, 1.0, 2.0)
+_FTS_COLUMNS = "name, display_name, description, category"
+
+_FTS_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_FTS_COLUMNS},
+        content='node_definitions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS node_definitions_fts_ai AFTER INSERT ON node_definitions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.display_name, new.description, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS node_definitions_fts_ad AFTER DELETE ON node_definitions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.display_name, old.description, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS node_definitions_fts_au AFTER UPDATE ON node_definitions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.display_name, old.description, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.display_name, new.description, new.category);
+    END""",
+)
+
+for _ddl in _FTS_DDL:
+    event.listen(NodeDefinition.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+
+# Dzinēji (pēc URL), kuriem FTS indekss jau pārbaudīts
+_fts_ready: Dict[str, bool] = {}
+
+
+def _fts_query(text_value: str) -> str:
+    """Lietotāja teksts → FTS5 vaicājums: katrs vārds kā prefikss, visi obligāti."""
+    terms = re.findall(r"\w+", text_value.lower())
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class _ValidatorCache:
+    """Kompilētie validatori pa mezgla tipiem.
+
+    Tiek iztukšots, mainoties kataloga versijai, un katrā kataloga pārlādē —
+    versija ietver tikai `RECORD_FIELDS`, tāpēc izmaiņas tikai `properties`
+    (parametru shēmā) to nemaina.
+    """
+
+    def __init__(self) -> None:
+        self.version: Optional[str] = None
+        self.validators: Dict[str, NodeValidator] = {}
+
+    def for_version(self, version: str) -> Dict[str, NodeValidator]:
+        if self.version != version:
+            self.validators = {}
+            self.version = version
+        return self.validators
+
+    def clear(self) -> None:
+        self.version = None
+        self.validators = {}
+
+
+_validator_cache = _ValidatorCache()
+
+
+MANIFEST_FIELDS = ("path", "mtime", "size", "content_hash", "node_id")
+
+
+class NodeUsageCount(db.Model):
+    """Pastāvīgs mezglu tipu lietošanas skaitītājs autokompletes ranžēšanai."""
+
+    __tablename__ = "node_usage"
+
+    node_id = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class NodeCatalogState(db.Model):
+    """Pēdējās no DB ielādētās kataloga versijas ieraksts (viena rinda).
+
+    Ar to darbinieka starts pārbauda, vai binārais momentuzņēmums nav vecāks
+    par datubāzi.
+    """
+
+    __tablename__ = "node_catalog_state"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(16), nullable=False)
+
+
+class NodeFileManifest(db.Model):
+    """Ielādēto failu manifests inkrementālai atjaunināšanai (skat. `refresh_from_folder`)."""
+
+    __tablename__ = "node_file_manifest"
+
+    path = db.Column(db.String(1024), primary_key=True)  # relatīvs pret kataloga sakni
+    mtime = db.Column(db.Float, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)  # sha256 hex
+    node_id = db.Column(db.String(255), index=True)  # None — fails nav derīgs mezgls
+
+
+def _upsert_statement(table, key: str, fields: tuple[str, ...]):
+    """`INSERT ... ON CONFLICT (key) DO UPDATE` pašreizējam dialektam."""
+    stmt = _UPSERT_DIALECTS[db.engine.dialect.name](table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c[key]],
+        set_={field: stmt.excluded[field] for field in fields if field != key},
+    )
+
+
+def _node_row(data: Dict[str, Any]) -> Optional[tuple]:
+    """Normalizē vienu mezgla JSON par rindu `NODE_ROW_FIELDS` secībā.
+
+    Atgriež *None*, ja nav pamata identifikatora.
+    """
+    node_id: str | None = data.get("name") or data.get("node_id")
+    if not node_id:
+        return None
+
+    name = data.get("name", node_id)
+    group_val = data.get("group", [])
+    if isinstance(group_val, list):
+        category = group_val[0] if group_val else ""
+    else:
+        category = str(group_val)
+
+    return (
+        node_id,
+        name,
+        data.get("displayName", name.title()),
+        data.get("description", ""),
+        category,
+        str(data.get("subcategory", "")),
+        data.get("icon", ""),
+        str(data.get("version", 1)),
+        json.dumps(data, ensure_ascii=False),
+    )
+
+
+def _parameter_rows(node_id: str, data: Dict[str, Any]) -> List[tuple]:
+    """`properties` masīvs → rindas `PARAMETER_ROW_FIELDS` secībā."""
+    props = data.get("properties")
+    if not isinstance(props, list):
+        return []
+
+    rows: List[tuple] = []
+    for position, prop in enumerate(props):
+        if not isinstance(prop, dict) or not prop.get("name"):
+            continue
+        ptype = str(prop.get("type", ""))
+        options = None
+        if ptype in ("options", "multiOptions") and isinstance(prop.get("options"), list):
+            values = [opt["value"] for opt in prop["options"] if isinstance(opt, dict) and "value" in opt]
+            options = json.dumps(values, ensure_ascii=False)
+        display = prop.get("displayOptions")
+        rows.append((
+            node_id,
+            position,
+            str(prop["name"]),
+            ptype,
+            bool(prop.get("required", False)),
+            json.dumps(prop.get("default"), ensure_ascii=False),
+            options,
+            json.dumps(display, ensure_ascii=False) if isinstance(display, dict) else None,
+        ))
+    return rows
+
+
+def _node_entry(data: Dict[str, Any]) -> Optional[tuple[tuple, List[tuple]]]:
+    """Mezgla JSON → (mezgla rinda, parametru rindas) vai *None*."""
+    row = _node_row(data)
+    return (row, _parameter_rows(row[0], data)) if row is not None else None
+
+
+def _read_definition(fpath: str, log: Optional[logging.Logger] = None) -> Optional[Dict[str, Any]]:
+    """Nolasa vienu failu; bojātiem failiem un sarakstiem atgriež *None*."""
+    try:
+        with open(fpath, "r", encoding="utf-8") as fh:
+            parsed = json.load(fh)
+    except Exception as exc:  # noqa: BLE001
+        (log or logging.getLogger(__name__)).warning("[node‑loader] Nelasāms %s → %s", fpath, exc)
+        return None
+
+    # Ignorē sarakstus (dažos failos ir iekšējie resursi, nevis mezgli)
+    if not isinstance(parsed, dict):
+        return None
+    return parsed
+
+
+def _parse_node_file(fpath: str) -> Optional[tuple[tuple, List[tuple]]]:
+    """Procesu pūla darbinieks: fails → (mezgla rinda, parametru rindas) vai *None*."""
+    parsed = _read_definition(fpath)
+    return _node_entry(parsed) if parsed is not None else None
+
+
+def _scan_node_file(item: tuple[str, Optional[str]]) -> tuple:
+    """Procesu pūla darbinieks manifesta atjaunināšanai.
+
+    *item* ir (ceļš, iepriekšējais hash). Ja saturs nav mainījies, JSON netiek
+    parsēts un atgrieztais ieraksts ir *None* ar `changed=False`.
+    Atgriež (ceļš, mtime, size, content_hash, (rinda, parametri) | None, changed).
+    """
+    fpath, known_hash = item
+    try:
+        st = os.stat(fpath)
+        with open(fpath, "rb") as fh:
+            raw = fh.read()
+    except OSError as exc:
+        logging.getLogger(__name__).warning("[node‑loader] Nelasāms %s → %s", fpath, exc)
+        return fpath, 0.0, 0, "", None, True
+
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash:
+        return fpath, st.st_mtime, st.st_size, content_hash, None, False
+
+    try:
+        parsed = json.loads(raw.decode("utf-8"))
+    except Exception as exc:  # noqa: BLE001
+        logging.getLogger(__name__).warning("[node‑loader] Nelasāms %s → %s", fpath, exc)
+        parsed = None
+    entry = _node_entry(parsed) if isinstance(parsed, dict) else None
+    return fpath, st.st_mtime, st.st_size, content_hash, entry, True
+
+
 # ────────────────────────────────────────────────────────────────────────────────
 #  Galvenā API klase
 # ────────────────────────────────────────────────────────────────────────────────
@@ -58,79 +359,368 @@ class NodeConfigurationDatabase:  # ← LABOJUMS: nosaukums mainīts no NodeConf
 
     def __init__(self, logger: Optional[logging.Logger] = None) -> None:
         self.log = logger or logging.getLogger(__name__)
+        self.last_load_stats: Dict[str, Any] = {}
 
     # ── Ielāde ────────────────────────────────────────────────────────────────
 
     def _upsert_single(self, data: Dict[str, Any]) -> bool:
         """Ievieto vai atjaunina vienu mezglu; atgriež *True*, ja ielāde veiksmīga."""
 
-        node_id: str | None = data.get("name") or data.get("node_id")
-        if not node_id:
+        entry = _node_entry(data)
+        if entry is None:
             return False  # ─ nav pamata identifikatora
 
-        instance: NodeDefinition | None = NodeDefinition.query.filter_by(node_id=node_id).first()
+        row, params = entry
+        values = dict(zip(NODE_ROW_FIELDS, row))
+        instance: NodeDefinition | None = NodeDefinition.query.filter_by(node_id=values["node_id"]).first()
         if instance is None:
-            instance = NodeDefinition(node_id=node_id)
+            instance = NodeDefinition(node_id=values["node_id"])
             db.session.add(instance)
 
-        # — pamata laukiem ņem drošāko pieejamo vērtību —
-        instance.name = data.get("name", node_id)
-        instance.display_name = data.get("displayName", instance.name.title())
-        instance.description = data.get("description", "")
-
-        group_val = data.get("group", [])
-        if isinstance(group_val, list):
-            instance.category = group_val[0] if group_val else ""
-        else:
-            instance.category = str(group_val)
-
-        instance.subcategory = str(data.get("subcategory", ""))
-        instance.icon = data.get("icon", "")
-        instance.version = str(data.get("version", 1))
-        instance.json_data = json.dumps(data, ensure_ascii=False)
+        for field, value in values.items():
+            setattr(instance, field, value)
+        self._replace_parameters([values["node_id"]], params)
         return True
 
-    def load_from_folder(self, folder: str) -> tuple[int, int]:
+    def _replace_parameters(self, node_ids: List[str], params: List[tuple]) -> None:
+        """Aizvieto *node_ids* parametru rindas ar *params* (DELETE + INSERT partijā)."""
+        db.session.execute(db.delete(NodeParameter).where(NodeParameter.node_id.in_(node_ids)))
+        if params:
+            db.session.execute(
+                db.insert(NodeParameter),
+                [dict(zip(PARAMETER_ROW_FIELDS, param)) for param in params],
+            )
+
+    def _bulk_upsert(self, entries: List[tuple[tuple, List[tuple]]], existing: set[str]) -> tuple[int, int]:
+        """Ieraksta vienu partiju ar `INSERT ... ON CONFLICT DO UPDATE`.
+
+        *entries* ir (mezgla rinda, parametru rindas) pāri. *existing* ir jau
+        zināmo `node_id` kopa — to atjaunina uz vietas, lai nevajadzētu
+        atsevišķu SELECT katram failam. Atgriež (new, updated).
+        """
+        # Vienā partijā tas pats node_id drīkst parādīties tikai vienreiz
+        # (PostgreSQL to neatļauj); uzvar pēdējais failu ceļu secībā, tāpat kā
+        # secīgā ielādē (`parallel_parse` saglabā `iter_json_files` secību).
+        unique = {row[0]: (row, params) for row, params in entries}
+        values = [dict(zip(NODE_ROW_FIELDS, row)) for row, _params in unique.values()]
+
+        db.session.execute(_upsert_statement(NodeDefinition.__table__, "node_id", NODE_ROW_FIELDS), values)
+        self._replace_parameters(list(unique), [p for _row, params in unique.values() for p in params])
+
+        new = sum(1 for node_id in unique if node_id not in existing)
+        existing.update(unique)
+        return new, len(unique) - new
+
+    @staticmethod
+    def _upsert_manifest(rows: List[Dict[str, Any]]) -> None:
+        """Ieraksta `NodeFileManifest` rindas (path, mtime, size, content_hash, node_id)."""
+        if rows:
+            db.session.execute(
+                _upsert_statement(NodeFileManifest.__table__, "path", MANIFEST_FIELDS),
+                rows,
+            )
+
+    def load_from_folder(
+        self,
+        folder: str,
+        bulk: bool = True,
+        batch_size: int = 500,
+        workers: Optional[int] = None,
+    ) -> tuple[int, int]:
         """Rekursīvi lasa visus *.json failus mapē, ignorējot bojātos.
 
+        Ar *bulk* (noklusējums) faili tiek parsēti paralēli *workers* procesos
+        (noklusējums — CPU kodolu skaits), esošie `node_id` tiek nolasīti vienreiz
+        un rindas tiek rakstītas partijās vienā transakcijā, kopā ar
+        `NodeFileManifest` rindām (nākamā `refresh_from_folder` neparsē visu
+        mapi no jauna); citādi — secīgi pa vienam ORM objektam.
         Atgriež (inserted_count, skipped_count).
         """
-        inserted = skipped = 0
-        for root, _dirs, files in os.walk(folder):
-            for fname in files:
-                if not fname.endswith(".json"):
-                    continue
-                fpath = os.path.join(root, fname)
-                try:
-                    with open(fpath, "r", encoding="utf-8") as fh:
-                        parsed = json.load(fh)
-                except Exception as exc:  # noqa: BLE001
-                    self.log.warning("[node‑loader] Nelasāms %s → %s", fpath, exc)
-                    skipped += 1
-                    continue
+        if bulk and db.engine.dialect.name not in _UPSERT_DIALECTS:
+            self.log.info("[node‑loader] %s neatbalsta ON CONFLICT, lieto secīgu ielādi", db.engine.dialect.name)
+            bulk = False
+
+        started = time.perf_counter()
+        inserted = skipped = new = updated = 0
+        try:
+            if bulk:
+                existing = set(db.session.scalars(db.select(NodeDefinition.node_id)))
+                batch: List[tuple[tuple, List[tuple]]] = []
+                manifest_rows: List[Dict[str, Any]] = []
+                scan = ((fpath, None) for fpath in iter_json_files(folder))
+                for fpath, mtime, size, content_hash, entry, _changed in parallel_parse(
+                    scan, _scan_node_file, workers=workers
+                ):
+                    if content_hash:
+                        manifest_rows.append({
+                            "path": os.path.relpath(fpath, folder).replace(os.sep, "/"),
+                            "mtime": mtime, "size": size, "content_hash": content_hash,
+                            "node_id": entry[0][0] if entry is not None else None,
+                        })
+                    if entry is None:
+                        skipped += 1
+                    else:
+                        batch.append(entry)
+                        inserted += 1
+                    if len(batch) >= batch_size or len(manifest_rows) >= batch_size:
+                        n, u = self._bulk_upsert(batch, existing) if batch else (0, 0)
+                        new, updated = new + n, updated + u
+                        self._upsert_manifest(manifest_rows)
+                        batch.clear()
+                        manifest_rows.clear()
+
+                if batch:
+                    n, u = self._bulk_upsert(batch, existing)
+                    new, updated = new + n, updated + u
+                self._upsert_manifest(manifest_rows)
+            else:
+                for fpath in iter_json_files(folder):
+                    parsed = _read_definition(fpath, self.log)
+                    if parsed is not None and self._upsert_single(parsed):
+                        inserted += 1
+                    else:
+                        skipped += 1
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.reload_catalog()
+
+        elapsed = time.perf_counter() - started
+        rate = inserted / elapsed if elapsed > 0 else float(inserted)
+        self.last_load_stats = {
+            "inserted": inserted,
+            "skipped": skipped,
+            "new": new,
+            "updated": updated,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rate, 1),
+        }
+        self.log.info(
+            "[node‑loader] Ielādēti %s mezgli (%s jauni, %s atjaunināti), izlaisti %s faili; %.1f rindas/s",
+            inserted, new, updated, skipped, rate,
+        )
+        return inserted, skipped
 
-                # Ignorē sarakstus (dažos failos ir iekšējie resursi, nevis mezgli)
-                if isinstance(parsed, list):
-                    skipped += 1
+    def refresh_from_folder(
+        self,
+        folder: str,
+        batch_size: int = 500,
+        workers: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Inkrementāli sinhronizē katalogu ar mapi, izmantojot `NodeFileManifest`.
+
+        Faili ar nemainītu (mtime, size) netiek pat atvērti; mainītiem tiek
+        salīdzināts satura hash, un tikai patiesi mainītie tiek parsēti un
+        ierakstīti. Mezgli, kuru faili pazuduši, tiek dzēsti.
+        Atgriež statistiku: added, changed, unchanged, deleted, skipped.
+        """
+        if db.engine.dialect.name not in _UPSERT_DIALECTS:
+            raise RuntimeError(f"{db.engine.dialect.name} neatbalsta ON CONFLICT inkrementālai ielādei")
+
+        started = time.perf_counter()
+        stats = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0, "skipped": 0}
+        manifest = {m.path: m for m in NodeFileManifest.query.all()}
+
+        # 1) Salīdzina failu sistēmu ar manifestu tikai pēc stat()
+        on_disk: Dict[str, str] = {}
+        to_scan: List[tuple[str, Optional[str]]] = []
+        for fpath in iter_json_files(folder):
+            rel = os.path.relpath(fpath, folder).replace(os.sep, "/")
+            on_disk[rel] = fpath
+            entry = manifest.get(rel)
+            try:
+                st = os.stat(fpath)
+            except OSError:
+                continue
+            if entry is not None and entry.mtime == st.st_mtime and entry.size == st.st_size:
+                stats["unchanged"] += 1
+                continue
+            to_scan.append((fpath, entry.content_hash if entry is not None else None))
+
+        try:
+            # 2) Parsē tikai jaunos/mainītos failus
+            existing = set(db.session.scalars(db.select(NodeDefinition.node_id)))
+            orphaned: set[str] = set()
+            entries: List[tuple[tuple, List[tuple]]] = []
+            manifest_rows: List[Dict[str, Any]] = []
+            for fpath, mtime, size, content_hash, parsed, changed in parallel_parse(
+                to_scan, _scan_node_file, workers=workers
+            ):
+                rel = os.path.relpath(fpath, folder).replace(os.sep, "/")
+                entry = manifest.get(rel)
+                if not content_hash:
+                    stats["skipped"] += 1
                     continue
 
-                if self._upsert_single(parsed):
-                    inserted += 1
+                node_id = parsed[0][0] if parsed is not None else None
+                if changed:
+                    if parsed is None:
+                        stats["skipped"] += 1
+                    else:
+                        entries.append(parsed)
+                        stats["changed" if entry is not None else "added"] += 1
+                    if entry is not None and entry.node_id and entry.node_id != node_id:
+                        orphaned.add(entry.node_id)
                 else:
-                    skipped += 1
-
-        db.session.commit()
-        self.log.info("[node‑loader] Ielādēti %s mezgli, izlaisti %s faili", inserted, skipped)
-        return inserted, skipped
+                    node_id = entry.node_id  # tikai mtime mainījies (piem., git checkout)
+                    stats["unchanged"] += 1
+
+                manifest_rows.append({
+                    "path": rel, "mtime": mtime, "size": size,
+                    "content_hash": content_hash, "node_id": node_id,
+                })
+
+            for start in range(0, len(entries), batch_size):
+                self._bulk_upsert(entries[start:start + batch_size], existing)
+            for start in range(0, len(manifest_rows), batch_size):
+                self._upsert_manifest(manifest_rows[start:start + batch_size])
+
+            # 3) Dzēš pazudušos failus un mezglus, ko neviens fails vairs nedefinē
+            gone = [path for path in manifest if path not in on_disk]
+            for start in range(0, len(gone), batch_size):
+                chunk = gone[start:start + batch_size]
+                orphaned.update(manifest[p].node_id for p in chunk if manifest[p].node_id)
+                NodeFileManifest.query.filter(NodeFileManifest.path.in_(chunk)).delete(synchronize_session=False)
+
+            if orphaned:
+                still_defined = set(db.session.scalars(
+                    db.select(NodeFileManifest.node_id).where(NodeFileManifest.node_id.in_(orphaned))
+                ))
+                doomed = list(orphaned - still_defined)
+                for start in range(0, len(doomed), batch_size):
+                    chunk = doomed[start:start + batch_size]
+                    stats["deleted"] += NodeDefinition.query.filter(
+                        NodeDefinition.node_id.in_(chunk)
+                    ).delete(synchronize_session=False)
+                    self._replace_parameters(chunk, [])
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if stats["added"] or stats["changed"] or stats["deleted"]:
+            self.reload_catalog()
+
+        self.last_load_stats = {**stats, "seconds": round(time.perf_counter() - started, 3)}
+        self.log.info(
+            "[node‑loader] Atjaunināts: %s jauni, %s mainīti, %s nemainīti, %s dzēsti, %s izlaisti",
+            stats["added"], stats["changed"], stats["unchanged"], stats["deleted"], stats["skipped"],
+        )
+        return stats
+
+    # ── Atmiņas katalogs ──────────────────────────────────────────────────────
+
+    def reload_catalog(self) -> NodeCatalog:
+        """Nolasa katalogu no DB (bez json_data) un atomiski nomaina aktīvo."""
+        columns = [getattr(NodeDefinition, field) for field in RECORD_FIELDS]
+        rows = db.session.execute(db.select(*columns)).all()
+        catalog = swap_catalog(NodeCatalog.from_rows(rows))
+        _validator_cache.clear()  # parametri varēja mainīties arī ar to pašu versiju
+        state = db.session.get(NodeCatalogState, 1)
+        if state is None or state.version != catalog.version:
+            db.session.merge(NodeCatalogState(id=1, version=catalog.version))
+            db.session.commit()
+        self.log.info("[node‑catalog] Ielādēti %s mezgli, versija %s", len(catalog), catalog.version)
+        return catalog
+
+    def load_catalog(self, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH) -> Catalog:
+        """Darbinieka starts: ja ir binārais momentuzņēmums, to atver ar mmap, citādi lasa DB.
+
+        Momentuzņēmums tiek lietots tikai tad, ja tā versija sakrīt ar pēdējo
+        DB ielādes versiju (`NodeCatalogState`); bojāts, saīsināts vai novecojis
+        fails tiek izlaists.
+        """
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                mapped = MappedNodeCatalog(snapshot_path)
+            except (OSError, ValueError) as exc:
+                self.log.warning("[node‑catalog] Nevar atvērt %s → %s; lasa no DB", snapshot_path, exc)
+            else:
+                state = db.session.get(NodeCatalogState, 1)
+                if state is not None and state.version == mapped.version:
+                    catalog = swap_catalog(mapped)
+                    _validator_cache.clear()
+                    self.log.info("[node‑catalog] Atvērts %s: %s mezgli, versija %s",
+                                  snapshot_path, len(catalog), catalog.version)
+                    return catalog
+                self.log.warning("[node‑catalog] %s (versija %s) neatbilst DB (%s); lasa no DB",
+                                 snapshot_path, mapped.version, state.version if state else "nav zināma")
+                mapped.close()
+        return self.reload_catalog()
+
+    def build_snapshot(self, path: str = DEFAULT_SNAPSHOT_PATH) -> int:
+        """Uzbūvē bināro momentuzņēmumu no DB; atgriež faila izmēru baitos."""
+        return write_snapshot(self.reload_catalog(), path)
+
+    @property
+    def catalog(self) -> Catalog:
+        """Aktīvais momentuzņēmums; pirmajā izsaukumā to ielādē."""
+        catalog = current_catalog()
+        return catalog if catalog is not None else self.load_catalog()
 
     # ── Vaicājumi ──────────────────────────────────────────────────────────────
 
     def list_nodes(self, limit: int = 250) -> List[Dict[str, Any]]:
-        """Atgriež līdz *limit* mezgliem kā dict sarakstu."""
-        return [n.to_dict() for n in NodeDefinition.query.limit(limit).all()]
+        """Atgriež līdz *limit* mezgliem (pēc node_id) kā dict sarakstu."""
+        return self.catalog.list(limit)
+
+    def ensure_search_index(self) -> bool:
+        """Izveido FTS5 indeksu esošai datubāzei (ja vajag) un atgriež, vai tas pieejams.
+
+        Jaunām datubāzēm indekss rodas jau `db.create_all()` laikā; šeit tiek
+        apstrādātas vecās `app.db`, kurām tabula radīta pirms indeksa.
+        """
+        key = str(db.engine.url)
+        if key in _fts_ready:
+            return _fts_ready[key]
+        if db.engine.dialect.name != "sqlite":
+            _fts_ready[key] = False
+            return False
+
+        try:
+            exists = db.session.execute(
+                db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE},
+            ).first()
+            if not exists:
+                for ddl in _FTS_DDL:
+                    db.session.execute(db.text(ddl))
+                db.session.execute(db.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                db.session.commit()
+                self.log.info("[node‑search] Izveidots FTS5 indekss %s", FTS_TABLE)
+            _fts_ready[key] = True
+        except Exception as exc:  # noqa: BLE001 — piem., SQLite bez FTS5
+            db.session.rollback()
+            self.log.warning("[node‑search] FTS5 nav pieejams, lieto LIKE meklēšanu → %s", exc)
+            _fts_ready[key] = False
+        return _fts_ready[key]
 
     def find_by_name(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Vienkāršs LIKE %%text%% meklējums pēc name/display_name."""
+        """Pilnteksta meklējums pēc name/display_name/description/category.
+
+        SQLite gadījumā izmanto FTS5 ar bm25 ranžēšanu un prefiksu vaicājumiem
+        (`tele` atrod `Telegram`); citiem dialektiem — LIKE %%text%% pēc
+        name/display_name.
+        """
+        if self.ensure_search_index():
+            match = _fts_query(text)
+            if not match:
+                return []
+            weights = ", ".join(str(w) for w in _FTS_WEIGHTS)
+            rows = db.session.execute(
+                db.text(
+                    "SELECT n.node_id, n.name, n.display_name, n.description, n.category, "
+                    "n.subcategory, n.icon, n.version "
+                    f"FROM {FTS_TABLE} JOIN node_definitions AS n ON n.id = {FTS_TABLE}.rowid "
+                    f"WHERE {FTS_TABLE} MATCH :match "
+                    f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit"
+                ),
+                {"match": match, "limit": limit},
+            )
+            return [dict(row._mapping) for row in rows]
+
         pattern = f"%{text}%"
         q = NodeDefinition.query.filter(
             db.or_(NodeDefinition.name.ilike(pattern), NodeDefinition.display_name.ilike(pattern))
@@ -138,8 +728,135 @@ class NodeConfigurationDatabase:  # ← LABOJUMS: nosaukums mainīts no NodeConf
         return [n.to_dict() for n in q]
 
     def get(self, node_id: str) -> Optional[Dict[str, Any]]:
-        n = NodeDefinition.query.filter_by(node_id=node_id).first()
-        return n.to_dict() if n else None
+        record = self.catalog.get(node_id)
+        return record.to_dict() if record else None
+
+    def get_definition_json(self, node_id: str) -> Optional[str]:
+        """Mezgla neapstrādātā JSON definīcija kā teksts (tikai json_data kolonna)."""
+        return db.session.execute(
+            db.select(NodeDefinition.json_data).where(NodeDefinition.node_id == node_id)
+        ).scalar()
+
+    def iter_definition_json(self, node_id: str, chunk_size: int = 64 * 1024) -> Optional[Iterator[str]]:
+        """Mezgla JSON definīcija gabalos pa *chunk_size* rakstzīmēm; *None*, ja mezgla nav.
+
+        Katrs gabals tiek nolasīts ar atsevišķu `substr()` vaicājumu, tāpēc
+        Python pusē atmiņā vienlaikus ir tikai viens gabals, nevis viss JSON.
+        """
+        length = db.session.execute(
+            db.select(db.func.length(NodeDefinition.json_data)).where(NodeDefinition.node_id == node_id)
+        ).scalar()
+        if length is None:
+            return None
+
+        def chunks() -> Iterator[str]:
+            for start in range(1, length + 1, chunk_size):  # SQL substr() skaita no 1
+                chunk = db.session.execute(
+                    db.select(db.func.substr(NodeDefinition.json_data, start, chunk_size))
+                    .where(NodeDefinition.node_id == node_id)
+                ).scalar()
+                if not chunk:
+                    return
+                yield chunk
+
+        return chunks()
+
+    def get_node_configuration(self, node_type: str) -> Optional[NodeRecord]:
+        """Mezgla ieraksts pēc tipa (piem., `n8n-nodes-base.webhook`) vai *None*."""
+        return self.catalog.get(node_type)
+
+    def autocomplete(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Mezgli, kuru name/display_name/īsais tips sākas ar *query*, pēc lietošanas biežuma."""
+        catalog = self.catalog
+        results = []
+        self._refresh_usage()
+        for node_id in get_index(catalog).search(query, limit, node_usage):
+            record = catalog.get(node_id)
+            results.append({
+                "node_id": record.node_id,
+                "name": record.name,
+                "display_name": record.display_name,
+                "category": record.category,
+                "usage": node_usage.get(node_id),
+            })
+        return results
+
+    def record_usage(self, node_types: Iterable[str]) -> None:
+        """Atzīmē vienu workflow lietojumu (ģenerēts vai augšupielādēts) autokompletes ranžēšanai.
+
+        Katrs tips tiek skaitīts vienreiz par workflow. Skaitītāji tiek
+        pieskaitīti datubāzē, tāpēc tie saglabājas pēc restarta un ir kopīgi
+        visiem darbiniekiem; procesa kopija tiek atjaunināta uzreiz.
+        """
+        node_types = sorted(set(node_types))
+        if not node_types:
+            return
+        try:
+            table = NodeUsageCount.__table__
+            if db.engine.dialect.name in _UPSERT_DIALECTS:
+                stmt = _UPSERT_DIALECTS[db.engine.dialect.name](table)
+                db.session.execute(
+                    stmt.on_conflict_do_update(index_elements=[table.c.node_id],
+                                               set_={"count": table.c.count + stmt.excluded.count}),
+                    [{"node_id": node_type, "count": 1} for node_type in node_types],
+                )
+            else:
+                for node_type in node_types:
+                    row = db.session.get(NodeUsageCount, node_type)
+                    if row is None:
+                        db.session.add(NodeUsageCount(node_id=node_type, count=1))
+                    else:
+                        row.count += 1
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        node_usage.record(node_types)
+
+    def _refresh_usage(self) -> None:
+        """Pārlādē procesa skaitītāju kopiju no DB, ja tā vecāka par `USAGE_REFRESH_SECONDS`."""
+        if node_usage.is_stale(USAGE_REFRESH_SECONDS):
+            node_usage.replace(dict(db.session.execute(db.select(NodeUsageCount.node_id, NodeUsageCount.count)).all()))
+
+    # ── Parametru validācija ──────────────────────────────────────────────────
+
+    def get_validator(self, node_type: str) -> Optional[NodeValidator]:
+        """Kompilētais validators mezgla tipam; nezināmam tipam — *None*.
+
+        Parametru rindas tiek nolasītas ar vienu vaicājumu pirmajā reizē un
+        kešotas līdz nākamajai kataloga versijai.
+        """
+        catalog = self.catalog
+        validators = _validator_cache.for_version(catalog.version)
+        validator = validators.get(node_type)
+        if validator is None:
+            if node_type not in catalog:
+                return None
+            rows = db.session.execute(
+                db.select(
+                    NodeParameter.name,
+                    NodeParameter.type,
+                    NodeParameter.required,
+                    NodeParameter.default_value,
+                    NodeParameter.options,
+                    NodeParameter.display_options,
+                )
+                .where(NodeParameter.node_id == node_type)
+                .order_by(NodeParameter.position)
+            ).all()
+            validator = NodeValidator(node_type, (ParameterRule.from_row(*row) for row in rows))
+            validators[node_type] = validator
+        return validator
+
+    def validate_node_parameters(self, node_type: str, parameters: Dict[str, Any]) -> tuple[bool, List[str]]:
+        """Validē mezgla parametrus; atgriež (is_valid, kļūdu saraksts).
+
+        Nezināmam tipam atgriež (True, []) — to jau ziņo tipa pārbaude.
+        """
+        validator = self.get_validator(node_type)
+        if validator is None:
+            return True, []
+        return validator.validate(parameters)
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -156,9 +873,20 @@ if __name__ == "__main__":
         default="database/n8n/packages/nodes-base/nodes",
         help="Saknes mape ar *.json mezglu failiēm",
     )
+    parser.add_argument("--no-bulk", action="store_true", help="Secīga ielāde pa vienam mezglam")
+    parser.add_argument("--refresh", action="store_true", help="Inkrementāla atjaunināšana pēc failu manifesta")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rindas vienā INSERT partijā")
+    parser.add_argument("--workers", type=int, default=None, help="Parsēšanas procesu skaits (noklusējums — CPU kodoli)")
     args = parser.parse_args()
 
     loader = NodeConfigurationDatabase()  # ← LABOJUMS: mainīts klases nosaukums
     with db.app.app_context():
-        inserted, skipped = loader.load_from_folder(args.folder)
-        print(f"Pabeigts: ielādēti {inserted}, izlaisti {skipped}")
+        if args.refresh:
+            stats = loader.refresh_from_folder(args.folder, batch_size=args.batch_size, workers=args.workers)
+            print(f"Pabeigts: {stats}")
+        else:
+            inserted, skipped = loader.load_from_folder(
+                args.folder, bulk=not args.no_bulk, batch_size=args.batch_size, workers=args.workers
+            )
+            print(f"Pabeigts: ielādēti {inserted}, izlaisti {skipped} "
+                  f"({loader.last_load_stats['rows_per_second']} rindas/s)")
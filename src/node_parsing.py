@@ -0,0 +1,116 @@
+"""
+node_parsing.py
+
+Paralēla mezglu JSON failu parsēšana. Failu ceļi tiek sadalīti porcijās un
+nosūtīti procesu pūlam; katrs darbinieks atgriež jau normalizētas rindas
+(tuple), nevis pilnas vārdnīcas, un rezultāti caur ierobežotu rindu (queue)
+plūst pie datubāzes rakstītāja. Tā rakstītājs nekad neatpaliek tik daudz, lai
+atmiņā uzkrātos viss katalogs.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+# Cik failu vienā uzdevumā nosūta darbiniekam (mazāk IPC virstēriņu)
+DEFAULT_CHUNK_SIZE = 64
+# Cik porciju drīkst gaidīt rindā, pirms darbinieki tiek apturēti
+DEFAULT_QUEUE_SIZE = 32
+
+_DONE = object()
+
+
+def iter_json_files(folder: str) -> Iterator[str]:
+    """Rekursīvi atgriež visus *.json failu ceļus mapē (deterministiskā, sakārtotā secībā)."""
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for fname in sorted(files):
+            if fname.endswith(".json"):
+                yield os.path.join(root, fname)
+
+
+def _parse_chunk(parse_fn: Callable[[str], Any], paths: List[str]) -> List[Any]:
+    """Darbinieka puse: parsē vienu ceļu porciju."""
+    return [parse_fn(path) for path in paths]
+
+
+def _chunks(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parallel_parse(
+    paths: Iterable[str],
+    parse_fn: Callable[[str], Any],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> Iterator[Any]:
+    """Parsē *paths* ar *parse_fn* procesu pūlā un straumē rezultātus.
+
+    *parse_fn* jābūt moduļa līmeņa funkcijai (to serializē uz darbiniekiem).
+    Rezultāti tiek atgriezti *paths* secībā (vairāki vienādi `node_id` tāpēc
+    vienmēr tiek atrisināti vienādi). Ar `workers <= 1` parsē tajā pašā
+    procesā — noder testiem un nelielām mapēm.
+    """
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1:
+        for path in paths:
+            yield parse_fn(path)
+        return
+
+    results: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def produce() -> None:
+        # Vienlaikus apstrādē tur ne vairāk kā 2 porcijas uz darbinieku;
+        # kad rakstītājs atpaliek, `results.put` bloķē un jauni uzdevumi netiek sūtīti.
+        # Porcijas tiek nodotas iesniegšanas secībā (gaida vecāko, nevis pirmo pabeigto).
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: deque = deque()
+                for chunk in _chunks(paths, chunk_size):
+                    if stop.is_set():
+                        break
+                    pending.append(pool.submit(_parse_chunk, parse_fn, chunk))
+                    if len(pending) >= workers * 2:
+                        results.put(pending.popleft().result())
+                while pending and not stop.is_set():
+                    results.put(pending.popleft().result())
+                for future in pending:
+                    future.cancel()
+        except BaseException as exc:  # noqa: BLE001 — nodod patērētājam
+            results.put(exc)
+        finally:
+            results.put(_DONE)
+
+    producer = threading.Thread(target=produce, name="node-parse-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        # Atbrīvo ražotāju, ja tas gaida pilnā rindā
+        while producer.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
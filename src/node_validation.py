@@ -0,0 +1,157 @@
+"""
+node_validation.py
+
+Kompilēti n8n mezglu parametru validatori. Katram mezgla tipam noteikumi
+(`node_parameters` rindas) tiek sagatavoti vienreiz — JSON atpakošana,
+atļauto vērtību kopas, displayOptions nosacījumi — un pēc tam validācija ir
+vienkāršs cikls atmiņā bez datubāzes piekļuves.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# n8n izteiksmes (`={{ $json.x }}`) tiek novērtētas izpildes laikā — tipu nepārbauda
+EXPRESSION_PREFIX = "="
+
+_MISSING = object()
+
+
+def _hashable(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Tipu pārbaudes; tipi, kuru šeit nav, netiek pārbaudīti
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "number": _is_number,
+    "boolean": lambda v: isinstance(v, bool),
+    "options": lambda v: isinstance(v, (str, int, float, bool)),
+    "multiOptions": lambda v: isinstance(v, list),
+    "collection": lambda v: isinstance(v, dict),
+    "fixedCollection": lambda v: isinstance(v, dict),
+    "json": lambda v: isinstance(v, (str, dict, list)),
+    "color": lambda v: isinstance(v, str),
+    "dateTime": lambda v: isinstance(v, str),
+}
+
+
+def _conditions(raw: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, frozenset], ...]:
+    """displayOptions.show/hide → ((parametrs, atļautās vērtības), ...)."""
+    if not isinstance(raw, dict):
+        return ()
+    conditions = []
+    for name, values in raw.items():
+        if not isinstance(values, list):
+            values = [values]
+        conditions.append((name, frozenset(v for v in values if _hashable(v))))
+    return tuple(conditions)
+
+
+class ParameterRule:
+    """Viena `properties` ieraksta kompilētā forma."""
+
+    __slots__ = ("name", "type", "required", "default", "options", "show", "hide")
+
+    def __init__(
+        self,
+        name: str,
+        type_: str,
+        required: bool,
+        default: Any,
+        options: Optional[Iterable[Any]],
+        display_options: Optional[Dict[str, Any]],
+    ) -> None:
+        self.name = name
+        self.type = type_
+        self.required = required
+        self.default = default
+        self.options = frozenset(v for v in options if _hashable(v)) if options else None
+        display_options = display_options or {}
+        self.show = _conditions(display_options.get("show"))
+        self.hide = _conditions(display_options.get("hide"))
+
+    @classmethod
+    def from_row(cls, name: str, type_: str, required: bool, default_json: Optional[str],
+                 options_json: Optional[str], display_json: Optional[str]) -> "ParameterRule":
+        return cls(
+            name,
+            type_ or "",
+            bool(required),
+            json.loads(default_json) if default_json else None,
+            json.loads(options_json) if options_json else None,
+            json.loads(display_json) if display_json else None,
+        )
+
+
+class NodeValidator:
+    """Viena mezgla tipa parametru validators.
+
+    Parametriem ar vienādu nosaukumu (n8n tos dublē dažādiem resource/operation
+    variantiem) tiek pārbaudīts tikai tas variants, kas ir redzams pēc
+    displayOptions.
+    """
+
+    __slots__ = ("node_type", "rules", "defaults")
+
+    def __init__(self, node_type: str, rules: Iterable[ParameterRule]) -> None:
+        self.node_type = node_type
+        self.rules: Tuple[ParameterRule, ...] = tuple(rules)
+        defaults: Dict[str, Any] = {}
+        for rule in self.rules:
+            defaults.setdefault(rule.name, rule.default)
+        self.defaults = defaults
+
+    def _value(self, parameters: Dict[str, Any], name: str) -> Any:
+        value = parameters.get(name, _MISSING)
+        return self.defaults.get(name) if value is _MISSING else value
+
+    def _is_visible(self, rule: ParameterRule, parameters: Dict[str, Any]) -> bool:
+        for name, allowed in rule.show:
+            value = self._value(parameters, name)
+            if not _hashable(value) or value not in allowed:
+                return False
+        for name, hidden in rule.hide:
+            value = self._value(parameters, name)
+            if _hashable(value) and value in hidden:
+                return False
+        return True
+
+    def validate(self, parameters: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Atgriež (is_valid, kļūdu saraksts)."""
+        if not isinstance(parameters, dict):
+            return False, ["'parameters' jābūt objektam"]
+
+        errors: List[str] = []
+        for rule in self.rules:
+            if (rule.show or rule.hide) and not self._is_visible(rule, parameters):
+                continue
+
+            value = parameters.get(rule.name, _MISSING)
+            if value is _MISSING or value is None or value == "":
+                if rule.required and rule.default in (None, "", [], {}):
+                    errors.append(f"Trūkst obligātā parametra: {rule.name}")
+                continue
+
+            if isinstance(value, str) and value.startswith(EXPRESSION_PREFIX):
+                continue
+
+            check = _TYPE_CHECKS.get(rule.type)
+            if check is not None and not check(value):
+                errors.append(f"Parametram '{rule.name}' jābūt tipa {rule.type}")
+                continue
+
+            if rule.options is not None:
+                if rule.type == "multiOptions":
+                    invalid = [v for v in value if not _hashable(v) or v not in rule.options]
+                    if invalid:
+                        errors.append(f"Parametram '{rule.name}' nederīgas vērtības: {invalid}")
+                elif value not in rule.options:
+                    errors.append(f"Parametram '{rule.name}' nederīga vērtība: {value!r}")
+
+        return len(errors) == 0, errors
@@ -10,6 +10,7 @@ from flask import Blueprint, request, jsonify
 from flask_cors import cross_origin
 
 from src.n8n_api_client import N8nApiClient, N8nWorkflowManager, N8nCredentials
+from src.node_configuration_database import NodeConfigurationDatabase
 
 n8n_bp = Blueprint('n8n', __name__)
 
@@ -222,6 +223,14 @@ def upload_workflow_to_n8n():
         )
         
         if result['success']:
+            # Augšupielādēts workflow ir lietojuma notikums autokompletes ranžēšanai
+            try:
+                NodeConfigurationDatabase().record_usage(
+                    node["type"] for node in workflow_data.get("nodes", []) if "type" in node
+                )
+            except Exception as e:
+                print(f"Kļūda saglabājot mezglu lietojumu: {e}")
+            
             return jsonify({
                 "success": True,
                 "message": result['message'],
@@ -1,14 +1,83 @@
-from flask import Blueprint, jsonify
+import hashlib
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from src.node_catalog import RECORD_FIELDS
 from src.node_configuration_database import NodeConfigurationDatabase
 
 node_bp = Blueprint('node_routes', __name__)
 
+# Viens koplietots apvalks — tam nav pieprasījuma stāvokļa
+_node_db = NodeConfigurationDatabase()
+
+# Definīcijas straumēšanas gabala izmērs (rakstzīmes)
+DEFINITION_CHUNK_SIZE = 64 * 1024
+
+# Lapas izmēri mezglu sarakstam
+DEFAULT_PAGE_SIZE = 250
+MAX_PAGE_SIZE = 1000
+
 @node_bp.route('/nodes', methods=['GET'])
 def list_nodes():
+    """Mezglu saraksts ar keyset lapošanu (`cursor`), `fields=` projekciju un ETag"""
     try:
-        db = NodeConfigurationDatabase()
-        nodes = db.list_nodes()
-        return jsonify({"success": True, "nodes": nodes})
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"success": False, "error": "'limit' jābūt veselam skaitlim"}), 400
+
+        cursor = request.args.get('cursor') or None
+        fields = RECORD_FIELDS
+        if request.args.get('fields'):
+            fields = tuple(f.strip() for f in request.args['fields'].split(',') if f.strip())
+            unknown = [f for f in fields if f not in RECORD_FIELDS]
+            if unknown:
+                return jsonify({"success": False, "error": f"Nezināmi lauki: {', '.join(unknown)}"}), 400
+
+        catalog = _node_db.catalog
+        # Spēcīgs ETag: kataloga versija + pieprasījuma parametri
+        key = f"{catalog.version}|{cursor or ''}|{limit}|{','.join(fields)}"
+        etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        records, next_cursor = catalog.page(cursor, limit)
+        nodes = [{field: getattr(record, field) for field in fields} for record in records]
+        response = jsonify({
+            "success": True,
+            "nodes": nodes,
+            "next_cursor": next_cursor,
+            "catalog_version": catalog.version,
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@node_bp.route('/nodes/autocomplete', methods=['GET'])
+def autocomplete_nodes():
+    """Prefiksu ieteikumi mezglu tipiem (`q=tele`), ranžēti pēc lietošanas biežuma"""
+    try:
+        query = request.args.get('q', '')
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+        except ValueError:
+            return jsonify({"success": False, "error": "'limit' jābūt veselam skaitlim"}), 400
+        return jsonify({"success": True, "query": query, "results": _node_db.autocomplete(query, limit)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@node_bp.route('/nodes/<node_id>/definition', methods=['GET'])
+def get_node_definition(node_id):
+    """Straumē viena mezgla neapstrādāto JSON definīciju"""
+    try:
+        chunks = _node_db.iter_definition_json(node_id, DEFINITION_CHUNK_SIZE)
+        if chunks is None:
+            return jsonify({"success": False, "error": f"Mezgls '{node_id}' nav atrasts"}), 404
+
+        # Gabali tiek lasīti no DB straumēšanas laikā (vajag lietotnes kontekstu)
+        return Response(stream_with_context(chunks), mimetype='application/json')
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
@@ -4,14 +4,19 @@ Workflow API Routes for n8n AI Agent
 Šis modulis definē API galapunktus workflow ģenerēšanai un pārvaldībai.
 """
 
+import atexit
 import json
 import traceback
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_cors import cross_origin
-import openai
 
 # Importē mūsu moduļus
-from src.vector_database_design import QdrantWorkflowDatabase, WorkflowVectorizer
+from src.vector_database_design import WorkflowVectorizer
+from src.local_vector_index import create_workflow_index
+from src.lexical_index import LexicalIndex
+from src.search_result_cache import SearchResultCache
+from src.embedding_backends import EmbeddingError, create_embedding_backend, create_openai_client
+from src.embedding_cache import EmbeddingCache
 from src.workflow_search_algorithm import WorkflowSearchEngine, NaturalLanguageProcessor
 from src.node_configuration_database import NodeConfigurationDatabase
 from src.ai_prompt_system import WorkflowGenerator, GenerationContext
@@ -29,45 +34,52 @@ _search_engine = None
 _generator = None
 _multilingual = None
 
+# Maksimālais vaicājumu skaits vienā /search/batch pieprasījumā
+MAX_BATCH_QUERIES = 500
+
+# /search/stream formāti: Server-Sent Events vai JSON rindas
+STREAM_MIMETYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
 def initialize_components():
     """Inicializē visus nepieciešamos komponentus"""
     global _openai_client, _node_db, _vector_db, _vectorizer, _nlp, _search_engine, _generator, _multilingual
     
-    if _openai_client is None:
+    if _node_db is None:
         try:
-            # Inicializē OpenAI klientu
-            _openai_client = openai.OpenAI()
+            # OpenAI klients tikai tad, ja ir API atslēga; bez tās — lokālais embedding backend
+            _openai_client = create_openai_client()
+            
+            # Embedding backend (OpenAI vai lokālais, skat. EMBEDDING_BACKEND)
+            embedding_backend = create_embedding_backend(_openai_client)
             
             # Inicializē datu bāzes
-            _node_db = NodeConfigurationDatabase("src/n8n_nodes.db")
-            _vector_db = QdrantWorkflowDatabase(host="localhost", port=6333)
+            _node_db = NodeConfigurationDatabase()
             
-            # Mēģina inicializēt Qdrant kolekciju
+            # Qdrant, ja pieejams; citādi lokālais NumPy indekss (skat. VECTOR_STORE)
             try:
-                _vector_db.initialize_collection()
+                _vector_db = create_workflow_index(vector_size=embedding_backend.dimension)
             except Exception as e:
-                print(f"Qdrant nav pieejams: {e}")
+                print(f"Vektoru datu bāze nav pieejama: {e}")
                 _vector_db = None
             
             # Inicializē citus komponentus
-            _vectorizer = WorkflowVectorizer()
-            _nlp = NaturalLanguageProcessor()
-            _search_engine = WorkflowSearchEngine(_vector_db, _vectorizer)
-            _generator = WorkflowGenerator()
-            _multilingual = MultilingualSupport()
-            
-            print("Visi komponenti veiksmīgi inicializēti")
-            
-        except Exception as e:
-            print(f"Kļūda inicializējot komponentus: {e}")
-            traceback.print_exc()
-            _vectorizer = WorkflowVectorizer(_openai_client)
+            _vectorizer = WorkflowVectorizer(_openai_client, cache=EmbeddingCache(), backend=embedding_backend)
             _nlp = NaturalLanguageProcessor(_openai_client)
             
             if _vector_db:
-                _search_engine = WorkflowSearchEngine(_vector_db, _vectorizer, _nlp)
+                # BM25 indekss hibrīdajai meklēšanai (aizpilda `flask index-workflows`)
+                lexical_index = LexicalIndex()
+                lexical_index.load()
+                _search_engine = WorkflowSearchEngine(_vector_db, _vectorizer, _nlp, lexical_index=lexical_index,
+                                                      result_cache=SearchResultCache())
+                # Fona pavedieni tiek apturēti, kad darbinieks beidz darbu
+                atexit.register(_search_engine.close)
             
             _generator = WorkflowGenerator(_openai_client, _node_db)
+            _multilingual = MultilingualSupport()
             
             print("Visi komponenti veiksmīgi inicializēti")
             
@@ -75,6 +87,16 @@ def initialize_components():
             print(f"Kļūda inicializējot komponentus: {e}")
             traceback.print_exc()
 
+def _node_summary(node):
+    """Mezgla dict → saīsināta forma ģenerēšanas kontekstam"""
+    return {
+        "node_id": node["node_id"],
+        "display_name": node["display_name"],
+        "description": node["description"],
+        "category": node["category"],
+        "subcategory": node["subcategory"]
+    }
+
 @workflow_bp.route('/health', methods=['GET'])
 @cross_origin()
 def health_check():
@@ -137,33 +159,20 @@ def generate_workflow():
         # Iegūst pieejamos mezglus
         available_nodes = []
         try:
-            # Meklē mezglus, pamatojoties uz atslēgvārdiem
+            # Meklē mezglus, pamatojoties uz atslēgvārdiem (FTS5 indekss)
+            seen_node_ids = set()
             for keyword in search_query.keywords:
-                nodes = _node_db.search_nodes(keyword)
-                for node in nodes:
-                    node_dict = {
-                        "node_id": node.node_id,
-                        "display_name": node.display_name,
-                        "description": node.description,
-                        "category": node.category,
-                        "subcategory": node.subcategory
-                    }
-                    if node_dict not in available_nodes:
-                        available_nodes.append(node_dict)
+                for node in _node_db.find_by_name(keyword, limit=10):
+                    if node["node_id"] not in seen_node_ids:
+                        seen_node_ids.add(node["node_id"])
+                        available_nodes.append(_node_summary(node))
             
             # Ja nav atrasti specifiski mezgli, pievieno populāros
             if not available_nodes:
                 popular_nodes = ["webhook", "httpRequest", "function", "telegramTrigger"]
                 for node_name in popular_nodes:
-                    nodes = _node_db.search_nodes(node_name)
-                    for node in nodes:
-                        available_nodes.append({
-                            "node_id": node.node_id,
-                            "display_name": node.display_name,
-                            "description": node.description,
-                            "category": node.category,
-                            "subcategory": node.subcategory
-                        })
+                    for node in _node_db.find_by_name(node_name, limit=5):
+                        available_nodes.append(_node_summary(node))
         except Exception as e:
             print(f"Kļūda iegūstot mezglus: {e}")
         
@@ -212,6 +221,26 @@ def generate_workflow():
             "generated_workflow": None
         }), 500
 
+def _format_search_hit(result):
+    """SearchResult → API atbildes forma bez workflow JSON"""
+    return {
+        "workflow_id": result.workflow_id,
+        "workflow_name": result.workflow_name,
+        "similarity_score": result.similarity_score,
+        "match_reasons": result.match_reasons,
+        "suggested_modifications": result.suggested_modifications
+    }
+
+def _format_search_result(result):
+    """SearchResult → API atbildes forma"""
+    return dict(_format_search_hit(result), workflow_json=result.workflow_json)
+
+def _stream_event(stream_format, event, data):
+    """Viens straumes notikums: SSE bloks vai JSON rinda ar lauku `event`"""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps(dict(data, event=event), ensure_ascii=False) + "\n"
+
 @workflow_bp.route('/search', methods=['POST'])
 @cross_origin()
 def search_workflows():
@@ -233,28 +262,166 @@ def search_workflows():
         user_query = data['query']
         max_results = data.get('max_results', 5)
         
-        # Meklē workflow
-        search_results = _search_engine.search(user_query, max_results)
+        # Meklē workflow (ar katra posma ilgumu milisekundēs)
+        timings = {}
+        search_results = _search_engine.search(user_query, max_results, timings=timings)
         
         # Formatē rezultātus
-        formatted_results = []
-        for result in search_results:
-            formatted_results.append({
-                "workflow_id": result.workflow_id,
-                "workflow_name": result.workflow_name,
-                "similarity_score": result.similarity_score,
-                "match_reasons": result.match_reasons,
-                "suggested_modifications": result.suggested_modifications,
-                "workflow_json": result.workflow_json
-            })
+        formatted_results = [_format_search_result(result) for result in search_results]
         
         return jsonify({
             "success": True,
             "query": user_query,
             "results_count": len(formatted_results),
-            "results": formatted_results
+            "results": formatted_results,
+            "timings": timings
         })
         
+    except EmbeddingError as e:
+        print(f"Kļūda ģenerējot vaicājuma embedding: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Embedding serviss nav pieejams"
+        }), 503
+        
+    except Exception as e:
+        print(f"Kļūda meklējot workflow: {e}")
+        traceback.print_exc()
+        
+        return jsonify({
+            "success": False,
+            "error": f"Meklēšanas kļūda: {str(e)}"
+        }), 500
+
+@workflow_bp.route('/search/stream', methods=['POST'])
+@cross_origin()
+def search_workflows_stream():
+    """Meklē līdzīgus workflow un straumē rezultātus.
+    
+    Vispirms tiek nosūtīts notikums `hits` ar ranžētajiem rezultātiem bez
+    workflow JSON, pēc tam `workflow` katram rezultātam (tā JSON, vai null,
+    ja tas nav atrodams) un beigās `done` ar posmu laikiem. Formāts: SSE
+    (`"format": "sse"` vai `Accept: text/event-stream`) vai NDJSON.
+    """
+    initialize_components()
+    
+    if not _search_engine:
+        return jsonify({
+            "error": "Meklēšanas dzinējs nav pieejams (Qdrant nav konfigurēts)"
+        }), 503
+    
+    try:
+        data = request.get_json()
+        if not data or 'query' not in data:
+            return jsonify({
+                "error": "Trūkst 'query' parametra pieprasījumā"
+            }), 400
+        
+        stream_format = data.get('format') or (
+            "sse" if "text/event-stream" in request.headers.get('Accept', '') else "ndjson"
+        )
+        if stream_format not in STREAM_MIMETYPES:
+            return jsonify({
+                "error": f"Nezināms straumes formāts: {stream_format} (atbalstīti: sse, ndjson)"
+            }), 400
+        
+        user_query = data['query']
+        max_results = data.get('max_results', 5)
+        
+        # Ranžēšana notiek pirms atbildes sākuma, lai kļūdas būtu parastas JSON atbildes
+        timings = {}
+        search_engine = _search_engine
+        hits = search_engine.search(user_query, max_results, timings=timings, hydrate=False)
+        
+        def generate():
+            yield _stream_event(stream_format, "hits", {
+                "query": user_query,
+                "results_count": len(hits),
+                "results": [_format_search_hit(hit) for hit in hits],
+                "timings": dict(timings)
+            })
+            try:
+                # Katrs workflow JSON tiek nosūtīts, tiklīdz tas ielādēts
+                for hit in hits:
+                    hydrated = search_engine.hydrate_results([hit], timings)
+                    yield _stream_event(stream_format, "workflow", {
+                        "workflow_id": hit.workflow_id,
+                        "workflow_json": hydrated[0].workflow_json if hydrated else None
+                    })
+                yield _stream_event(stream_format, "done", {"timings": timings})
+            except Exception as e:
+                print(f"Kļūda straumējot workflow: {e}")
+                traceback.print_exc()
+                yield _stream_event(stream_format, "error", {"error": f"Meklēšanas kļūda: {str(e)}"})
+        
+        return Response(stream_with_context(generate()), mimetype=STREAM_MIMETYPES[stream_format],
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        
+    except EmbeddingError as e:
+        print(f"Kļūda ģenerējot vaicājuma embedding: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Embedding serviss nav pieejams"
+        }), 503
+        
+    except Exception as e:
+        print(f"Kļūda meklējot workflow: {e}")
+        traceback.print_exc()
+        
+        return jsonify({
+            "success": False,
+            "error": f"Meklēšanas kļūda: {str(e)}"
+        }), 500
+
+@workflow_bp.route('/search/batch', methods=['POST'])
+@cross_origin()
+def search_workflows_batch():
+    """Meklē workflow vairākiem vaicājumiem ar vienu paketētu embedding un indeksa pieprasījumu"""
+    initialize_components()
+    
+    if not _search_engine:
+        return jsonify({
+            "error": "Meklēšanas dzinējs nav pieejams (Qdrant nav konfigurēts)"
+        }), 503
+    
+    try:
+        data = request.get_json()
+        queries = data.get('queries') if data else None
+        if not isinstance(queries, list) or not queries or not all(isinstance(query, str) for query in queries):
+            return jsonify({
+                "error": "Trūkst 'queries' parametra (vaicājumu saraksts) pieprasījumā"
+            }), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({
+                "error": f"Pārāk daudz vaicājumu: {len(queries)} (maksimums {MAX_BATCH_QUERIES})"
+            }), 400
+        
+        max_results = data.get('max_results', 5)
+        
+        timings = {}
+        batches = _search_engine.search_batch(queries, max_results, timings=timings)
+        
+        return jsonify({
+            "success": True,
+            "queries_count": len(queries),
+            "results": [
+                {
+                    "query": query,
+                    "results_count": len(search_results),
+                    "results": [_format_search_result(result) for result in search_results]
+                }
+                for query, search_results in zip(queries, batches)
+            ],
+            "timings": timings
+        })
+        
+    except EmbeddingError as e:
+        print(f"Kļūda ģenerējot vaicājumu embedding: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Embedding serviss nav pieejams"
+        }), 503
+        
     except Exception as e:
         print(f"Kļūda meklējot workflow: {e}")
         traceback.print_exc()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Search Result Cache for n8n Workflow AI Agent
+Šis modulis nodrošina WorkflowSearchEngine rezultātu kešu ar diviem līmeņiem:
+
+- precīzais: kanoniskais SearchQuery paraksts (valoda, nolūks, sakārtoti
+  atslēgvārdi un entītijas, sarežģītība, kategorijas filtrs, rezultātu
+  skaits) kopā ar vaicājuma vārdu kopu — "telegram bot booking" un
+  "Telegram booking bot" ir viens ieraksts;
+- tuvo dublikātu (pēc izvēles): tas pats paraksts un vaicājuma embedding
+  kosinusa līdzība virs sliekšņa.
+
+Ieraksti noveco pēc TTL un tiek atmesti, ja mainījusies indeksa versija.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.lexical_index import tokenize
+
+# Cik sekundes rezultāts ir derīgs (ierobežo arī citu procesu veiktu indeksa izmaiņu ietekmi)
+DEFAULT_TTL = float(os.environ.get("SEARCH_CACHE_TTL", "300"))
+# Tuvo dublikātu kosinusa slieksnis; "" vai "0" — līmenis izslēgts
+DEFAULT_SIMILARITY_THRESHOLD = float(os.environ.get("SEARCH_CACHE_SIMILARITY", "0.97") or 0) or None
+
+
+def query_signature(parsed_query, category_filter: Optional[str], max_results: int) -> Tuple:
+    """Kanoniskais SearchQuery paraksts: lauki, no kuriem atkarīga rezultātu ranžēšana"""
+    entities = tuple(sorted((kind, tuple(sorted(set(values)))) for kind, values in parsed_query.entities.items()))
+    return (
+        parsed_query.language,
+        parsed_query.intent.value,
+        tuple(sorted(set(parsed_query.keywords))),
+        entities,
+        parsed_query.complexity_preference,
+        category_filter,
+        max_results,
+    )
+
+
+def query_terms(text: str) -> Tuple[str, ...]:
+    """Vaicājuma vārdu kopa neatkarīgi no secības un reģistra"""
+    return tuple(sorted(set(tokenize(text))))
+
+
+class _Entry:
+    __slots__ = ("results", "version", "expires", "vector")
+
+    def __init__(self, results: List[Any], version: Hashable, expires: float, vector: Optional[np.ndarray]):
+        self.results = results
+        self.version = version
+        self.expires = expires
+        self.vector = vector
+
+
+class SearchResultCache:
+    """LRU meklēšanas rezultātu kešs ar TTL, indeksa versiju un tuvo dublikātu līmeni"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = DEFAULT_TTL,
+                 similarity_threshold: Optional[float] = DEFAULT_SIMILARITY_THRESHOLD,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        # paraksts → atslēgas ar embedding (tuvo dublikātu meklēšanai)
+        self._by_signature: Dict[Tuple, "OrderedDict[Tuple, None]"] = {}
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _live(self, key: Tuple, entry: _Entry, version: Hashable, now: float) -> bool:
+        """Vai ieraksts vēl derīgs; novecojušie tiek izmesti"""
+        if entry.version == version and entry.expires > now:
+            return True
+        self._remove(key)
+        return False
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry.vector is not None:
+            keys = self._by_signature.get(key[0])
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._by_signature[key[0]]
+
+    def get(self, signature: Tuple, text: str, version: Hashable) -> Optional[List[Any]]:
+        """Precīzais līmenis: tas pats paraksts un tie paši vaicājuma vārdi"""
+        key = (signature, query_terms(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._live(key, entry, version, self._clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry.results)
+            self.misses += 1
+            return None
+
+    def get_similar(self, signature: Tuple, vector: Sequence[float], version: Hashable) -> Optional[List[Any]]:
+        """Tuvo dublikātu līmenis: tas pats paraksts un embedding kosinuss ≥ slieksnim"""
+        if self.similarity_threshold is None:
+            return None
+        query = self._normalize(vector)
+        with self._lock:
+            keys = self._by_signature.get(signature)
+            if not keys:
+                return None
+            now = self._clock()
+            live = [key for key in list(keys) if self._live(key, self._entries[key], version, now)]
+            if not live:
+                return None
+            similarities = np.stack([self._entries[key].vector for key in live]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+            self._entries.move_to_end(live[best])
+            self.near_hits += 1
+            return list(self._entries[live[best]].results)
+
+    def put(self, signature: Tuple, text: str, vector: Optional[Sequence[float]], version: Hashable,
+            results: List[Any]):
+        """Saglabā rezultātus; bez *vector* ieraksts piedalās tikai precīzajā līmenī"""
+        key = (signature, query_terms(text))
+        normalized = self._normalize(vector) if vector is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(list(results), version, self._clock() + self.ttl, normalized)
+            if normalized is not None:
+                self._by_signature.setdefault(signature, OrderedDict())[key] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_signature.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "near_hits": self.near_hits, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
@@ -4,13 +4,45 @@ Qdrant Vector Database Design for n8n Workflow AI Agent
 Šis modulis nodrošina vektoru datu bāzes funkcionalitāti workflow meklēšanai un salīdzināšanai.
 """
 
+import os
 import json
 import hashlib
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from dataclasses import dataclass, field
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client.models import (
+    CollectionParamsDiff, CompressionRatio, Disabled, Distance, FieldCondition, Filter, HnswConfigDiff,
+    MatchValue, OptimizersConfigDiff, PayloadSchemaType, PointStruct, ProductQuantization,
+    ProductQuantizationConfig, QuantizationSearchParams, QueryRequest, ScalarQuantization, ScalarQuantizationConfig,
+    ScalarType, SearchParams, VectorParams, VectorParamsDiff
+)
 import openai
+from src.embedding_backends import EmbeddingBackend, EmbeddingError, OpenAIEmbeddingBackend
+from src.embedding_cache import EmbeddingCache
+from src.node_parsing import iter_json_files
+from src.workflow_blob_store import WorkflowBlobStore
+
+# OpenAI ada-002 embedding izmērs
+EMBEDDING_SIZE = 1536
+# Cik embedding pieprasījumu drīkst būt procesā vienlaikus
+EMBEDDING_CONCURRENCY = 4
+# Cik punktu sūta uz Qdrant vienā upsert
+UPSERT_BATCH_SIZE = 256
+# Vektoru kvantizācija: "" (nav), "int8" (4x mazāk atmiņas) vai "pq" (16x)
+DEFAULT_QUANTIZATION = os.environ.get("VECTOR_QUANTIZATION", "") or None
+# Cik reizes vairāk kandidātu atlasa ar saspiestajiem vektoriem pirms precīzās pārvērtēšanas
+# (PQ kodi ir raupjāki, tāpēc tiem vajag vairāk kandidātu)
+RESCORE_OVERSAMPLING = {"int8": 4, "pq": 16}
+# Payload lauki, pēc kuriem tiek filtrēts, un to Qdrant indeksa tips
+PAYLOAD_INDEXES = {
+    "category": "keyword",
+    "language": "keyword",
+    "tags": "keyword",
+    "complexity_score": "integer",
+    "nodes_count": "integer",
+}
 
 @dataclass
 class WorkflowMetadata:
@@ -32,12 +64,75 @@ class WorkflowVector:
     vector: List[float]
     metadata: WorkflowMetadata
     json_content: Dict[str, Any]
+    content_hash: Optional[str] = None  # aizpilda WorkflowIndex, ierakstot JSON blob krātuvē
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.environ.get(name, "")
+    return int(value) if value else default
+
+
+def _env_flag(name: str, default: Optional[bool]) -> Optional[bool]:
+    value = os.environ.get(name, "")
+    return value == "1" if value else default
+
+
+@dataclass
+class QdrantCollectionConfig:
+    """Qdrant kolekcijas iestatījumi: payload indeksi, HNSW, optimizētājs un glabāšana"""
+    payload_indexes: Dict[str, str] = field(default_factory=lambda: dict(PAYLOAD_INDEXES))
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    # Zem šī punktu skaita (pēc filtra) Qdrant izmanto pilno pārlasi, nevis HNSW
+    full_scan_threshold: int = 10_000
+    # Segmenti, kas mazāki par šo (KB), netiek indeksēti ar HNSW
+    indexing_threshold: int = 20_000
+    # Segmenti, kas lielāki par šo (KB), tiek glabāti ar mmap; None — Qdrant noklusējums
+    memmap_threshold: Optional[int] = None
+    # Oriģinālie vektori uz diska; None — tikai tad, ja ieslēgta kvantizācija
+    vectors_on_disk: Optional[bool] = None
+    # Payload (tikai metadati, JSON glabājas blob krātuvē) var palikt atmiņā
+    on_disk_payload: bool = False
+
+    @classmethod
+    def from_env(cls) -> "QdrantCollectionConfig":
+        """Nolasa iestatījumus no QDRANT_* vides mainīgajiem.
+
+        QDRANT_PAYLOAD_INDEXES ir formā "category:keyword,complexity_score:integer".
+        """
+        config = cls(
+            hnsw_m=_env_int("QDRANT_HNSW_M", cls.hnsw_m),
+            hnsw_ef_construct=_env_int("QDRANT_HNSW_EF_CONSTRUCT", cls.hnsw_ef_construct),
+            full_scan_threshold=_env_int("QDRANT_FULL_SCAN_THRESHOLD", cls.full_scan_threshold),
+            indexing_threshold=_env_int("QDRANT_INDEXING_THRESHOLD", cls.indexing_threshold),
+            memmap_threshold=_env_int("QDRANT_MEMMAP_THRESHOLD", cls.memmap_threshold),
+            vectors_on_disk=_env_flag("QDRANT_VECTORS_ON_DISK", cls.vectors_on_disk),
+            on_disk_payload=_env_flag("QDRANT_ON_DISK_PAYLOAD", cls.on_disk_payload),
+        )
+        indexes = os.environ.get("QDRANT_PAYLOAD_INDEXES", "")
+        if indexes:
+            config.payload_indexes = dict(
+                item.strip().split(":", 1) for item in indexes.split(",") if item.strip()
+            )
+        return config
 
 class WorkflowVectorizer:
     """Klase workflow vektorizēšanai"""
     
-    def __init__(self, openai_client: openai.OpenAI):
+    def __init__(self, openai_client: Optional[openai.OpenAI], model: str = "text-embedding-ada-002",
+                 cache: Optional[EmbeddingCache] = None, max_concurrency: int = EMBEDDING_CONCURRENCY,
+                 backend: Optional[EmbeddingBackend] = None):
         self.openai_client = openai_client
+        # Bez norādīta backend — OpenAI API ar doto modeli
+        self.backend = backend or OpenAIEmbeddingBackend(openai_client, model)
+        self.model = self.backend.name
+        self.cache = cache  # None — bez kešošanas
+        self.max_concurrency = max_concurrency
+    
+    @property
+    def dimension(self) -> int:
+        """Backend vektoru izmērs"""
+        return self.backend.dimension
         
     def extract_workflow_features(self, workflow_json: Dict[str, Any]) -> str:
         """Ekstraktē workflow galvenās iezīmes teksta formātā"""
@@ -97,29 +192,104 @@ class WorkflowVectorizer:
         
         return min(score, 100)  # Maksimāli 100 punkti
     
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Aptuvens tokenu skaits (~4 rakstzīmes uz tokenu) pieprasījumu dalīšanai"""
+        return len(text) // 4 + 1
+    
+    def _batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Sadala tekstus pieprasījumos, nepārsniedzot ievažu un tokenu budžetu"""
+        batch: List[str] = []
+        tokens = 0
+        for text in texts:
+            cost = self.estimate_tokens(text)
+            if batch and (len(batch) >= self.backend.max_batch_size
+                          or tokens + cost > self.backend.max_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+            batch.append(text)
+            tokens += cost
+        if batch:
+            yield batch
+    
     def generate_embedding(self, text: str) -> List[float]:
-        """Ģenerē teksta embedding, izmantojot OpenAI API"""
-        try:
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"Kļūda ģenerējot embedding: {e}")
-            # Atgriež nulles vektoru kļūdas gadījumā
-            return [0.0] * 1536
+        """Ģenerē teksta embedding ar konfigurēto backend (ar kešu, ja tāds ir)"""
+        return self.generate_embeddings([text])[0]
+    
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Ģenerē embedding tekstu sarakstam ar paketētiem backend pieprasījumiem.
+        
+        Kešotie un atkārtotie teksti backend netiek sūtīti; paketes tiek apstrādātas
+        paralēli, bet ne vairāk kā `max_concurrency` vienlaikus. Ja kāda pakete
+        neizdodas, pārējās tiek kešotas un tiek pacelts EmbeddingError, kura
+        `embedded` satur veiksmīgi ģenerētos embedding.
+        """
+        unique = list(dict.fromkeys(texts))
+        found = self.cache.get_many(self.model, unique) if self.cache is not None else {}
+        batches = list(self._batches([text for text in unique if text not in found]))
+        
+        def collect(batch: List[str], vectors: List[List[float]]):
+            embedded = dict(zip(batch, vectors))
+            if self.cache is not None:
+                # Kešs noapaļo līdz float32 — atgriež to pašu, ko vēlāk atgriezīs trāpījums
+                embedded = self.cache.put_many(self.model, embedded)
+            found.update(embedded)
+        
+        errors = []
+        if len(batches) == 1:
+            try:
+                collect(batches[0], self.backend.embed(batches[0]))
+            except Exception as e:
+                errors.append(e)
+        elif batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                futures = {pool.submit(self.backend.embed, batch): batch for batch in batches}
+                for future in as_completed(futures):
+                    try:
+                        collect(futures[future], future.result())
+                    except Exception as e:
+                        errors.append(e)
+        
+        if errors:
+            missing = sum(1 for text in unique if text not in found)
+            raise EmbeddingError(f"Neizdevās ģenerēt {missing} embedding: {errors[0]}",
+                                 embedded=found) from errors[0]
+        return [found[text] for text in texts]
     
     def vectorize_workflow(self, workflow_json: Dict[str, Any]) -> WorkflowVector:
         """Pārveido workflow JSON par vektoru"""
-        # Ģenerē unikālu ID
-        workflow_id = hashlib.md5(json.dumps(workflow_json, sort_keys=True).encode()).hexdigest()
+        return self.vectorize_many([workflow_json])[0]
+    
+    def vectorize_many(self, workflows: List[Dict[str, Any]],
+                       failed: Optional[List[Dict[str, Any]]] = None) -> List[WorkflowVector]:
+        """Pārveido vairākus workflow JSON par vektoriem ar paketētiem embedding pieprasījumiem.
         
-        # Ekstraktē iezīmes
-        features_text = self.extract_workflow_features(workflow_json)
+        Ja norādīts *failed* saraksts, embedding kļūda netiek pacelta: workflow,
+        kuru paketes neizdevās, tiek pievienoti *failed*, un atgriezti tiek
+        pārējo vektori.
+        """
+        features = [self.extract_workflow_features(workflow_json) for workflow_json in workflows]
+        try:
+            embedded = dict(zip(features, self.generate_embeddings(features)))
+        except EmbeddingError as e:
+            if failed is None:
+                raise
+            print(f"Kļūda vektorizējot: {e}")
+            embedded = e.embedded
         
-        # Ģenerē vektoru
-        vector = self.generate_embedding(features_text)
+        vectors = []
+        for workflow_json, features_text in zip(workflows, features):
+            if features_text in embedded:
+                vectors.append(self._build_vector(workflow_json, features_text, embedded[features_text]))
+            else:
+                failed.append(workflow_json)
+        return vectors
+    
+    def _build_vector(self, workflow_json: Dict[str, Any], features_text: str,
+                      vector: List[float]) -> WorkflowVector:
+        """Saliek WorkflowVector no workflow, tā iezīmēm un embedding"""
+        # Ģenerē unikālu ID
+        workflow_id = hashlib.md5(json.dumps(workflow_json, sort_keys=True).encode()).hexdigest()
         
         # Izveido metadatus
         metadata = WorkflowMetadata(
@@ -169,16 +339,121 @@ class WorkflowVectorizer:
         
         return tags[:10]  # Maksimāli 10 tagi
 
-class QdrantWorkflowDatabase:
-    """Qdrant datu bāzes pārvaldības klase"""
+def workflow_metadata(workflow_vector: WorkflowVector) -> Dict[str, Any]:
+    """Indeksa payload metadati (bez workflow JSON un content_hash)"""
+    return {
+        "name": workflow_vector.metadata.name,
+        "description": workflow_vector.metadata.description,
+        "category": workflow_vector.metadata.category,
+        "tags": workflow_vector.metadata.tags,
+        "nodes_count": workflow_vector.metadata.nodes_count,
+        "complexity_score": workflow_vector.metadata.complexity_score,
+        "language": workflow_vector.metadata.language,
+        "created_at": workflow_vector.metadata.created_at
+    }
+
+class WorkflowIndex:
+    """Workflow vektoru krātuves kopīgā daļa (Qdrant un lokālais indekss).
+    
+    Pilnie workflow JSON glabājas blob krātuvē; payload satur tikai metadatus
+    un content_hash.
+    """
     
-    def __init__(self, host: str = "localhost", port: int = 6333):
-        self.client = QdrantClient(host=host, port=port)
+    def __init__(self, vector_size: int = EMBEDDING_SIZE, blob_store: Optional[WorkflowBlobStore] = None):
         self.collection_name = "n8n_workflows"
-        self.vector_size = 1536  # OpenAI ada-002 embedding izmērs
+        self.vector_size = vector_size  # jāsakrīt ar embedding backend izmēru
+        self.blob_store = blob_store or WorkflowBlobStore()
+        # Palielinās ar katru šī procesa ierakstu (rezultātu kešu invalidācijai)
+        self.version = 0
+    
+    def _payload(self, workflow_vector: WorkflowVector) -> Dict[str, Any]:
+        """WorkflowVector metadati; workflow JSON tiek ierakstīts blob krātuvē"""
+        payload = workflow_metadata(workflow_vector)
+        payload["content_hash"] = workflow_vector.content_hash = self.blob_store.put(workflow_vector.json_content)
+        return payload
+    
+    def search_many(self, query_vectors: List[List[float]], limit: int = 5, category_filter: Optional[str] = None,
+                    hydrate: bool = True) -> List[List[Dict[str, Any]]]:
+        """Meklē vairākiem vaicājuma vektoriem; apakšklases to dara ar vienu pieprasījumu"""
+        return [
+            self.search_similar_workflows(query_vector, limit, category_filter, hydrate)
+            for query_vector in query_vectors
+        ]
+    
+    def flush(self):
+        """Saglabā atliktos indeksa datus indeksēšanas beigās (Qdrant saglabā pats)"""
+    
+    def hydrate(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pievieno rezultātiem `workflow_json` no blob krātuves.
         
-    def initialize_collection(self):
-        """Inicializē Qdrant kolekciju"""
+        Vecie punkti ar `json_content` payload tiek atbalstīti; rezultāti, kuru
+        JSON nav atrodams, tiek izlaisti.
+        """
+        bodies = self.blob_store.get_many(
+            result["metadata"]["content_hash"] for result in results if "content_hash" in result["metadata"]
+        )
+        hydrated = []
+        for result in results:
+            metadata = result["metadata"]
+            if "content_hash" in metadata:
+                workflow_json = bodies.get(metadata["content_hash"])
+            elif "json_content" in metadata:
+                workflow_json = json.loads(metadata["json_content"])
+            else:
+                workflow_json = None
+            
+            if workflow_json is None:
+                print(f"Workflow JSON nav atrasts: {result['id']}")
+                continue
+            result["workflow_json"] = workflow_json
+            hydrated.append(result)
+        return hydrated
+
+class QdrantWorkflowDatabase(WorkflowIndex):
+    """Qdrant datu bāzes pārvaldības klase"""
+    
+    def __init__(self, host: str = "localhost", port: int = 6333, client: Optional[QdrantClient] = None,
+                 vector_size: int = EMBEDDING_SIZE, blob_store: Optional[WorkflowBlobStore] = None,
+                 quantization: Optional[str] = DEFAULT_QUANTIZATION,
+                 config: Optional[QdrantCollectionConfig] = None):
+        super().__init__(vector_size, blob_store)
+        if quantization not in (None, "int8", "pq"):
+            raise ValueError(f"Nezināms kvantizācijas veids: {quantization}")
+        self.client = client or QdrantClient(host=host, port=port)
+        self.quantization = quantization
+        self.config = config or QdrantCollectionConfig.from_env()
+        for field_name, schema in self.config.payload_indexes.items():
+            if schema not in (PayloadSchemaType.KEYWORD.value, PayloadSchemaType.INTEGER.value):
+                raise ValueError(f"Neatbalstīts payload indeksa tips {field_name}: {schema}")
+
+    @property
+    def vectors_on_disk(self) -> bool:
+        if self.config.vectors_on_disk is not None:
+            return self.config.vectors_on_disk
+        return self.quantization is not None
+
+    def _hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(m=self.config.hnsw_m, ef_construct=self.config.hnsw_ef_construct,
+                              full_scan_threshold=self.config.full_scan_threshold)
+
+    def _optimizers_config(self) -> OptimizersConfigDiff:
+        return OptimizersConfigDiff(indexing_threshold=self.config.indexing_threshold,
+                                    memmap_threshold=self.config.memmap_threshold)
+
+    def _quantization_config(self):
+        """Qdrant kvantizācija: saspiestie vektori RAM, oriģinālie uz diska pārvērtēšanai"""
+        if self.quantization == "int8":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "pq":
+            return ProductQuantization(
+                product=ProductQuantizationConfig(compression=CompressionRatio.X16, always_ram=True)
+            )
+        return None
+        
+    def initialize_collection(self) -> bool:
+        """Inicializē Qdrant kolekciju; atgriež False, ja Qdrant nav pieejams"""
         try:
             # Pārbauda, vai kolekcija jau eksistē
             collections = self.client.get_collections()
@@ -189,83 +464,208 @@ class QdrantWorkflowDatabase:
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=self.vector_size,
-                        distance=Distance.COSINE
-                    )
+                        distance=Distance.COSINE,
+                        on_disk=self.vectors_on_disk
+                    ),
+                    hnsw_config=self._hnsw_config(),
+                    optimizers_config=self._optimizers_config(),
+                    on_disk_payload=self.config.on_disk_payload,
+                    quantization_config=self._quantization_config()
                 )
                 print(f"Izveidota kolekcija: {self.collection_name}")
+                payload_schema = {}
             else:
                 print(f"Kolekcija jau eksistē: {self.collection_name}")
+                payload_schema = self._migrate_collection()
+            self._ensure_payload_indexes(payload_schema)
+            return True
                 
         except Exception as e:
             print(f"Kļūda inicializējot kolekciju: {e}")
+            return False
+    
+    def _migrate_collection(self) -> Dict[str, Any]:
+        """Pielāgo esošās kolekcijas iestatījumus konfigurācijai; atgriež esošo payload shēmu.
+
+        Qdrant pārbūvē indeksus fonā, kolekcija paliek pieejama meklēšanai.
+        """
+        info = self.client.get_collection(self.collection_name)
+        current = info.config
+        changes: Dict[str, Any] = {}
+
+        hnsw = current.hnsw_config
+        if (hnsw.m, hnsw.ef_construct, hnsw.full_scan_threshold) != (
+                self.config.hnsw_m, self.config.hnsw_ef_construct, self.config.full_scan_threshold):
+            changes["hnsw_config"] = self._hnsw_config()
+
+        optimizer = current.optimizer_config
+        if (optimizer.indexing_threshold != self.config.indexing_threshold
+                or (self.config.memmap_threshold is not None
+                    and optimizer.memmap_threshold != self.config.memmap_threshold)):
+            changes["optimizers_config"] = self._optimizers_config()
+
+        vectors = current.params.vectors
+        if isinstance(vectors, VectorParams):
+            if vectors.size != self.vector_size:
+                raise ValueError(
+                    f"Qdrant kolekcijas izmērs {vectors.size} nesakrīt ar embedding izmēru {self.vector_size}"
+                )
+            if bool(vectors.on_disk) != self.vectors_on_disk:
+                changes["vectors_config"] = {"": VectorParamsDiff(on_disk=self.vectors_on_disk)}
+
+        if bool(current.params.on_disk_payload) != self.config.on_disk_payload:
+            changes["collection_params"] = CollectionParamsDiff(on_disk_payload=self.config.on_disk_payload)
+
+        # Salīdzina visu kvantizācijas konfigurāciju (veids un parametri), ne tikai ieslēgta/izslēgta
+        quantization = self._quantization_config()
+        if not self._same_quantization(current.quantization_config, quantization):
+            changes["quantization_config"] = quantization or Disabled.DISABLED
+
+        if changes:
+            self.client.update_collection(collection_name=self.collection_name, **changes)
+            print(f"Kolekcijas iestatījumi atjaunināti: {', '.join(changes)}")
+        return dict(info.payload_schema or {})
+
+    @staticmethod
+    def _same_quantization(current, desired) -> bool:
+        """Vai kolekcijas kvantizācija sakrīt ar vēlamo; neiestatītie (None) lauki netiek salīdzināti"""
+        if current is None or desired is None:
+            return current is None and desired is None
+        return (type(current) is type(desired)
+                and current.model_dump(exclude_none=True) == desired.model_dump(exclude_none=True))
+
+    def _ensure_payload_indexes(self, payload_schema: Dict[str, Any]):
+        """Izveido trūkstošos payload indeksus filtrētai meklēšanai"""
+        for field_name, schema in self.config.payload_indexes.items():
+            if field_name in payload_schema:
+                continue
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType(schema),
+                wait=True
+            )
+            print(f"Izveidots payload indekss: {field_name} ({schema})")
+
+    def _point(self, workflow_vector: WorkflowVector) -> PointStruct:
+        """WorkflowVector → Qdrant punkts"""
+        return PointStruct(
+            id=workflow_vector.id,
+            vector=workflow_vector.vector,
+            payload=self._payload(workflow_vector)
+        )
     
     def add_workflow(self, workflow_vector: WorkflowVector):
         """Pievieno workflow vektoru datu bāzei"""
         try:
-            point = PointStruct(
-                id=workflow_vector.id,
-                vector=workflow_vector.vector,
-                payload={
-                    "name": workflow_vector.metadata.name,
-                    "description": workflow_vector.metadata.description,
-                    "category": workflow_vector.metadata.category,
-                    "tags": workflow_vector.metadata.tags,
-                    "nodes_count": workflow_vector.metadata.nodes_count,
-                    "complexity_score": workflow_vector.metadata.complexity_score,
-                    "language": workflow_vector.metadata.language,
-                    "created_at": workflow_vector.metadata.created_at,
-                    "json_content": json.dumps(workflow_vector.json_content)
-                }
-            )
-            
             self.client.upsert(
                 collection_name=self.collection_name,
-                points=[point]
+                points=[self._point(workflow_vector)]
             )
+            self.version += 1
             print(f"Pievienots workflow: {workflow_vector.metadata.name}")
             
         except Exception as e:
             print(f"Kļūda pievienojot workflow: {e}")
     
+    def add_workflows(self, workflow_vectors: Iterable[WorkflowVector],
+                      batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """Pievieno vairākus workflow vektorus ar lieliem upsert pieprasījumiem; atgriež skaitu"""
+        points = [self._point(workflow_vector) for workflow_vector in workflow_vectors]
+        try:
+            self.client.upload_points(
+                collection_name=self.collection_name,
+                points=points,
+                batch_size=batch_size,
+                wait=True
+            )
+            self.version += 1
+            return len(points)
+        except Exception as e:
+            print(f"Kļūda pievienojot {len(points)} workflow: {e}")
+            return 0
+    
     def search_similar_workflows(self, query_vector: List[float], limit: int = 5, 
-                                category_filter: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Meklē līdzīgus workflow"""
+                                category_filter: Optional[str] = None, hydrate: bool = True) -> List[Dict[str, Any]]:
+        """Meklē līdzīgus workflow
+        
+        Ar `hydrate=False` rezultātos ir tikai metadati; pilno JSON pēc tam
+        ielādē `hydrate()` tikai tiem rezultātiem, kas tiks atgriezti.
+        """
         try:
-            search_filter = None
-            if category_filter:
-                search_filter = Filter(
-                    must=[
-                        FieldCondition(
-                            key="category",
-                            match=MatchValue(value=category_filter)
-                        )
-                    ]
-                )
-            
-            search_result = self.client.search(
+            search_result = self.client.query_points(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
-                query_filter=search_filter,
+                query=query_vector,
+                query_filter=self._search_filter(category_filter),
+                search_params=self._search_params(),
                 limit=limit,
                 with_payload=True
-            )
+            ).points
             
-            results = []
-            for hit in search_result:
-                result = {
-                    "id": hit.id,
-                    "score": hit.score,
-                    "metadata": hit.payload,
-                    "workflow_json": json.loads(hit.payload["json_content"])
-                }
-                results.append(result)
-            
-            return results
+            results = self._results(search_result)
+            return self.hydrate(results) if hydrate else results
             
         except Exception as e:
             print(f"Kļūda meklējot workflow: {e}")
             return []
     
+    def search_many(self, query_vectors: List[List[float]], limit: int = 5, category_filter: Optional[str] = None,
+                    hydrate: bool = True) -> List[List[Dict[str, Any]]]:
+        """Meklē vairākiem vaicājuma vektoriem ar vienu Qdrant batch pieprasījumu"""
+        if not query_vectors:
+            return []
+        search_filter = self._search_filter(category_filter)
+        search_params = self._search_params()
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    QueryRequest(query=query_vector, filter=search_filter, params=search_params,
+                                 limit=limit, with_payload=True)
+                    for query_vector in query_vectors
+                ]
+            )
+        except Exception as e:
+            print(f"Kļūda meklējot {len(query_vectors)} vaicājumus: {e}")
+            return [[] for _ in query_vectors]
+        
+        batches = [self._results(response.points) for response in responses]
+        return [self.hydrate(results) if hydrate else results for results in batches]
+    
+    @staticmethod
+    def _search_filter(category_filter: Optional[str]) -> Optional[Filter]:
+        if not category_filter:
+            return None
+        return Filter(
+            must=[
+                FieldCondition(
+                    key="category",
+                    match=MatchValue(value=category_filter)
+                )
+            ]
+        )
+    
+    def _search_params(self) -> Optional[SearchParams]:
+        if not self.quantization:
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=True, oversampling=RESCORE_OVERSAMPLING[self.quantization]
+            )
+        )
+    
+    @staticmethod
+    def _results(points) -> List[Dict[str, Any]]:
+        """Qdrant punkti → rezultātu vārdnīcas (tikai metadati)"""
+        return [
+            {
+                "id": hit.id,
+                "score": hit.score,
+                "metadata": hit.payload
+            }
+            for hit in points
+        ]
+    
     def get_workflow_by_id(self, workflow_id: str) -> Optional[Dict[str, Any]]:
         """Iegūst workflow pēc ID"""
         try:
@@ -277,11 +677,11 @@ class QdrantWorkflowDatabase:
             
             if result:
                 hit = result[0]
-                return {
+                hydrated = self.hydrate([{
                     "id": hit.id,
-                    "metadata": hit.payload,
-                    "workflow_json": json.loads(hit.payload["json_content"])
-                }
+                    "metadata": hit.payload
+                }])
+                return hydrated[0] if hydrated else None
             return None
             
         except Exception as e:
@@ -301,6 +701,66 @@ class QdrantWorkflowDatabase:
             print(f"Kļūda iegūstot statistiku: {e}")
             return {}
 
+def iter_workflow_files(folder: str) -> Iterator[Dict[str, Any]]:
+    """Straumē workflow JSON no mapes; bojātus un ne-workflow failus izlaiž"""
+    for path in iter_json_files(folder):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                workflow_json = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Kļūda failā {os.path.basename(path)}: {e}")
+            continue
+        if isinstance(workflow_json, dict) and isinstance(workflow_json.get('nodes'), list):
+            yield workflow_json
+
+def index_workflows(workflows: Iterable[Dict[str, Any]], vectorizer: WorkflowVectorizer,
+                    database: WorkflowIndex, chunk_size: int = 1000, lexical_index=None,
+                    failed: Optional[List[Dict[str, Any]]] = None) -> Dict[str, int]:
+    """Indeksē workflow straumi: porcijas vektorizē paketēti un ieraksta Qdrant.
+    
+    Porcijas upsert notiek fonā, kamēr tiek vektorizēta nākamā porcija; atmiņā
+    vienlaikus ir ne vairāk kā divas porcijas. Ja kāda embedding pakete
+    neizdodas, tiek izlaisti tikai tās workflow — tie tiek pievienoti *failed*
+    (ja norādīts) atkārtotai indeksēšanai, bet pārējā porcija tiek ierakstīta.
+    Ierakstītās porcijas tiek pievienotas arī `lexical_index` (LexicalIndex), ja tas norādīts.
+    Beigās tiek izsaukts `database.flush()` (piem., lokālā indeksa HNSW grafa saglabāšanai)
+    un `lexical_index.flush()` — abi indeksi tiek ierakstīti diskā vienreiz.
+    """
+    stats = {"indexed": 0, "failed": 0}
+    workflows = iter(workflows)
+    
+    def write(vectors: List[WorkflowVector]) -> int:
+        written = database.add_workflows(vectors)
+        if written and lexical_index is not None:
+            lexical_index.add_workflows(vectors)
+        return written
+    
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        pending = None
+        while True:
+            chunk = list(islice(workflows, chunk_size))
+            if not chunk:
+                break
+            chunk_failed: List[Dict[str, Any]] = []
+            vectors = vectorizer.vectorize_many(chunk, failed=chunk_failed)
+            stats["failed"] += len(chunk_failed)
+            if failed is not None:
+                failed.extend(chunk_failed)
+            if not vectors:
+                continue
+            
+            if pending is not None:
+                stats["indexed"] += pending.result()
+            pending = writer.submit(write, vectors)
+        
+        if pending is not None:
+            stats["indexed"] += pending.result()
+    
+    database.flush()
+    if lexical_index is not None:
+        lexical_index.flush()
+    return stats
+
 # Lietošanas piemērs
 if __name__ == "__main__":
     # Inicializē OpenAI klientu
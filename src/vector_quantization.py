@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Vector Quantization for n8n Workflow AI Agent
+Šis modulis nodrošina workflow vektoru saspiešanu lokālajam indeksam:
+
+- int8 skalārā kvantizācija (katrai dimensijai sava nobīde un mērogs) — 4x
+  mazāk atmiņas nekā float32;
+- produkta kvantizācija (PQ): vektors tiek sadalīts apakšvektoros, katru
+  aizstāj ar tuvākā k-means centroīda numuru (1 baits) — noklusējumā 16x.
+
+Saspiestie kodi tiek lietoti tikai kandidātu atlasei; kandidātu galīgā
+secība tiek noteikta ar precīzo float32 kosinusu (`rescore`). Kvantizatori
+strādā ar normalizētiem vektoriem, tāpēc skalārais reizinājums ir kosinuss.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Cik rindu apstrādā vienā blokā (ierobežo pagaidu float32 masīvu izmēru)
+_BLOCK_ROWS = 8192
+# PQ centroīdu piešķiršanas bloks: attālumu tensors ir (apakštelpas × rindas × centroīdi);
+# 1536 dimensijām (384 apakštelpas) un 256 rindām tie ir ~100 MB
+_ASSIGN_ROWS = 256
+
+
+class ScalarQuantizer:
+    """int8 skalārā kvantizācija ar min/max diapazonu katrai dimensijai"""
+
+    kind = "int8"
+
+    def __init__(self, offsets: np.ndarray, scales: np.ndarray):
+        self.offsets = offsets.astype(np.float32)
+        self.scales = scales.astype(np.float32)
+
+    @property
+    def dim(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def code_size(self) -> int:
+        """Baiti uz vienu vektoru"""
+        return self.dim
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, **_options) -> "ScalarQuantizer":
+        low = vectors.min(axis=0)
+        high = vectors.max(axis=0)
+        scales = np.maximum(high - low, 1e-12) / 255.0
+        return cls(low, scales)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((vectors - self.offsets) / self.scales)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scales + self.offsets
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Aptuvenais skalārais reizinājums katram kodam ar *query*"""
+        weights = (query * self.scales).astype(np.float32)
+        bias = float(query @ self.offsets)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _BLOCK_ROWS):
+            block = codes[start:start + _BLOCK_ROWS]
+            out[start:start + len(block)] = block.astype(np.float32) @ weights + bias
+        return out
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"kind": np.asarray(self.kind), "offsets": self.offsets, "scales": self.scales}
+
+
+class ProductQuantizer:
+    """Produkta kvantizācija: `subspaces` apakšvektori, katram līdz 256 centroīdiem"""
+
+    kind = "pq"
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = centroids.astype(np.float32)  # (apakštelpas, centroīdi, apakšdimensija)
+
+    @property
+    def subspaces(self) -> int:
+        return self.centroids.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[0] * self.centroids.shape[2]
+
+    @property
+    def code_size(self) -> int:
+        return self.subspaces
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, subvector_dim: int = 4, centroids: int = 256,
+              iterations: int = 12, sample: int = 8192, seed: int = 0, **_options) -> "ProductQuantizer":
+        """k-means katrā apakštelpā (visas apakštelpas tiek apstrādātas vienlaikus)"""
+        count, dim = vectors.shape
+        if dim % subvector_dim:
+            raise ValueError(f"Dimensijai {dim} jādalās ar apakšvektora izmēru {subvector_dim}")
+        rng = np.random.default_rng(seed)
+        if count > sample:
+            vectors = vectors[np.sort(rng.choice(count, sample, replace=False))]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ks = min(centroids, len(vectors))
+        subspaces = dim // subvector_dim
+
+        # (apakštelpas, paraugi, apakšdimensija)
+        points = vectors.reshape(len(vectors), subspaces, subvector_dim).transpose(1, 0, 2)
+        centers = points[:, rng.choice(len(vectors), ks, replace=False), :].copy()
+        for _ in range(iterations):
+            # Centroīdu vidējie visās apakštelpās uzreiz: grupas numurs = apakštelpa * ks + centroīds
+            groups = (cls._assign(points, centers) + np.arange(subspaces)[:, None] * ks).reshape(-1)
+            counts = np.bincount(groups, minlength=subspaces * ks).reshape(subspaces, ks)
+            sums = np.stack([
+                np.bincount(groups, weights=points[:, :, j].reshape(-1), minlength=subspaces * ks)
+                for j in range(subvector_dim)
+            ], axis=1).reshape(subspaces, ks, subvector_dim)
+            filled = counts > 0
+            centers[filled] = (sums[filled] / counts[filled][:, None]).astype(np.float32)
+        return cls(centers)
+
+    @staticmethod
+    def _assign(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """Tuvākā centroīda numurs katram apakšvektoram: (apakštelpas, punkti).
+
+        Punkti tiek apstrādāti pa `_ASSIGN_ROWS`, lai attālumu tensors
+        nepieaugtu līdz vairākiem GB pilnas embedding dimensijas gadījumā.
+        """
+        # |x - c|² = |x|² - 2x·c + |c|²; |x|² neietekmē argmin
+        squared = (centers ** 2).sum(axis=2)[:, None, :]
+        centers_t = centers.transpose(0, 2, 1)
+        assigned = np.empty(points.shape[:2], dtype=np.intp)
+        for start in range(0, points.shape[1], _ASSIGN_ROWS):
+            distances = np.matmul(points[:, start:start + _ASSIGN_ROWS], centers_t)
+            distances *= -2
+            distances += squared
+            assigned[:, start:start + distances.shape[1]] = distances.argmin(axis=2)
+        return assigned
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        sub_dim = self.centroids.shape[2]
+        for start in range(0, len(vectors), _BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + _BLOCK_ROWS], dtype=np.float32)
+            points = block.reshape(len(block), self.subspaces, sub_dim).transpose(1, 0, 2)
+            codes[start:start + len(block)] = self._assign(points, self.centroids).T
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = self.centroids[np.arange(self.subspaces)[None, :], codes]
+        return parts.reshape(len(codes), self.dim)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Asimetriskais attālums: vaicājums paliek float32, kodi tiek summēti no tabulas"""
+        sub_query = query.astype(np.float32).reshape(self.subspaces, -1)
+        table = np.einsum("skd,sd->sk", self.centroids, sub_query)
+        offsets = (np.arange(self.subspaces) * table.shape[1]).astype(np.int64)
+        flat = table.reshape(-1)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _BLOCK_ROWS):
+            block = codes[start:start + _BLOCK_ROWS]
+            out[start:start + len(block)] = flat[block.astype(np.int64) + offsets].sum(axis=1)
+        return out
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"kind": np.asarray(self.kind), "centroids": self.centroids}
+
+
+QUANTIZERS = {
+    ScalarQuantizer.kind: ScalarQuantizer,
+    ProductQuantizer.kind: ProductQuantizer,
+}
+
+def train_quantizer(kind: str, vectors: np.ndarray, **options):
+    """Apmāca kvantizatoru ("int8" vai "pq") uz normalizētiem vektoriem"""
+    try:
+        quantizer_class = QUANTIZERS[kind]
+    except KeyError:
+        raise ValueError(f"Nezināms kvantizācijas veids: {kind}") from None
+    return quantizer_class.train(np.asarray(vectors, dtype=np.float32), **options)
+
+
+def quantizer_from_arrays(arrays: Dict[str, np.ndarray]):
+    """Atjauno kvantizatoru no `to_arrays()` rezultāta"""
+    kind = str(arrays["kind"])
+    if kind == ScalarQuantizer.kind:
+        return ScalarQuantizer(arrays["offsets"], arrays["scales"])
+    if kind == ProductQuantizer.kind:
+        return ProductQuantizer(arrays["centroids"])
+    raise ValueError(f"Nezināms kvantizācijas veids: {kind}")
+
+
+def normalize_rows(vectors: np.ndarray, norms: Optional[np.ndarray] = None) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1) if norms is None else norms
+    return (vectors / np.maximum(norms, 1e-12)[:, None]).astype(np.float32)
+
+
+def encode_matrix(quantizer, matrix: np.ndarray, norms: np.ndarray) -> np.ndarray:
+    """Kodē (piem., mmap) matricu blokos, katru rindu iepriekš normalizējot"""
+    codes = np.empty((len(matrix), quantizer.code_size), dtype=np.uint8)
+    for start in range(0, len(matrix), _BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + _BLOCK_ROWS], dtype=np.float32)
+        codes[start:start + len(block)] = quantizer.encode(normalize_rows(block, norms[start:start + len(block)]))
+    return codes
+
+
+def rescore(matrix: np.ndarray, norms: np.ndarray, rows: np.ndarray, query: np.ndarray,
+            limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Precīzais kosinuss kandidātu rindām; atgriež (rindas, līdzības) dilstošā secībā"""
+    rows = np.sort(rows)  # secīga lasīšana no mmap
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    scores = (matrix[rows] @ query) / np.maximum(norms[rows], 1e-12)
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return rows[order], scores[order]
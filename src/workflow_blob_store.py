@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Workflow Blob Store for n8n Workflow AI Agent
+Šis modulis glabā pilnos workflow JSON lokālā, satura adresētā krātuvē.
+Qdrant punktos paliek tikai metadati un `content_hash`; pilnais JSON tiek
+ielasīts tikai tiem rezultātiem, kas tiešām tiek atgriezti lietotājam.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+# Noklusējuma krātuve blakus aplikācijas datubāzei
+DEFAULT_BLOB_PATH = os.environ.get("WORKFLOW_BLOB_PATH", "database/workflow_blobs")
+
+
+def canonical_json(workflow_json: Dict[str, Any]) -> bytes:
+    """Kanoniskā JSON forma — vienāds saturs dod vienādus baitus un hash"""
+    return json.dumps(workflow_json, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(workflow_json: Dict[str, Any]) -> str:
+    """Workflow satura adrese (sha256 no kanoniskā JSON)"""
+    return hashlib.sha256(canonical_json(workflow_json)).hexdigest()
+
+
+class WorkflowBlobStore:
+    """Saspiesti workflow JSON faili, sadalīti apakšmapēs pēc hash prefiksa"""
+
+    def __init__(self, root: str = DEFAULT_BLOB_PATH):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.json.z")
+
+    def __contains__(self, digest: object) -> bool:
+        return isinstance(digest, str) and os.path.exists(self._path(digest))
+
+    def put(self, workflow_json: Dict[str, Any]) -> str:
+        """Saglabā workflow (ja tāda vēl nav) un atgriež tā content_hash"""
+        data = canonical_json(workflow_json)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            with open(tmp_path, "wb") as fh:
+                fh.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def put_many(self, workflows: Iterable[Dict[str, Any]]) -> List[str]:
+        return [self.put(workflow_json) for workflow_json in workflows]
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Ielasa workflow pēc content_hash; None, ja tāda nav"""
+        try:
+            with open(self._path(digest), "rb") as fh:
+                return json.loads(zlib.decompress(fh.read()))
+        except FileNotFoundError:
+            return None
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Atgriež {content_hash: workflow} atrastajiem workflow"""
+        found = {}
+        for digest in dict.fromkeys(digests):
+            workflow_json = self.get(digest)
+            if workflow_json is not None:
+                found[digest] = workflow_json
+        return found
@@ -4,13 +4,26 @@ Workflow Search Algorithm for n8n AI Agent
 Šis modulis implementē inteliģentu workflow meklēšanas algoritmu.
 """
 
+import os
 import re
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from enum import Enum
+import numpy as np
 import openai
-from src.vector_database_design import QdrantWorkflowDatabase, WorkflowVectorizer
+from src.keyword_automaton import KeywordAutomaton
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.search_result_cache import SearchResultCache, query_signature
+from src.embedding_backends import EmbeddingError
+from src.vector_database_design import QdrantWorkflowDatabase, WorkflowIndex, WorkflowVectorizer
+
+# Cik kandidātu iegūst no indeksiem pirms pārranžēšanas (lielāks — labāks recall)
+RERANK_CANDIDATES = int(os.environ.get("SEARCH_RERANK_CANDIDATES", "200"))
+# Fona pavedieni embedding pieprasījumiem (viens meklēšanas dzinējam)
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "4"))
 
 class SearchIntent(Enum):
     """Meklēšanas nolūka tipi"""
@@ -35,9 +48,66 @@ class SearchResult:
     workflow_id: str
     workflow_name: str
     similarity_score: float
-    workflow_json: Dict[str, Any]
+    workflow_json: Optional[Dict[str, Any]]  # None, kamēr rezultāts nav hidratēts
     match_reasons: List[str]
     suggested_modifications: List[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)  # indeksa payload (t.sk. content_hash)
+
+@dataclass
+class VocabularyMatches:
+    """Visu vārdnīcu sakritības vienā teksta piegājienā"""
+    keywords: Dict[str, List[str]]  # valoda → atslēgvārdu kategorijas
+    entities: Dict[str, List[str]]
+    intent: SearchIntent
+    complexity: str
+
+class _CandidateColumns:
+    """Kandidātu kolonnas pārranžēšanai, izveidotas vienreiz katrai kandidātu kopai.
+    
+    `tag_hits` un `description_hits` ir (kandidāti × unikālie atslēgvārdi)
+    Būla matricas; `keyword_counts` — cik reizes katrs atslēgvārds ir vaicājumā.
+    """
+    
+    __slots__ = ("scores", "complexity", "nodes_count", "keywords", "keyword_counts",
+                 "tag_hits", "description_hits", "row_by_id")
+    
+    def __init__(self, results: List[Dict[str, Any]], query_keywords: List[str]):
+        counts: Dict[str, int] = {}
+        for keyword in query_keywords:
+            counts[keyword] = counts.get(keyword, 0) + 1
+        self.keywords = list(counts)
+        self.keyword_counts = np.array(list(counts.values()), dtype=np.float64)
+        column = {keyword: j for j, keyword in enumerate(self.keywords)}
+        
+        metadata = [result['metadata'] for result in results]
+        self.scores = np.array([result['score'] for result in results], dtype=np.float64)
+        self.complexity = np.array([item['complexity_score'] for item in metadata], dtype=np.float64)
+        self.nodes_count = np.array([item['nodes_count'] for item in metadata], dtype=np.int64)
+        self.row_by_id = {result['id']: row for row, result in enumerate(results)}
+        
+        self.tag_hits = np.zeros((len(results), len(self.keywords)), dtype=bool)
+        for row, item in enumerate(metadata):
+            for tag in item.get('tags') or ():
+                j = column.get(tag)
+                if j is not None:
+                    self.tag_hits[row, j] = True
+        self.description_hits = np.zeros_like(self.tag_hits)
+        if results and self.keywords:
+            descriptions = np.array([(item.get('description') or '').lower() for item in metadata], dtype=str)
+            for j, keyword in enumerate(self.keywords):
+                self.description_hits[:, j] = np.char.find(descriptions, keyword) >= 0
+    
+    def keyword_match(self) -> np.ndarray:
+        """Atslēgvārdu atbilstība: birka 1.0, apraksts 0.5, vidēji pa vaicājuma atslēgvārdiem"""
+        if not self.keywords:
+            return np.full(len(self.scores), 0.5)  # Neitrāls punktu skaits, ja nav atslēgvārdu
+        hits = np.where(self.tag_hits, 1.0, np.where(self.description_hits, 0.5, 0.0))
+        return (hits @ self.keyword_counts) / self.keyword_counts.sum()
+    
+    def keyword_hits(self, result_id: Any) -> Dict[str, bool]:
+        """Vaicājuma atslēgvārds → vai tas ir starp workflow birkām"""
+        row = self.tag_hits[self.row_by_id[result_id]]
+        return {keyword: bool(hit) for keyword, hit in zip(self.keywords, row)}
 
 class NaturalLanguageProcessor:
     """Dabiskās valodas apstrādes klase"""
@@ -78,6 +148,90 @@ class NaturalLanguageProcessor:
                 'webhook': ['webhook', 'web hook']
             }
         }
+        
+        # Entītiju vārdi (tikai veseli vārdi); katra grupa atbilst vienam sākotnējam regex šablonam
+        self.entity_patterns = {
+            'services': [
+                ['telegram', 'discord', 'slack', 'whatsapp'],
+                ['gmail', 'outlook', 'email'],
+                ['mysql', 'postgres', 'mongodb'],
+                ['supabase', 'firebase', 'airtable']
+            ],
+            'actions': [
+                ['send', 'receive', 'create', 'update', 'delete', 'get', 'post'],
+                ['sūtīt', 'saņemt', 'izveidot', 'atjaunināt', 'dzēst'],
+                ['отправить', 'получить', 'создать', 'обновить', 'удалить']
+            ],
+            'technologies': []
+        }
+        
+        # Nolūku un sarežģītības vārdi prioritātes secībā (apakšvirknes)
+        self.intent_words = [
+            (SearchIntent.CREATE_NEW, ['create', 'izveidot', 'radīt', 'создать']),
+            (SearchIntent.FIND_SIMILAR, ['find', 'search', 'atrast', 'meklēt', 'найти']),
+            (SearchIntent.MODIFY_EXISTING, ['modify', 'change', 'pielāgot', 'mainīt', 'изменить']),
+            (SearchIntent.EXPLAIN_WORKFLOW, ['explain', 'how', 'kā', 'как', 'paskaidrot'])
+        ]
+        self.complexity_words = [
+            ('simple', ['simple', 'basic', 'vienkāršs', 'простой']),
+            ('complex', ['complex', 'advanced', 'sarežģīts', 'сложный'])
+        ]
+        
+        self.compile_vocabulary()
+    
+    def compile_vocabulary(self) -> KeywordAutomaton:
+        """Kompilē visas vārdnīcas vienā automātā (jāizsauc atkārtoti, ja vārdnīcas mainītas)"""
+        patterns = []
+        # Kategoriju secība rezultātā (kā vārdnīcā)
+        self._category_order = {
+            language: {category: order for order, category in enumerate(keyword_dict)}
+            for language, keyword_dict in self.keywords_mapping.items()
+        }
+        for language, keyword_dict in self.keywords_mapping.items():
+            for category, words in keyword_dict.items():
+                patterns.extend((word, ('keyword', language, category), False) for word in words)
+        for kind, groups in self.entity_patterns.items():
+            for group, words in enumerate(groups):
+                patterns.extend((word, ('entity', kind, group), True) for word in words)
+        for priority, (_intent, words) in enumerate(self.intent_words):
+            patterns.extend((word, ('intent', priority), False) for word in words)
+        for priority, (_complexity, words) in enumerate(self.complexity_words):
+            patterns.extend((word, ('complexity', priority), False) for word in words)
+        self._automaton = KeywordAutomaton(patterns)
+        return self._automaton
+    
+    def match_vocabulary(self, text: str) -> VocabularyMatches:
+        """Atslēgvārdi (visām valodām), entītijas, nolūks un sarežģītība vienā teksta piegājienā"""
+        text_lower = text.lower()
+        found_keywords = {language: set() for language in self._category_order}
+        found_entities = []
+        intent = complexity = None
+        
+        for start, end, (kind, *value) in self._automaton.iter_matches(text_lower):
+            if kind == 'keyword':
+                found_keywords[value[0]].add(value[1])
+            elif kind == 'entity':
+                found_entities.append((value[0], value[1], start, text_lower[start:end]))
+            elif kind == 'intent':
+                intent = value[0] if intent is None else min(intent, value[0])
+            else:
+                complexity = value[0] if complexity is None else min(complexity, value[0])
+        
+        keywords = {
+            language: sorted(found, key=self._category_order[language].__getitem__)
+            for language, found in found_keywords.items()
+        }
+        # Secība kā regex findall: pa grupām, grupas ietvaros — teksta secībā
+        entities = {kind: [] for kind in self.entity_patterns}
+        for kind, _group, _start, word in sorted(found_entities, key=lambda match: (match[1], match[2])):
+            entities[kind].append(word)
+        
+        return VocabularyMatches(
+            keywords=keywords,
+            entities=entities,
+            intent=self.intent_words[intent][0] if intent is not None else SearchIntent.CREATE_NEW,
+            complexity=self.complexity_words[complexity][0] if complexity is not None else 'medium'
+        )
     
     def detect_language(self, text: str) -> str:
         """Nosaka teksta valodu"""
@@ -91,135 +245,267 @@ class NaturalLanguageProcessor:
     
     def extract_keywords(self, text: str, language: str) -> List[str]:
         """Ekstraktē atslēgvārdus no teksta"""
-        keywords = []
-        text_lower = text.lower()
-        
-        keyword_dict = self.keywords_mapping.get(language, self.keywords_mapping['en'])
-        
-        for category, words in keyword_dict.items():
-            for word in words:
-                if word in text_lower:
-                    keywords.append(category)
-                    break
-        
-        return list(set(keywords))
+        keywords = self.match_vocabulary(text).keywords
+        return keywords.get(language, keywords['en'])
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Ekstraktē entītijas no teksta"""
-        entities = {
-            'services': [],
-            'actions': [],
-            'technologies': []
-        }
-        
-        # Servisu noteikšana
-        services_patterns = [
-            r'\b(telegram|discord|slack|whatsapp)\b',
-            r'\b(gmail|outlook|email)\b',
-            r'\b(mysql|postgres|mongodb)\b',
-            r'\b(supabase|firebase|airtable)\b'
-        ]
-        
-        for pattern in services_patterns:
-            matches = re.findall(pattern, text.lower())
-            entities['services'].extend(matches)
-        
-        # Darbību noteikšana
-        action_patterns = [
-            r'\b(send|receive|create|update|delete|get|post)\b',
-            r'\b(sūtīt|saņemt|izveidot|atjaunināt|dzēst)\b',
-            r'\b(отправить|получить|создать|обновить|удалить)\b'
-        ]
-        
-        for pattern in action_patterns:
-            matches = re.findall(pattern, text.lower())
-            entities['actions'].extend(matches)
-        
-        return entities
+        return self.match_vocabulary(text).entities
     
     def determine_intent(self, text: str, keywords: List[str]) -> SearchIntent:
         """Nosaka lietotāja nolūku"""
-        text_lower = text.lower()
-        
-        # Nolūka noteikšanas loģika
-        if any(word in text_lower for word in ['create', 'izveidot', 'radīt', 'создать']):
-            return SearchIntent.CREATE_NEW
-        elif any(word in text_lower for word in ['find', 'search', 'atrast', 'meklēt', 'найти']):
-            return SearchIntent.FIND_SIMILAR
-        elif any(word in text_lower for word in ['modify', 'change', 'pielāgot', 'mainīt', 'изменить']):
-            return SearchIntent.MODIFY_EXISTING
-        elif any(word in text_lower for word in ['explain', 'how', 'kā', 'как', 'paskaidrot']):
-            return SearchIntent.EXPLAIN_WORKFLOW
-        else:
-            return SearchIntent.CREATE_NEW  # Noklusējuma nolūks
+        return self.match_vocabulary(text).intent
     
     def determine_complexity(self, text: str) -> str:
         """Nosaka vēlamo sarežģītības līmeni"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['simple', 'basic', 'vienkāršs', 'простой']):
-            return 'simple'
-        elif any(word in text_lower for word in ['complex', 'advanced', 'sarežģīts', 'сложный']):
-            return 'complex'
-        else:
-            return 'medium'
+        return self.match_vocabulary(text).complexity
     
     def parse_query(self, text: str) -> SearchQuery:
         """Parsē lietotāja vaicājumu"""
         language = self.detect_language(text)
-        keywords = self.extract_keywords(text, language)
-        entities = self.extract_entities(text)
-        intent = self.determine_intent(text, keywords)
-        complexity = self.determine_complexity(text)
+        matches = self.match_vocabulary(text)
         
         return SearchQuery(
             original_text=text,
-            intent=intent,
-            keywords=keywords,
-            entities=entities,
+            intent=matches.intent,
+            keywords=matches.keywords.get(language, matches.keywords['en']),
+            entities=matches.entities,
             language=language,
-            complexity_preference=complexity
+            complexity_preference=matches.complexity
         )
 
 class WorkflowSearchEngine:
-    """Workflow meklēšanas dzinējs"""
+    """Workflow meklēšanas dzinējs.
+    
+    Meklēšana ir sadalīta posmos, kas pārklājas: vaicājuma embedding tiek
+    ģenerēts fonā, kamēr tiek parsēts vaicājums un izpildīta BM25 meklēšana,
+    tāpēc kopējo laiku nosaka lēnākais posms, nevis visu posmu summa.
+    
+    Ja ir norādīts `lexical_index`, vektoru un BM25 rezultāti tiek apvienoti
+    ar RRF; vaicājumiem, kas sastāv tikai no mezglu tipu nosaukumiem,
+    embedding netiek ģenerēts vispār. `result_cache` ļauj atkārtotus un
+    gandrīz identiskus vaicājumus atbildēt no keša.
     
-    def __init__(self, db: QdrantWorkflowDatabase, vectorizer: WorkflowVectorizer, nlp: NaturalLanguageProcessor):
+    Dzinējam pieder fona pavedienu kopa (`workers` pavedieni); tā tiek
+    aizvērta ar `close()` vai izejot no `with` bloka.
+    """
+    
+    def __init__(self, db: WorkflowIndex, vectorizer: WorkflowVectorizer, nlp: NaturalLanguageProcessor,
+                 lexical_index: Optional[LexicalIndex] = None, result_cache: Optional[SearchResultCache] = None,
+                 workers: int = SEARCH_WORKERS):
         self.db = db
         self.vectorizer = vectorizer
         self.nlp = nlp
+        self.lexical_index = lexical_index
+        self.result_cache = result_cache
+        # Embedding (tīkla pieprasījums) darbojas fonā, kamēr galvenais pavediens parsē vaicājumu
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="workflow-search")
     
-    def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
-        """Galvenā meklēšanas metode"""
-        # Parsē vaicājumu
-        parsed_query = self.nlp.parse_query(query)
-        
-        # Ģenerē meklēšanas vektoru
-        search_vector = self.vectorizer.generate_embedding(query)
-        
-        # Nosaka kategorijas filtru
-        category_filter = self._determine_category_filter(parsed_query)
-        
-        # Meklē līdzīgus workflow
-        similar_workflows = self.db.search_similar_workflows(
-            query_vector=search_vector,
-            limit=max_results * 2,  # Iegūst vairāk rezultātu filtrēšanai
-            category_filter=category_filter
-        )
+    def close(self):
+        """Aptur fona pavedienus (gaida, kamēr pabeidz iesāktos embedding)"""
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self) -> "WorkflowSearchEngine":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    @staticmethod
+    def _timed(timings: Dict[str, float], stage: str, function, *args):
+        """Izsauc *function* un pieskaita posma ilgumu milisekundēs"""
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed, 2)
+    
+    def _embed(self, queries: List[str], timings: Dict[str, float]) -> List[List[float]]:
+        return self._timed(timings, "embedding", self.vectorizer.generate_embeddings, queries)
+    
+    @staticmethod
+    def _merge(vector_results: List[Dict[str, Any]],
+               lexical_results: Optional[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """Vektoru un BM25 kandidāti → viens saraksts (RRF, ja ir leksiskais indekss)"""
+        if lexical_results is None:
+            return vector_results
+        return reciprocal_rank_fusion([vector_results, lexical_results])[:limit]
+    
+    def search(self, query: str, max_results: int = 5,
+               timings: Optional[Dict[str, float]] = None, hydrate: bool = True) -> List[SearchResult]:
+        """Galvenā meklēšanas metode.
+        
+        Ja norādīts `timings`, tajā tiek ierakstīts katra posma ilgums
+        milisekundēs (parse, embedding, lexical_search, vector_search, rank,
+        hydrate) un kopējais laiks (total). Ar `hydrate=False` workflow JSON
+        netiek ielādēts (sk. `search_batch`).
+        """
+        return self.search_batch([query], max_results, timings, hydrate)[0]
+    
+    def search_batch(self, queries: List[str], max_results: int = 5,
+                     timings: Optional[Dict[str, float]] = None, hydrate: bool = True) -> List[List[SearchResult]]:
+        """Meklē vairākus vaicājumus vienlaikus; rezultāti tādā pašā secībā kā vaicājumi.
+        
+        Visi embedding tiek ģenerēti ar vienu paketētu pieprasījumu, un vektoru
+        indeksam tiek nosūtīts viens vairāku vektoru vaicājums katram
+        kategorijas filtram. `timings` posmu laiki ir summa pa visiem vaicājumiem.
+        
+        Embedding tiek sākts fonā pirms parsēšanas un `result_cache` pārbaudes;
+        precīzam keša trāpījumam tā rezultāts netiek gaidīts (embedding paliek
+        embedding kešā). Tuvie dublikāti tiek atrasti pēc embedding, pirms
+        vektoru meklēšanas.
+        
+        Ar `hydrate=False` rezultātiem `workflow_json` ir None — tos var ielādēt
+        vēlāk ar `hydrate_results` (piem., straumējot atbildi). Kešā vienmēr
+        glabājas nehidratēti rezultāti.
+        """
+        timings = {} if timings is None else timings
+        started = time.perf_counter()
+        limit = max(max_results * 2, RERANK_CANDIDATES)  # Iegūst vairāk rezultātu filtrēšanai
+        count = len(queries)
+        batches: List[Optional[List[SearchResult]]] = [None] * count
+        signatures: List[Optional[Tuple]] = [None] * count
+        
+        # Precīzi servisu nosaukumi ("airtable webhook") — bez embedding pieprasījuma
+        exact = [
+            self.lexical_index is not None and self.lexical_index.is_exact_node_query(query) for query in queries
+        ]
+        embedded = [i for i in range(count) if not exact[i]]
+        embedding = None
+        embedding_timings: Dict[str, float] = {}  # pievieno `timings` tikai tad, ja rezultāts tiek gaidīts
+        if embedded:
+            # Embedding (tīkla pieprasījums) notiek fonā, kamēr tiek parsēti vaicājumi un pārbaudīts kešs
+            embedding = self._executor.submit(self._embed, [queries[i] for i in embedded], embedding_timings)
+        
+        parsed_queries = self._timed(timings, "parse", lambda: [self.nlp.parse_query(query) for query in queries])
+        cache = self.result_cache
+        if cache is not None:
+            version = self._index_version()
+            for i, parsed_query in enumerate(parsed_queries):
+                signatures[i] = query_signature(parsed_query, self._determine_category_filter(parsed_query),
+                                                max_results)
+                batches[i] = cache.get(signatures[i], queries[i], version)
+        active = [i for i in range(count) if batches[i] is None]
+        
+        category_filters = [self._determine_category_filter(parsed_query) for parsed_query in parsed_queries]
+        
+        lexical_results: Dict[int, Optional[List[Dict[str, Any]]]] = {i: None for i in active}
+        if self.lexical_index is not None:
+            lexical_results = self._timed(timings, "lexical_search", lambda: {
+                i: self.lexical_index.search(queries[i], limit, category_filters[i]) for i in active
+            })
+        
+        candidates: Dict[int, List[Dict[str, Any]]] = {}
+        for i in active:
+            if exact[i] and lexical_results[i]:
+                candidates[i] = reciprocal_rank_fusion([lexical_results[i]], names=("lexical",))
+        # Precīzie vaicājumi bez BM25 rezultātiem tomēr tiek meklēti ar vektoriem
+        late = [i for i in active if exact[i] and i not in candidates]
+        
+        vectors: Dict[int, List[float]] = {}
+        degraded = False
+        try:
+            if embedding is not None and any(batches[i] is None for i in embedded):
+                # Kešā atrasto vaicājumu embedding netiek izmantoti
+                try:
+                    vectors.update(
+                        (i, vector) for i, vector in zip(embedded, embedding.result()) if batches[i] is None
+                    )
+                finally:
+                    timings["embedding"] = round(timings.get("embedding", 0.0)
+                                                 + embedding_timings.get("embedding", 0.0), 2)
+            if late:
+                vectors.update(zip(late, self._embed([queries[i] for i in late], timings)))
+        except EmbeddingError as e:
+            # Bez embedding joprojām var atbildēt ar leksiskajiem rezultātiem
+            if any(i not in candidates and not lexical_results[i] for i in active):
+                raise
+            print(f"Vektoru meklēšana neizdevās, tiek lietoti BM25 rezultāti: {e}")
+            vectors = {}
+            degraded = True
+        
+        groups: Dict[Optional[str], List[int]] = {}
+        for i in vectors:
+            if cache is not None:
+                batches[i] = cache.get_similar(signatures[i], vectors[i], version)
+                if batches[i] is not None:
+                    continue
+            groups.setdefault(category_filters[i], []).append(i)
+        for category_filter, rows in groups.items():
+            batch = self._timed(
+                timings, "vector_search", self.db.search_many,
+                [vectors[i] for i in rows], limit, category_filter,
+                False  # hydrate=False: pilno JSON ielādē tikai atgrieztajiem rezultātiem
+            )
+            for i, vector_results in zip(rows, batch):
+                candidates[i] = self._merge(vector_results, lexical_results[i], limit)
         
-        # Filtrē un ranžē rezultātus
-        filtered_results = self._filter_and_rank_results(similar_workflows, parsed_query)
+        for i in active:
+            if batches[i] is not None:
+                continue
+            if i not in candidates:  # embedding neizdevās — tikai BM25 rezultāti
+                candidates[i] = self._merge([], lexical_results[i], limit)
+            batches[i] = self._build_results(parsed_queries[i], candidates[i], max_results, timings)
+            if cache is not None and not (degraded and not exact[i]):
+                cache.put(signatures[i], queries[i], vectors.get(i), version, batches[i])
+        
+        if hydrate:
+            # Viena blob krātuves nolasīšana visiem vaicājumiem
+            bodies = self._load_bodies([result for batch in batches for result in batch], timings)
+            batches = [self._attach_bodies(batch, bodies) for batch in batches]
+        
+        timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+        return batches
+    
+    def _index_version(self) -> Tuple:
+        """Indeksu versija: mainās ar katru ierakstu vektoru vai BM25 indeksā"""
+        lexical_version = self.lexical_index.version if self.lexical_index is not None else None
+        return (self.db.version, lexical_version)
+    
+    def hydrate_results(self, results: List[SearchResult],
+                        timings: Optional[Dict[str, float]] = None) -> List[SearchResult]:
+        """Ielādē workflow JSON no blob krātuves; rezultāti bez JSON tiek izlaisti.
+        
+        Atgriež jaunus SearchResult objektus (kešā esošie paliek nehidratēti).
+        """
+        timings = {} if timings is None else timings
+        return self._attach_bodies(results, self._load_bodies(results, timings))
+    
+    def _load_bodies(self, results: List[SearchResult], timings: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+        """workflow_id → workflow JSON nehidratētajiem rezultātiem"""
+        pending = {result.workflow_id: result for result in results if result.workflow_json is None}
+        hydrated = self._timed(timings, "hydrate", self.db.hydrate, [
+            {"id": workflow_id, "metadata": result.metadata} for workflow_id, result in pending.items()
+        ])
+        return {item["id"]: item["workflow_json"] for item in hydrated}
+    
+    @staticmethod
+    def _attach_bodies(results: List[SearchResult], bodies: Dict[str, Dict[str, Any]]) -> List[SearchResult]:
+        return [
+            result if result.workflow_json is not None else replace(result, workflow_json=bodies[result.workflow_id])
+            for result in results
+            if result.workflow_json is not None or result.workflow_id in bodies
+        ]
+    
+    def _build_results(self, parsed_query: SearchQuery, similar_workflows: List[Dict[str, Any]],
+                       max_results: int, timings: Dict[str, float]) -> List[SearchResult]:
+        """Filtrē un ranžē kandidātus; pārveido par (nehidratētiem) SearchResult objektiem"""
+        columns = _CandidateColumns(similar_workflows, parsed_query.keywords)
+        filtered_results = self._timed(timings, "rank", self._filter_and_rank_results, similar_workflows,
+                                       parsed_query, columns)
         
-        # Pārveido par SearchResult objektiem
         search_results = []
         for result in filtered_results[:max_results]:
+            keyword_hits = columns.keyword_hits(result['id'])
             search_result = SearchResult(
                 workflow_id=result['id'],
                 workflow_name=result['metadata']['name'],
                 similarity_score=result['score'],
-                workflow_json=result['workflow_json'],
-                match_reasons=self._generate_match_reasons(result, parsed_query),
-                suggested_modifications=self._generate_modifications(result, parsed_query)
+                workflow_json=None,
+                match_reasons=self._generate_match_reasons(result, parsed_query, keyword_hits),
+                suggested_modifications=self._generate_modifications(result, parsed_query, keyword_hits),
+                metadata=result['metadata']
             )
             search_results.append(search_result)
         
@@ -241,59 +527,46 @@ class WorkflowSearchEngine:
         
         return None
     
-    def _filter_and_rank_results(self, results: List[Dict[str, Any]], query: SearchQuery) -> List[Dict[str, Any]]:
-        """Filtrē un ranžē meklēšanas rezultātus"""
+    def _filter_and_rank_results(self, results: List[Dict[str, Any]], query: SearchQuery,
+                                 columns: Optional[_CandidateColumns] = None) -> List[Dict[str, Any]]:
+        """Filtrē un ranžē meklēšanas rezultātus (kolonnās, ar NumPy)"""
+        columns = columns if columns is not None else _CandidateColumns(results, query.keywords)
+        
+        # Sarežģītības filtrs
+        keep = np.ones(len(results), dtype=bool)
+        if query.complexity_preference == 'simple':
+            keep = columns.complexity <= 30
+        elif query.complexity_preference == 'complex':
+            keep = columns.complexity >= 50
+        
+        # Pielāgo kopējo punktu skaitu ar atslēgvārdu atbilstību
+        adjusted_scores = columns.scores * 0.7 + columns.keyword_match() * 0.3
+        
+        # Kārto pēc pielāgotā punktu skaita (vienādiem — sākotnējā secībā)
+        rows = np.flatnonzero(keep)
+        rows = rows[np.argsort(-adjusted_scores[rows], kind="stable")]
         filtered_results = []
-        
-        for result in results:
-            # Sarežģītības filtrs
-            complexity_score = result['metadata']['complexity_score']
-            if query.complexity_preference == 'simple' and complexity_score > 30:
-                continue
-            elif query.complexity_preference == 'complex' and complexity_score < 50:
-                continue
-            
-            # Atslēgvārdu atbilstības pārbaude
-            keyword_match_score = self._calculate_keyword_match(result, query)
-            
-            # Pielāgo kopējo punktu skaitu
-            adjusted_score = result['score'] * 0.7 + keyword_match_score * 0.3
-            result['adjusted_score'] = adjusted_score
-            
+        for row in rows:
+            result = results[row]
+            result['adjusted_score'] = float(adjusted_scores[row])
             filtered_results.append(result)
         
-        # Kārto pēc pielāgotā punktu skaita
-        filtered_results.sort(key=lambda x: x['adjusted_score'], reverse=True)
-        
         return filtered_results
     
     def _calculate_keyword_match(self, result: Dict[str, Any], query: SearchQuery) -> float:
         """Aprēķina atslēgvārdu atbilstības punktu skaitu"""
-        workflow_tags = result['metadata'].get('tags', [])
-        workflow_description = result['metadata'].get('description', '').lower()
-        
-        match_score = 0.0
-        total_keywords = len(query.keywords)
-        
-        if total_keywords == 0:
-            return 0.5  # Neitrāls punktu skaits, ja nav atslēgvārdu
-        
-        for keyword in query.keywords:
-            if keyword in workflow_tags:
-                match_score += 1.0
-            elif keyword in workflow_description:
-                match_score += 0.5
-        
-        return match_score / total_keywords
+        return float(_CandidateColumns([result], query.keywords).keyword_match()[0])
     
-    def _generate_match_reasons(self, result: Dict[str, Any], query: SearchQuery) -> List[str]:
+    def _generate_match_reasons(self, result: Dict[str, Any], query: SearchQuery,
+                                keyword_hits: Optional[Dict[str, bool]] = None) -> List[str]:
         """Ģenerē iemeslus, kāpēc workflow atbilst vaicājumam"""
         reasons = []
         
         # Pārbauda atslēgvārdu atbilstību
-        workflow_tags = result['metadata'].get('tags', [])
+        if keyword_hits is None:
+            keyword_hits = _CandidateColumns([result], query.keywords).keyword_hits(result['id'])
         for keyword in query.keywords:
-            if keyword in workflow_tags:
+            if keyword_hits[keyword]:
                 reasons.append(f"Satur {keyword} funkcionalitāti")
         
         # Pārbauda sarežģītības atbilstību
@@ -312,7 +585,8 @@ class WorkflowSearchEngine:
         
         return reasons
     
-    def _generate_modifications(self, result: Dict[str, Any], query: SearchQuery) -> List[str]:
+    def _generate_modifications(self, result: Dict[str, Any], query: SearchQuery,
+                                keyword_hits: Optional[Dict[str, bool]] = None) -> List[str]:
         """Ģenerē ieteikumus workflow modificēšanai"""
         modifications = []
         
@@ -322,9 +596,10 @@ class WorkflowSearchEngine:
             modifications.append("Var pievienot papildu validācijas soļus")
         
         # Ieteikumi, pamatojoties uz trūkstošajām funkcijām
-        workflow_tags = result['metadata'].get('tags', [])
+        if keyword_hits is None:
+            keyword_hits = _CandidateColumns([result], query.keywords).keyword_hits(result['id'])
         for keyword in query.keywords:
-            if keyword not in workflow_tags:
+            if not keyword_hits[keyword]:
                 modifications.append(f"Var pievienot {keyword} integrāciju")
         
         return modifications
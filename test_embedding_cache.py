@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for Embedding Cache
+Šis modulis testē embedding kešu un tā izmantošanu WorkflowVectorizer.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.embedding_backends import EmbeddingError
+from src.embedding_cache import EmbeddingCache, cache_key
+from src.vector_database_design import WorkflowVectorizer
+
+
+class FakeEmbeddings:
+    """Aizstāj `openai_client.embeddings`; skaita API izsaukumus"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def create(self, model, input):
+        self.calls.append((model, input))
+        if self.fail:
+            raise RuntimeError("API nav pieejams")
+        inputs = input if isinstance(input, list) else [input]
+        data = [SimpleNamespace(embedding=[float(len(text)), 0.5, -1.0]) for text in inputs]
+        return SimpleNamespace(data=data)
+
+
+def fake_client(fail=False):
+    return SimpleNamespace(embeddings=FakeEmbeddings(fail=fail))
+
+
+class EmbeddingCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "embeddings.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestEmbeddingCache(EmbeddingCacheTestCase):
+    """Testē keša līmeņus un ierobežojumus"""
+
+    def test_key_normalizes_whitespace_and_separates_models(self):
+        self.assertEqual(cache_key("m", "Telegram  bots\n"), cache_key("m", "Telegram bots"))
+        self.assertNotEqual(cache_key("m1", "Telegram bots"), cache_key("m2", "Telegram bots"))
+
+    def test_memory_lru_evicts_oldest(self):
+        cache = EmbeddingCache(path=None, memory_items=2)
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        cache.get("m", "a")
+        cache.put("m", "c", [3.0])
+
+        self.assertEqual(cache.get("m", "a"), [1.0])
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertEqual(cache.get("m", "c"), [3.0])
+
+    def test_disk_tier_survives_restart(self):
+        cache = EmbeddingCache(self.path)
+        cache.put_many("m", {"sveiki": [0.25, -0.5], "hello": [1.0, 2.0]})
+        cache.close()
+
+        reopened = EmbeddingCache(self.path)
+        found = reopened.get_many("m", ["sveiki", "hello", "cits"])
+        self.assertEqual(found, {"sveiki": [0.25, -0.5], "hello": [1.0, 2.0]})
+        self.assertEqual(reopened.stats()["hits"], 2)
+        self.assertEqual(reopened.stats()["misses"], 1)
+        reopened.close()
+
+    def test_memory_and_disk_tiers_return_same_values(self):
+        vector = [0.1, 1 / 3, -2.718281828459045]
+        cache = EmbeddingCache(self.path)
+        stored = cache.put("m", "teksts", vector)
+        from_memory = cache.get("m", "teksts")
+        cache.close()
+
+        reopened = EmbeddingCache(self.path)
+        from_disk = reopened.get("m", "teksts")
+        reopened.close()
+
+        self.assertNotEqual(stored, vector)
+        self.assertEqual(stored, from_memory)
+        self.assertEqual(from_memory, from_disk)
+
+    def test_disk_tier_respects_size_limit(self):
+        # 4 baiti uz float32 → katrs ieraksts 40 baiti
+        cache = EmbeddingCache(self.path, memory_items=1, max_disk_bytes=100)
+        for i in range(5):
+            cache.put("m", f"teksts {i}", [float(i)] * 10)
+
+        self.assertLessEqual(cache.stats()["disk_bytes"], 100)
+        self.assertEqual(cache.get("m", "teksts 4"), [4.0] * 10)
+        self.assertIsNone(cache.get("m", "teksts 0"))
+        cache.close()
+
+
+class TestVectorizerCache(EmbeddingCacheTestCase):
+    """Testē, ka WorkflowVectorizer neatkārto API izsaukumus kešotiem tekstiem"""
+
+    def test_repeated_text_hits_cache(self):
+        client = fake_client()
+        cache = EmbeddingCache(self.path)
+        vectorizer = WorkflowVectorizer(client, cache=cache)
+
+        first = vectorizer.generate_embedding("Telegram bots ar OpenAI")
+        second = vectorizer.generate_embedding("Telegram  bots ar OpenAI ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(client.embeddings.calls), 1)
+
+        # Miss un trāpījums no diska atgriež vienādas (float32) vērtības
+        vectorizer.cache = EmbeddingCache(self.path)
+        self.assertEqual(vectorizer.generate_embedding("Telegram bots ar OpenAI"), first)
+        self.assertEqual(len(client.embeddings.calls), 1)
+        vectorizer.cache.close()
+        cache.close()
+
+    def test_failed_embedding_is_not_cached(self):
+        cache = EmbeddingCache(self.path)
+        vectorizer = WorkflowVectorizer(fake_client(fail=True), cache=cache)
+
+        with self.assertRaises(EmbeddingError):
+            vectorizer.generate_embedding("teksts")
+
+        self.assertIsNone(cache.get(vectorizer.model, "teksts"))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for HNSW Index
+Šis modulis testē HNSW grafu un tā izmantošanu lokālajā vektoru indeksā.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.hnsw_index import HNSWIndex
+from src.local_vector_index import LocalVectorIndex
+from src.vector_database_design import WorkflowMetadata, WorkflowVector
+from src.workflow_blob_store import WorkflowBlobStore
+
+DIM = 24
+
+
+def corpus(count=600, seed=3):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(12, DIM))
+    return (centers[rng.integers(0, 12, count)] + 0.5 * rng.normal(size=(count, DIM))).astype(np.float32)
+
+
+def exact(matrix, query, k, rows=None):
+    rows = np.arange(len(matrix)) if rows is None else np.asarray(rows)
+    normalized = matrix[rows] / np.linalg.norm(matrix[rows], axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return [int(rows[i]) for i in np.argsort(-scores)[:k]]
+
+
+class TestHNSWIndex(unittest.TestCase):
+    """Testē recall, dzēšanu, filtrus un saglabāšanu"""
+
+    def setUp(self):
+        self.matrix = corpus()
+        self.index = HNSWIndex(DIM, M=8, ef_construction=64)
+        for row, vector in enumerate(self.matrix):
+            self.index.add(row, vector)
+        self.queries = self.matrix[:40] + 0.05
+
+    def recall(self, index, k=10, ef=64):
+        hits = 0
+        for query in self.queries:
+            found = {label for label, _ in index.search(query, k, ef=ef)}
+            hits += len(found & set(exact(self.matrix, query, k)))
+        return hits / (len(self.queries) * k)
+
+    def test_recall_against_exact_search(self):
+        self.assertGreaterEqual(self.recall(self.index), 0.95)
+        results = self.index.search(self.queries[0], 5)
+        self.assertTrue(all(a[1] >= b[1] for a, b in zip(results, results[1:])))
+
+    def test_delete_and_reinsert(self):
+        query = self.matrix[10]
+        self.assertEqual(self.index.search(query, 1)[0][0], 10)
+
+        self.assertTrue(self.index.delete(10))
+        self.assertNotIn(10, [label for label, _ in self.index.search(query, 20)])
+        self.assertEqual(len(self.index), len(self.matrix) - 1)
+
+        self.index.add(10, -query)
+        self.assertEqual(self.index.search(-query, 1)[0][0], 10)
+        self.assertEqual(self.index.deleted_count, 1)
+
+        # Esošas etiķetes atjauninājums nepievieno mezglus
+        self.index.add(11, -self.matrix[11])
+        self.assertEqual(self.index.search(-self.matrix[11], 1)[0][0], 11)
+        self.assertEqual(self.index.deleted_count, 1)
+        self.assertGreaterEqual(self.recall(self.index), 0.9)
+
+    def test_allowed_filter(self):
+        query = self.queries[1]
+        even = lambda label: label % 2 == 0
+
+        found = [label for label, _ in self.index.search(query, 5, ef=128, allowed=even)]
+
+        self.assertTrue(all(label % 2 == 0 for label in found))
+        self.assertEqual(found[:3], exact(self.matrix, query, 3, rows=range(0, len(self.matrix), 2)))
+
+    def test_save_and_load(self):
+        self.index.delete(3)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "graph.npz")
+            self.index.save(path)
+            loaded = HNSWIndex.load(path)
+
+        self.assertEqual(len(loaded), len(self.index))
+        for query in self.queries[:10]:
+            self.assertEqual(loaded.search(query, 10), self.index.search(query, 10))
+        loaded.add(len(self.matrix), self.matrix[0])
+        self.assertIn(len(self.matrix), loaded)
+
+
+class TestLocalIndexWithHNSW(unittest.TestCase):
+    """Testē LocalVectorIndex ar ieslēgtu HNSW"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.matrix = corpus(300)
+        self.vectors = []
+        for i, row in enumerate(self.matrix):
+            metadata = WorkflowMetadata(
+                id=f"wf-{i}", name=f"Workflow {i}", description="", category="api" if i % 3 else "email",
+                tags=[], nodes_count=1, complexity_score=10, language="en", created_at="",
+            )
+            self.vectors.append(WorkflowVector(id=f"wf-{i}", vector=row.tolist(), metadata=metadata,
+                                               json_content={"name": f"Workflow {i}", "nodes": []}))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def open_index(self):
+        index = LocalVectorIndex(os.path.join(self.tmpdir.name, "index"), vector_size=DIM,
+                                 blob_store=WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs")),
+                                 use_hnsw=True, hnsw_min_points=0)
+        index.initialize_collection()
+        return index
+
+    def test_search_and_reload_graph(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors[:150])
+        index.add_workflows(self.vectors[150:])
+        self.assertEqual(index.get_collection_stats()["backend"], "local-hnsw")
+        # Grafs lasa vektorus no indeksa matricas un tiek saglabāts tikai ar `flush`
+        self.assertEqual(index._hnsw._data.size, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "index", "hnsw.npz")))
+        index.flush()
+
+        query = self.matrix[42].tolist()
+        self.assertEqual(index.search_similar_workflows(query, limit=1)[0]["id"], "wf-42")
+        filtered = index.search_similar_workflows(query, limit=5, category_filter="email", hydrate=False)
+        self.assertTrue(filtered)
+        self.assertTrue(all(result["metadata"]["category"] == "email" for result in filtered))
+
+        reopened = self.open_index()
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, "index", "hnsw.npz")))
+        self.assertEqual(reopened.search_similar_workflows(query, limit=1)[0]["id"], "wf-42")
+
+    def test_repeated_updates_keep_recall(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors)
+        rng = np.random.default_rng(7)
+        updated = self.vectors[7]
+        for _ in range(150):
+            vector = self.matrix[rng.integers(0, len(self.matrix))] + 0.3 * rng.normal(size=DIM)
+            index.add_workflows([WorkflowVector(id=updated.id, vector=vector.tolist(), metadata=updated.metadata,
+                                                json_content=updated.json_content)])
+
+        # Atjauninājums pārvieto mezglu, nevis atstāj dzēstu mezglu, kas lasītu jauno rindu
+        self.assertEqual(index._hnsw.deleted_count, 0)
+        self.assertEqual(len(index._hnsw), len(self.vectors))
+        matrix = np.array(index._state.matrix)
+        self.assertEqual(index.search_similar_workflows(matrix[7].tolist(), limit=1)[0]["id"], "wf-7")
+
+        hits = 0
+        queries = np.concatenate([matrix[7] + 0.1 * rng.normal(size=(20, DIM)), matrix[:20] + 0.05])
+        for query in queries:
+            found = {result["id"] for result in
+                     index.search_similar_workflows(query.tolist(), limit=10, hydrate=False)}
+            hits += len(found & {f"wf-{row}" for row in exact(matrix, query, 10)})
+        self.assertGreaterEqual(hits / (len(queries) * 10), 0.95)
+
+    def test_search_while_adding(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors[:20])
+        errors = []
+
+        def writer():
+            try:
+                for start in range(20, len(self.vectors), 10):
+                    index.add_workflows(self.vectors[start:start + 10])
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            while thread.is_alive():
+                for query in self.matrix[:5]:
+                    index.search_similar_workflows(query.tolist(), limit=3, hydrate=False)
+        except Exception as e:
+            errors.append(e)
+        thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(index.search_similar_workflows(self.matrix[299].tolist(), limit=1)[0]["id"], "wf-299")
+
+
+if __name__ == '__main__':
+    unittest.main()
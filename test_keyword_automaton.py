@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for Keyword Automaton
+Šis modulis testē Aho-Corasick automātu un NaturalLanguageProcessor vārdnīcu meklēšanu.
+"""
+
+import unittest
+import sys
+import os
+import re
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.keyword_automaton import KeywordAutomaton
+from src.workflow_search_algorithm import NaturalLanguageProcessor, SearchIntent
+
+QUERIES = [
+    "Izveidot Telegram botu pierakstam uz tikšanos",
+    "Найти workflow для отправки email уведомлений и создать бота",
+    "Create a simple API webhook handler",
+    "show me how to send emails from gmail to slack, then send to Slack again",
+    "dbx storage sync with postgres-db and mysql_backup",
+    "Pielāgot sarežģītu datu bāzes savienojumu; sūtīt e-pasts",
+    "explain advanced airtable → supabase migration, get and post",
+    "",
+    "Телеграм бот: простой, получить запись и удалить",
+]
+
+
+def reference_parse(nlp, text):
+    """Sākotnējā (vārds pa vārdam un regex) vārdnīcu meklēšana salīdzināšanai"""
+    text_lower = text.lower()
+    keywords = {}
+    for language, keyword_dict in nlp.keywords_mapping.items():
+        keywords[language] = {
+            category for category, words in keyword_dict.items() if any(word in text_lower for word in words)
+        }
+
+    entities = {kind: [] for kind in nlp.entity_patterns}
+    for kind, groups in nlp.entity_patterns.items():
+        for words in groups:
+            entities[kind].extend(re.findall(r'\b(' + '|'.join(words) + r')\b', text_lower))
+
+    intent = next((intent for intent, words in nlp.intent_words if any(word in text_lower for word in words)),
+                  SearchIntent.CREATE_NEW)
+    complexity = next((level for level, words in nlp.complexity_words if any(word in text_lower for word in words)),
+                      'medium')
+    return keywords, entities, intent, complexity
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    """Testē Aho-Corasick sakritības"""
+
+    def test_overlapping_matches(self):
+        automaton = KeywordAutomaton([("he", 1, False), ("she", 2, False), ("his", 3, False), ("hers", 4, False)])
+
+        self.assertEqual(len(automaton), 4)
+        self.assertEqual(list(automaton.iter_matches("ushers")), [(1, 4, 2), (2, 4, 1), (2, 6, 4)])
+
+    def test_whole_word_and_shared_patterns(self):
+        automaton = KeywordAutomaton([("db", "word", True), ("db", "substring", False), ("DB", "upper", False)])
+
+        matches = list(automaton.iter_matches("db dbx x_db db."))
+
+        self.assertEqual([start for start, _end, value in matches if value == "word"], [0, 12])
+        self.assertEqual(sum(value == "substring" for _s, _e, value in matches), 4)
+        self.assertEqual(sum(value == "upper" for _s, _e, value in matches), 4)
+
+    def test_unicode_word_boundaries(self):
+        automaton = KeywordAutomaton([("бот", 1, True), ("sūtīt", 2, True)])
+
+        matches = automaton.iter_matches("бот ботом sūtīt sūtītājs")
+
+        self.assertEqual([value for _start, _end, value in matches], [1, 2])
+
+
+class TestVocabularyMatching(unittest.TestCase):
+    """Testē, ka vienā piegājienā iegūtie rezultāti sakrīt ar sākotnējo algoritmu"""
+
+    def setUp(self):
+        self.nlp = NaturalLanguageProcessor(None)
+
+    def test_matches_reference(self):
+        for text in QUERIES:
+            keywords, entities, intent, complexity = reference_parse(self.nlp, text)
+
+            matches = self.nlp.match_vocabulary(text)
+
+            found = {language: set(categories) for language, categories in matches.keywords.items()}
+            self.assertEqual(found, keywords, text)
+            self.assertEqual(matches.entities, entities, text)
+            self.assertEqual(matches.intent, intent, text)
+            self.assertEqual(matches.complexity, complexity, text)
+
+    def test_parse_query_uses_detected_language(self):
+        query = self.nlp.parse_query("Izveidot vienkāršs Telegram botu")
+
+        self.assertEqual(query.language, "lv")
+        self.assertEqual(query.keywords, ["create", "telegram", "bot"])
+        self.assertEqual(query.entities["services"], ["telegram"])
+        self.assertEqual(query.intent, SearchIntent.CREATE_NEW)
+        self.assertEqual(query.complexity_preference, "simple")
+        self.assertEqual(self.nlp.extract_keywords("Izveidot Telegram botu", "lv"), query.keywords)
+
+    def test_recompile_after_vocabulary_change(self):
+        self.nlp.keywords_mapping["en"]["crm"] = ["hubspot"]
+        self.assertNotIn("crm", self.nlp.extract_keywords("sync hubspot", "en"))
+
+        self.nlp.compile_vocabulary()
+
+        self.assertIn("crm", self.nlp.extract_keywords("sync hubspot", "en"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for Lexical Index
+Šis modulis testē BM25 workflow indeksu, RRF apvienošanu un hibrīdo meklēšanu.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.embedding_backends import EmbeddingError, HashingEmbeddingBackend
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion, workflow_terms
+from src.local_vector_index import LocalVectorIndex
+from src.vector_database_design import WorkflowVectorizer, index_workflows
+from src import lexical_index as lexical_module
+from src.workflow_blob_store import WorkflowBlobStore
+from src.workflow_search_algorithm import NaturalLanguageProcessor, WorkflowSearchEngine
+
+
+def node(node_type, name, **parameters):
+    return {"type": f"n8n-nodes-base.{node_type}", "name": name, "parameters": parameters}
+
+
+WORKFLOWS = [
+    {"name": "Airtable ieraksts no webhook", "nodes": [node("webhook", "Webhook", path="lead"),
+                                                      node("airtable", "Airtable", operation="append")],
+     "connections": {}},
+    {"name": "Airtable atskaite", "nodes": [node("scheduleTrigger", "Katru dienu"),
+                                            node("airtable", "Airtable", operation="list")],
+     "connections": {}},
+    {"name": "Telegram bots", "nodes": [node("telegramTrigger", "Telegram"), node("telegram", "Atbilde")],
+     "connections": {}},
+    {"name": "Gmail uz Postgres", "nodes": [node("gmailTrigger", "Gmail"),
+                                            node("postgres", "Postgres", query="INSERT INTO airtable")],
+     "connections": {}},
+]
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    """Lokālais backend, kas skaita embed izsaukumus un var simulēt kļūdu"""
+
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.calls = 0
+        self.fail = False
+
+    def embed(self, texts):
+        self.calls += 1
+        if self.fail:
+            raise EmbeddingError("embedding serviss nav pieejams")
+        return super().embed(texts)
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """Testē BM25 indeksu"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "lexical.json")
+        self.vectors = WorkflowVectorizer(None, backend=HashingEmbeddingBackend(dimension=64)).vectorize_many(WORKFLOWS)
+        self.index = LexicalIndex(self.path)
+        self.index.add_workflows(self.vectors)
+        self.index.flush()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_bm25_ranks_documents_with_all_terms_first(self):
+        results = self.index.search("airtable webhook", limit=10)
+
+        self.assertEqual(results[0]["metadata"]["name"], "Airtable ieraksts no webhook")
+        self.assertEqual(results[1]["metadata"]["name"], "Airtable atskaite")
+        self.assertEqual(len(results), 2)
+        self.assertIn("content_hash", results[0]["metadata"])
+
+    def test_code_and_expressions_are_not_indexed(self):
+        terms = workflow_terms({"nodes": [node("code", "Kods", jsCode="return airtable", url="={{ $json.x }}")]})
+
+        self.assertNotIn("airtable", terms)
+        self.assertNotIn("json", terms)
+        self.assertEqual(terms["code"], 2)
+
+    def test_exact_node_query(self):
+        self.assertTrue(self.index.is_exact_node_query("Airtable webhook"))
+        self.assertFalse(self.index.is_exact_node_query("airtable lead"))
+        self.assertFalse(self.index.is_exact_node_query(""))
+
+    def test_upsert_and_persistence(self):
+        replacement = WorkflowVectorizer(None, backend=HashingEmbeddingBackend(dimension=64)).vectorize_many(
+            [{"name": "Slack", "nodes": [node("slack", "Slack")], "connections": {}}]
+        )[0]
+        replacement.id = self.vectors[0].id
+        self.index.add_workflows([replacement])
+        self.index.flush()
+
+        reopened = LexicalIndex(self.path)
+        self.assertTrue(reopened.load())
+
+        self.assertEqual(len(reopened), len(WORKFLOWS))
+        self.assertFalse(reopened.is_exact_node_query("webhook"))
+        self.assertEqual(reopened.search("slack")[0]["id"], self.vectors[0].id)
+        self.assertEqual([r["metadata"]["name"] for r in reopened.search("airtable webhook")], ["Airtable atskaite"])
+
+    def test_index_workflows_saves_once_and_reuses_content_hash(self):
+        lexical_index = LexicalIndex(os.path.join(self.tmpdir.name, "indexed.json"))
+        index = LocalVectorIndex(None, vector_size=64,
+                                 blob_store=WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs")))
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend(dimension=64))
+
+        with mock.patch.object(lexical_index, "save", wraps=lexical_index.save) as save, \
+                mock.patch.object(lexical_module, "content_hash") as lexical_hash:
+            stats = index_workflows(WORKFLOWS * 3, vectorizer, index, chunk_size=2, lexical_index=lexical_index)
+
+        self.assertEqual(stats["indexed"], len(WORKFLOWS) * 3)
+        self.assertEqual(save.call_count, 1)
+        lexical_hash.assert_not_called()
+
+        reopened = LexicalIndex(lexical_index.path)
+        self.assertTrue(reopened.load())
+        hit = reopened.search("telegram", limit=1)[0]
+        self.assertEqual(hit["metadata"]["content_hash"],
+                         index.get_workflow_by_id(hit["id"])["metadata"]["content_hash"])
+
+    def test_reciprocal_rank_fusion(self):
+        vector = [{"id": "a", "score": 0.9, "metadata": {}}, {"id": "b", "score": 0.8, "metadata": {}}]
+        lexical = [{"id": "b", "score": 7.0, "metadata": {}}, {"id": "c", "score": 3.0, "metadata": {}}]
+
+        fused = reciprocal_rank_fusion([vector, lexical])
+
+        self.assertEqual([r["id"] for r in fused], ["b", "a", "c"])
+        self.assertEqual((fused[0]["vector_score"], fused[0]["lexical_score"]), (0.8, 7.0))
+        self.assertTrue(all(0 < r["score"] <= 1 for r in fused))
+
+
+class TestHybridSearch(unittest.TestCase):
+    """Testē WorkflowSearchEngine ar vektoru un BM25 indeksu"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backend = CountingBackend()
+        vectorizer = WorkflowVectorizer(None, backend=self.backend)
+        index = LocalVectorIndex(None, vector_size=256,
+                                 blob_store=WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs")))
+        lexical_index = LexicalIndex(None)
+        index_workflows(WORKFLOWS, vectorizer, index, lexical_index=lexical_index)
+        self.engine = WorkflowSearchEngine(index, vectorizer, NaturalLanguageProcessor(None),
+                                           lexical_index=lexical_index)
+        self.addCleanup(self.engine.close)
+        self.backend.calls = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_exact_service_query_skips_embedding(self):
+        results = self.engine.search("airtable webhook", max_results=1)
+
+        self.assertEqual(self.backend.calls, 0)
+        self.assertEqual(results[0].workflow_name, "Airtable ieraksts no webhook")
+        self.assertEqual(results[0].workflow_json["nodes"][1]["name"], "Airtable")
+
+    def test_hybrid_query_uses_both_indexes(self):
+        results = self.engine.search("telegram bots klientiem", max_results=2)
+
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(results[0].workflow_name, "Telegram bots")
+
+    def test_search_batch_matches_single_queries(self):
+        queries = ["airtable webhook", "telegram bots klientiem", "gmail postgres", "atskaite no airtable"]
+
+        batches = self.engine.search_batch(queries, max_results=2)
+
+        # Viens embedding pieprasījums visiem vaicājumiem, kam vajag vektorus
+        self.assertEqual(self.backend.calls, 1)
+        self.assertEqual(len(batches), len(queries))
+        for query, results in zip(queries, batches):
+            single = self.engine.search(query, max_results=2)
+            self.assertEqual([r.workflow_id for r in results], [r.workflow_id for r in single])
+            self.assertEqual([r.similarity_score for r in results], [r.similarity_score for r in single])
+
+    def test_lexical_results_survive_embedding_failure(self):
+        self.backend.fail = True
+
+        results = self.engine.search("atskaite no airtable", max_results=1)
+
+        self.assertEqual(results[0].workflow_name, "Airtable atskaite")
+        with self.assertRaises(EmbeddingError):
+            self.engine.search("kaut kas pavisam cits", max_results=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for Local Vector Index
+Šis modulis testē NumPy workflow vektoru indeksu un tā izmantošanu meklēšanā.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.embedding_backends import HashingEmbeddingBackend
+from src.local_vector_index import LocalVectorIndex, create_workflow_index
+from src.vector_database_design import WorkflowMetadata, WorkflowVector, WorkflowVectorizer, index_workflows
+from src.workflow_blob_store import WorkflowBlobStore
+from src.workflow_search_algorithm import NaturalLanguageProcessor, WorkflowSearchEngine
+
+DIM = 16
+
+
+def make_vector(point_id, vector, category="general"):
+    workflow_json = {"name": f"Workflow {point_id}", "nodes": [], "connections": {}}
+    metadata = WorkflowMetadata(
+        id=point_id, name=workflow_json["name"], description="", category=category, tags=[],
+        nodes_count=0, complexity_score=40, language="en", created_at="",
+    )
+    return WorkflowVector(id=point_id, vector=list(map(float, vector)), metadata=metadata, json_content=workflow_json)
+
+
+class LocalIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.blobs = WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def open_index(self, path="index", vector_size=DIM):
+        index = LocalVectorIndex(os.path.join(self.tmpdir.name, path) if path else None,
+                                 vector_size=vector_size, blob_store=self.blobs)
+        index.initialize_collection()
+        return index
+
+
+class TestLocalVectorIndex(LocalIndexTestCase):
+    """Testē top-k, filtrus un glabāšanu uz diska"""
+
+    def setUp(self):
+        super().setUp()
+        rng = np.random.default_rng(7)
+        self.matrix = rng.normal(size=(200, DIM)).astype(np.float32)
+        self.vectors = [
+            make_vector(f"wf-{i}", row, category="messaging" if i % 4 == 0 else "general")
+            for i, row in enumerate(self.matrix)
+        ]
+
+    def brute_force(self, query, rows):
+        matrix = self.matrix[rows]
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        return [f"wf-{rows[i]}" for i in np.argsort(-scores)]
+
+    def test_top_k_matches_brute_force(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors)
+        query = self.matrix[3] + 0.1
+
+        results = index.search_similar_workflows(query.tolist(), limit=10)
+
+        self.assertEqual([r["id"] for r in results], self.brute_force(query, np.arange(200))[:10])
+        self.assertEqual(results[0]["workflow_json"]["name"], results[0]["metadata"]["name"])
+        self.assertTrue(all(a["score"] >= b["score"] for a, b in zip(results, results[1:])))
+
+    def test_category_filter(self):
+        index = self.open_index(path=None)
+        index.add_workflows(self.vectors)
+        query = self.matrix[5]
+
+        results = index.search_similar_workflows(query.tolist(), limit=5, category_filter="messaging", hydrate=False)
+
+        rows = np.arange(0, 200, 4)
+        self.assertEqual([r["id"] for r in results], self.brute_force(query, rows)[:5])
+        self.assertEqual(index.search_similar_workflows(query.tolist(), category_filter="nav"), [])
+
+    def test_search_many_matches_single_queries(self):
+        index = self.open_index(path=None)
+        index.add_workflows(self.vectors)
+        queries = self.matrix[:3].tolist()
+
+        batched = index.search_many(queries, limit=4, hydrate=False)
+
+        for query, results in zip(queries, batched):
+            single = index.search_similar_workflows(query, limit=4, hydrate=False)
+            self.assertEqual([r["id"] for r in results], [r["id"] for r in single])
+
+    def test_persists_and_upserts(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors[:150])
+        index.add_workflows(self.vectors[150:])
+        replacement = make_vector("wf-0", -self.matrix[0], category="email")
+        index.add_workflows([replacement])
+
+        reopened = self.open_index()
+
+        self.assertEqual(reopened.get_collection_stats()["total_workflows"], 200)
+        self.assertEqual(reopened.get_workflow_by_id("wf-0")["metadata"]["category"], "email")
+        results = reopened.search_similar_workflows((-self.matrix[0]).tolist(), limit=1)
+        self.assertEqual(results[0]["id"], "wf-0")
+        self.assertAlmostEqual(results[0]["score"], 1.0, places=5)
+
+    def test_update_does_not_change_published_state(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors[:50])
+        reader_state = index._state
+        before = np.array(reader_state.matrix[3])
+
+        index.add_workflows([make_vector("wf-3", -self.matrix[3]), self.vectors[50]])
+
+        # Lasītājs ar iepriekšējo stāvokli redz veco rindu; jaunais stāvoklis — jauno
+        np.testing.assert_array_equal(reader_state.matrix[3], before)
+        np.testing.assert_array_equal(index._state.matrix[3], -self.matrix[3])
+        np.testing.assert_array_equal(index._state.matrix[50], self.matrix[50])
+        results = self.open_index().search_similar_workflows((-self.matrix[3]).tolist(), limit=1, hydrate=False)
+        self.assertEqual(results[0]["id"], "wf-3")
+
+    def test_dimension_mismatch_is_rejected(self):
+        index = self.open_index()
+        index.add_workflows(self.vectors[:2])
+
+        with self.assertRaises(ValueError):
+            self.open_index(vector_size=DIM * 2)
+        with self.assertRaises(ValueError):
+            index.add_workflows([make_vector("x", [1.0] * (DIM + 1))])
+
+
+class TestLocalIndexSearch(LocalIndexTestCase):
+    """Testē meklēšanas dzinēju virs lokālā indeksa un Qdrant rezervi"""
+
+    def test_search_engine_with_local_index(self):
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend(dimension=256))
+        index = self.open_index(vector_size=256)
+        workflows = [
+            {"name": "Telegram bots", "nodes": [{"type": "n8n-nodes-base.telegramTrigger", "name": "Telegram"}],
+             "connections": {}},
+            {"name": "Gmail uz Postgres", "nodes": [{"type": "n8n-nodes-base.gmailTrigger", "name": "Gmail"},
+                                                    {"type": "n8n-nodes-base.postgres", "name": "Postgres"}],
+             "connections": {}},
+        ]
+        index_workflows(workflows, vectorizer, index)
+        engine = WorkflowSearchEngine(index, vectorizer, NaturalLanguageProcessor(None))
+        self.addCleanup(engine.close)
+
+        results = engine.search("telegram bot", max_results=1)
+
+        self.assertEqual(results[0].workflow_name, "Telegram bots")
+        self.assertEqual(results[0].workflow_json["name"], "Telegram bots")
+
+    def test_close_stops_worker_threads(self):
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend(dimension=64))
+        index = self.open_index(vector_size=64)
+        index_workflows([{"name": "Telegram bots", "nodes": [{"type": "n8n-nodes-base.telegramTrigger"}],
+                          "connections": {}}], vectorizer, index)
+
+        def search_threads():
+            return [t for t in threading.enumerate() if t.name.startswith("workflow-search")]
+
+        with WorkflowSearchEngine(index, vectorizer, NaturalLanguageProcessor(None), workers=1) as engine:
+            engine.search("telegram bots", max_results=1)
+            self.assertEqual(len(search_threads()), 1)
+        self.assertEqual(search_threads(), [])
+
+    def test_parse_and_embedding_overlap(self):
+        class SlowBackend(HashingEmbeddingBackend):
+            def embed(self, texts):
+                time.sleep(0.2)
+                return super().embed(texts)
+
+        class SlowParser(NaturalLanguageProcessor):
+            def parse_query(self, text):
+                time.sleep(0.2)
+                return super().parse_query(text)
+
+        vectorizer = WorkflowVectorizer(None, backend=SlowBackend(dimension=64))
+        index = self.open_index(vector_size=64)
+        index_workflows([{"name": "Telegram bots", "nodes": [{"type": "n8n-nodes-base.telegramTrigger"}],
+                          "connections": {}}], vectorizer, index)
+        engine = WorkflowSearchEngine(index, vectorizer, SlowParser(None))
+        self.addCleanup(engine.close)
+        timings = {}
+
+        results = engine.search("telegram bots jauns", max_results=1, timings=timings)
+
+        self.assertEqual(results[0].workflow_name, "Telegram bots")
+        self.assertGreaterEqual(timings["parse"], 200)
+        self.assertGreaterEqual(timings["embedding"], 200)
+        self.assertIn("vector_search", timings)
+        # Posmi pārklājas: kopā tuvāk lēnākajam posmam, nevis summai
+        self.assertLess(timings["total"], 350)
+
+    def test_unreachable_qdrant_falls_back_to_local_index(self):
+        os.environ["QDRANT_PORT"] = "1"
+        try:
+            index = create_workflow_index(vector_size=DIM, store="qdrant",
+                                          index_path=os.path.join(self.tmpdir.name, "fallback"))
+        finally:
+            del os.environ["QDRANT_PORT"]
+        self.assertIsInstance(index, LocalVectorIndex)
+
+
+if __name__ == '__main__':
+    unittest.main()
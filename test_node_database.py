@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+"""
+Tests for Node Configuration Database
+Šis modulis testē n8n mezglu definīciju ielādi un vaicājumus.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+
+from src.extensions import db
+from src.node_configuration_database import (
+    FTS_TABLE,
+    NodeConfigurationDatabase,
+    NodeDefinition,
+    NodeFileManifest,
+    NodeParameter,
+    NodeUsageCount,
+    _fts_ready,
+    _parse_node_file,
+)
+from src import node_autocomplete, node_catalog
+from src.node_catalog import MappedNodeCatalog, NodeCatalog
+from src.node_parsing import iter_json_files, parallel_parse
+from src.routes.node_routes import node_bp
+
+
+def _write_node(folder, filename, data):
+    path = os.path.join(folder, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh)
+    return path
+
+
+class NodeDatabaseTestCase(unittest.TestCase):
+    """Kopīgs iestatījums: Flask lietotne ar pagaidu SQLite datubāzi"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.nodes_dir = os.path.join(self.tmp.name, "nodes")
+        os.makedirs(self.nodes_dir)
+
+        self.app = Flask(__name__)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}"
+        self.app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        _fts_ready.clear()
+        node_catalog._current = None
+        node_autocomplete.node_usage.clear()
+        self.node_db = NodeConfigurationDatabase()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def write_sample_nodes(self):
+        _write_node(self.nodes_dir, "Webhook/Webhook.node.json", {
+            "name": "n8n-nodes-base.webhook",
+            "displayName": "Webhook",
+            "description": "Starts the workflow when a webhook is called",
+            "group": ["trigger"],
+            "version": 1,
+        })
+        _write_node(self.nodes_dir, "Telegram/TelegramTrigger.node.json", {
+            "name": "n8n-nodes-base.telegramTrigger",
+            "displayName": "Telegram Trigger",
+            "description": "Starts the workflow on a Telegram update",
+            "group": ["trigger"],
+            "version": 1,
+        })
+        _write_node(self.nodes_dir, "Airtable/Airtable.node.json", {
+            "name": "n8n-nodes-base.airtable",
+            "displayName": "Airtable",
+            "description": "Read, update, write and delete data from Airtable",
+            "group": ["input"],
+            "version": 2,
+        })
+        _write_node(self.nodes_dir, "broken.json", "not a node")
+        with open(os.path.join(self.nodes_dir, "invalid.json"), "w") as fh:
+            fh.write("{ nav json")
+        _write_node(self.nodes_dir, "resources.json", [{"name": "x"}])
+
+
+class TestBulkIngestion(NodeDatabaseTestCase):
+    """Testē masveida mezglu ielādi"""
+
+    def test_bulk_load_inserts_and_skips(self):
+        """Testē, ka derīgie faili tiek ielādēti, bojātie — izlaisti"""
+        self.write_sample_nodes()
+        inserted, skipped = self.node_db.load_from_folder(self.nodes_dir)
+
+        self.assertEqual(inserted, 3)
+        self.assertEqual(skipped, 3)
+        self.assertEqual(NodeDefinition.query.count(), 3)
+        self.assertEqual(self.node_db.last_load_stats["new"], 3)
+        self.assertGreater(self.node_db.last_load_stats["rows_per_second"], 0)
+
+        webhook = self.node_db.get("n8n-nodes-base.webhook")
+        self.assertEqual(webhook["display_name"], "Webhook")
+        self.assertEqual(webhook["category"], "trigger")
+
+    def test_bulk_reload_updates_in_place(self):
+        """Testē, ka atkārtota ielāde atjaunina rindas, nevis dublē"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, batch_size=2)
+
+        _write_node(self.nodes_dir, "Webhook/Webhook.node.json", {
+            "name": "n8n-nodes-base.webhook",
+            "displayName": "Webhook v2",
+            "group": ["trigger"],
+            "version": 2,
+        })
+        self.node_db.load_from_folder(self.nodes_dir, batch_size=2)
+
+        self.assertEqual(NodeDefinition.query.count(), 3)
+        self.assertEqual(self.node_db.last_load_stats["new"], 0)
+        self.assertEqual(self.node_db.last_load_stats["updated"], 3)
+        self.assertEqual(self.node_db.get("n8n-nodes-base.webhook")["display_name"], "Webhook v2")
+
+    def test_bulk_and_serial_load_match(self):
+        """Testē, ka masveida un secīgā ielāde dod vienādu rezultātu"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, bulk=False)
+        serial = sorted((n.node_id, n.display_name, n.json_data) for n in NodeDefinition.query.all())
+
+        NodeDefinition.query.delete()
+        db.session.commit()
+        self.node_db.load_from_folder(self.nodes_dir, bulk=True)
+        bulk = sorted((n.node_id, n.display_name, n.json_data) for n in NodeDefinition.query.all())
+
+        self.assertEqual(serial, bulk)
+
+    def test_parallel_parse_matches_inline(self):
+        """Testē, ka procesu pūla parsēšana dod tās pašas rindas"""
+        self.write_sample_nodes()
+        for i in range(40):
+            _write_node(self.nodes_dir, f"Generated/Node{i}.node.json", {
+                "name": f"n8n-nodes-base.generated{i}",
+                "displayName": f"Generated {i}",
+                "group": ["transform"],
+            })
+        paths = list(iter_json_files(self.nodes_dir))
+
+        inline = list(parallel_parse(paths, _parse_node_file, workers=1))
+        pooled = list(parallel_parse(paths, _parse_node_file, workers=2, chunk_size=4, queue_size=2))
+
+        self.assertEqual(len(pooled), len(paths))
+        self.assertEqual(inline, pooled)
+
+        inserted, skipped = self.node_db.load_from_folder(self.nodes_dir, workers=2, batch_size=7)
+        self.assertEqual((inserted, skipped), (43, 3))
+        self.assertEqual(NodeDefinition.query.count(), 43)
+
+
+    def test_duplicate_node_id_last_path_wins(self):
+        """Testē, ka dublēta node_id gadījumā vienmēr uzvar pēdējais fails ceļu secībā"""
+        for i in range(30):
+            _write_node(self.nodes_dir, f"Dup{i:02d}/Node.node.json", {
+                "name": "n8n-nodes-base.duplicate",
+                "displayName": f"Duplicate {i:02d}",
+                "group": ["transform"],
+            })
+
+        for workers in (1, 2, 4):
+            self.node_db.load_from_folder(self.nodes_dir, workers=workers, batch_size=100)
+            self.assertEqual(self.node_db.get("n8n-nodes-base.duplicate")["display_name"], "Duplicate 29")
+
+
+class TestIncrementalRefresh(NodeDatabaseTestCase):
+    """Testē manifesta vadītu inkrementālu atjaunināšanu"""
+
+    def test_refresh_touches_only_changed_files(self):
+        """Testē jaunu, mainītu, nemainītu un dzēstu failu apstrādi"""
+        self.write_sample_nodes()
+        first = self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(first["added"], 3)
+        self.assertEqual(first["skipped"], 3)
+        self.assertEqual(NodeFileManifest.query.count(), 6)
+
+        second = self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(second["unchanged"], 6)
+        self.assertEqual(second["added"] + second["changed"] + second["deleted"], 0)
+
+        # Maina vienu failu, pievieno vienu, dzēš vienu
+        path = _write_node(self.nodes_dir, "Webhook/Webhook.node.json", {
+            "name": "n8n-nodes-base.webhook",
+            "displayName": "Webhook (changed)",
+            "group": ["trigger"],
+        })
+        os.utime(path, (1, 1))
+        _write_node(self.nodes_dir, "Slack/Slack.node.json", {
+            "name": "n8n-nodes-base.slack",
+            "displayName": "Slack",
+            "group": ["output"],
+        })
+        os.remove(os.path.join(self.nodes_dir, "Airtable/Airtable.node.json"))
+
+        third = self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(third["changed"], 1)
+        self.assertEqual(third["added"], 1)
+        self.assertEqual(third["deleted"], 1)
+        self.assertIsNone(self.node_db.get("n8n-nodes-base.airtable"))
+        self.assertEqual(self.node_db.get("n8n-nodes-base.webhook")["display_name"], "Webhook (changed)")
+        self.assertEqual(NodeDefinition.query.count(), 3)
+
+    def test_refresh_after_full_load_parses_nothing(self):
+        """Testē, ka pilnā ielāde aizpilda manifestu nākamajai atjaunināšanai"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1, batch_size=2)
+        self.assertEqual(NodeFileManifest.query.count(), 6)
+        self.assertEqual(db.session.get(NodeFileManifest, "Webhook/Webhook.node.json").node_id,
+                         "n8n-nodes-base.webhook")
+
+        stats = self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(stats["unchanged"], 6)
+        self.assertEqual(stats["added"] + stats["changed"] + stats["deleted"] + stats["skipped"], 0)
+
+    def test_refresh_skips_parse_when_only_mtime_changes(self):
+        """Testē, ka nemainīts saturs ar jaunu mtime netiek pārrakstīts"""
+        self.write_sample_nodes()
+        self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        os.utime(os.path.join(self.nodes_dir, "Webhook/Webhook.node.json"), (5, 5))
+
+        stats = self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(stats["changed"], 0)
+        self.assertEqual(stats["unchanged"], 6)
+        entry = db.session.get(NodeFileManifest, "Webhook/Webhook.node.json")
+        self.assertEqual(entry.mtime, 5)
+        self.assertEqual(entry.node_id, "n8n-nodes-base.webhook")
+
+
+class TestFullTextSearch(NodeDatabaseTestCase):
+    """Testē FTS5 mezglu meklēšanu"""
+
+    def test_prefix_and_description_search(self):
+        """Testē prefiksu vaicājumus un meklēšanu aprakstā"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        self.assertTrue(self.node_db.ensure_search_index())
+
+        self.assertEqual(self.node_db.find_by_name("tele")[0]["node_id"], "n8n-nodes-base.telegramTrigger")
+        self.assertEqual(
+            [n["node_id"] for n in self.node_db.find_by_name("delete data")],
+            ["n8n-nodes-base.airtable"],
+        )
+        self.assertEqual(self.node_db.find_by_name("  ?? "), [])
+
+    def test_name_matches_rank_above_description(self):
+        """Testē bm25 svarus: nosaukuma atbilstība pirms apraksta"""
+        _write_node(self.nodes_dir, "A.node.json", {
+            "name": "n8n-nodes-base.function", "displayName": "Function",
+            "description": "Run custom code, e.g. to call a webhook",
+        })
+        _write_node(self.nodes_dir, "B.node.json", {
+            "name": "n8n-nodes-base.webhook", "displayName": "Webhook",
+            "description": "Starts the workflow",
+        })
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+        ids = [n["node_id"] for n in self.node_db.find_by_name("webhook")]
+        self.assertEqual(ids, ["n8n-nodes-base.webhook", "n8n-nodes-base.function"])
+
+    def test_index_follows_refresh_and_deletes(self):
+        """Testē, ka trigeri uztur indeksu pēc atjaunināšanas un dzēšanas"""
+        self.write_sample_nodes()
+        self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        os.remove(os.path.join(self.nodes_dir, "Airtable/Airtable.node.json"))
+        self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+
+        self.assertEqual(self.node_db.find_by_name("airtable"), [])
+        # integrity-check izmet kļūdu, ja indekss nesakrīt ar node_definitions saturu
+        db.session.execute(db.text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)"))
+
+    def test_index_created_for_existing_database(self):
+        """Testē indeksa izveidi datubāzei, kas radīta pirms FTS5"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        for name in ("node_definitions_fts_ai", "node_definitions_fts_ad", "node_definitions_fts_au"):
+            db.session.execute(db.text(f"DROP TRIGGER {name}"))
+        db.session.execute(db.text(f"DROP TABLE {FTS_TABLE}"))
+        db.session.commit()
+        _fts_ready.clear()
+
+        self.assertTrue(self.node_db.ensure_search_index())
+        self.assertEqual(self.node_db.find_by_name("webhook")[0]["node_id"], "n8n-nodes-base.webhook")
+
+
+class TestNodeCatalog(NodeDatabaseTestCase):
+    """Testē atmiņas mezglu katalogu"""
+
+    def test_lookups_do_not_touch_database(self):
+        """Testē, ka get/list_nodes pēc ielādes strādā bez SQL vaicājumiem"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            self.assertEqual(self.node_db.get("n8n-nodes-base.webhook")["display_name"], "Webhook")
+            self.assertIsNone(self.node_db.get("n8n-nodes-base.missing"))
+            self.assertIn("n8n-nodes-base.airtable", self.node_db.catalog)
+            self.assertEqual(len(self.node_db.list_nodes(limit=2)), 2)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        self.assertEqual(statements, [])
+
+    def test_reload_swaps_snapshot(self):
+        """Testē, ka ielāde nomaina versiju, bet vecais momentuzņēmums paliek nemainīgs"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        old = self.node_db.catalog
+
+        _write_node(self.nodes_dir, "Slack/Slack.node.json", {"name": "n8n-nodes-base.slack"})
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        new = self.node_db.catalog
+
+        self.assertIsNot(old, new)
+        self.assertNotEqual(old.version, new.version)
+        self.assertNotIn("n8n-nodes-base.slack", old)
+        self.assertIn("n8n-nodes-base.slack", new)
+        self.assertEqual(list(new.ids), sorted(new.ids))
+
+    def test_version_is_content_derived(self):
+        """Testē, ka vienāds saturs dod vienādu versiju"""
+        rows = [("b", "b", "B"), ("a", "a", "A")]
+        self.assertEqual(NodeCatalog.from_rows(rows).version, NodeCatalog.from_rows(reversed(rows)).version)
+
+        record = NodeCatalog.from_rows(rows).get("a")
+        with self.assertRaises(AttributeError):
+            record.name = "changed"
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+
+
+class TestCatalogSnapshot(NodeDatabaseTestCase):
+    """Testē bināro mmap kataloga momentuzņēmumu"""
+
+    def test_mapped_catalog_matches_in_memory(self):
+        """Testē, ka mmap katalogs atbild tāpat kā atmiņas katalogs"""
+        self.write_sample_nodes()
+        _write_node(self.nodes_dir, "Unicode/Node.node.json", {
+            "name": "n8n-nodes-base.žurnāls", "displayName": "Žurnāls", "description": "Ieraksti žurnālā",
+        })
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        path = os.path.join(self.tmp.name, "catalog.bin")
+        self.assertGreater(self.node_db.build_snapshot(path), 0)
+
+        memory = self.node_db.catalog
+        mapped = MappedNodeCatalog(path)
+        try:
+            self.assertEqual(mapped.version, memory.version)
+            self.assertEqual(len(mapped), len(memory))
+            self.assertEqual(mapped.ids, memory.ids)
+            self.assertEqual(mapped.list(), memory.list())
+            self.assertEqual(mapped.get("n8n-nodes-base.žurnāls").display_name, "Žurnāls")
+            self.assertIsNone(mapped.get("n8n-nodes-base.missing"))
+            self.assertIn("n8n-nodes-base.webhook", mapped)
+
+            for after in (None, "n8n-nodes-base.airtable", "n8n-nodes-base.b", "zzz"):
+                m_records, m_cursor = mapped.page(after, 2)
+                n_records, n_cursor = memory.page(after, 2)
+                self.assertEqual([r.as_tuple() for r in m_records], [r.as_tuple() for r in n_records])
+                self.assertEqual(m_cursor, n_cursor)
+        finally:
+            mapped.close()
+
+    def test_load_catalog_prefers_snapshot(self):
+        """Testē, ka darbinieka starts atver momentuzņēmumu, ja tas ir"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        path = os.path.join(self.tmp.name, "catalog.bin")
+        self.node_db.build_snapshot(path)
+
+        catalog = self.node_db.load_catalog(path)
+        self.assertIsInstance(catalog, MappedNodeCatalog)
+        self.assertEqual(self.node_db.get("n8n-nodes-base.webhook")["display_name"], "Webhook")
+        catalog.close()
+
+        with open(path, "wb") as fh:
+            fh.write(b"not a catalog" * 10)
+        self.assertIsInstance(self.node_db.load_catalog(path), NodeCatalog)
+
+    def test_truncated_snapshot_falls_back_to_database(self):
+        """Testē, ka tukšs vai saīsināts momentuzņēmums neaptur startu"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        path = os.path.join(self.tmp.name, "catalog.bin")
+        size = self.node_db.build_snapshot(path)
+        with open(path, "rb") as fh:
+            data = fh.read()
+
+        for truncated in (b"", data[:20], data[:60], data[:size - 5]):
+            with open(path, "wb") as fh:
+                fh.write(truncated)
+            with self.assertRaises(ValueError):
+                MappedNodeCatalog(path)
+            catalog = self.node_db.load_catalog(path)
+            self.assertIsInstance(catalog, NodeCatalog)
+            self.assertEqual(len(catalog), 3)
+
+    def test_stale_snapshot_is_ignored(self):
+        """Testē, ka momentuzņēmums, kas vecāks par DB, netiek lietots"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        path = os.path.join(self.tmp.name, "catalog.bin")
+        self.node_db.build_snapshot(path)
+
+        _write_node(self.nodes_dir, "Slack/Slack.node.json", {"name": "n8n-nodes-base.slack", "displayName": "Slack"})
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+        catalog = self.node_db.load_catalog(path)
+        self.assertIsInstance(catalog, NodeCatalog)
+        self.assertIn("n8n-nodes-base.slack", catalog)
+
+        self.node_db.build_snapshot(path)
+        self.assertIsInstance(self.node_db.load_catalog(path), MappedNodeCatalog)
+
+    def test_replaced_mapping_is_closed(self):
+        """Testē, ka aizstātā mmap kartēšana tiek aizvērta nākamajā nomaiņā"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        path = os.path.join(self.tmp.name, "catalog.bin")
+        self.node_db.build_snapshot(path)
+
+        first = self.node_db.load_catalog(path)
+        self.node_db.reload_catalog()
+        self.assertFalse(first._mm.closed)  # vēl var būt rokās iepriekšējam pieprasījumam
+        self.node_db.reload_catalog()
+        self.assertTrue(first._mm.closed)
+
+
+class TestParameterValidation(NodeDatabaseTestCase):
+    """Testē parametru tabulu un kompilētos validatorus"""
+
+    def setUp(self):
+        super().setUp()
+        _write_node(self.nodes_dir, "Slack/Slack.node.json", {
+            "name": "n8n-nodes-base.slack",
+            "displayName": "Slack",
+            "properties": [
+                {"name": "resource", "type": "options", "default": "message",
+                 "options": [{"name": "Message", "value": "message"}, {"name": "Channel", "value": "channel"}]},
+                {"name": "operation", "type": "options", "default": "post",
+                 "displayOptions": {"show": {"resource": ["message"]}},
+                 "options": [{"name": "Post", "value": "post"}, {"name": "Update", "value": "update"}]},
+                {"name": "operation", "type": "options", "default": "create",
+                 "displayOptions": {"show": {"resource": ["channel"]}},
+                 "options": [{"name": "Create", "value": "create"}, {"name": "Archive", "value": "archive"}]},
+                {"name": "channel", "type": "string", "default": "", "required": True,
+                 "displayOptions": {"show": {"resource": ["message"]}}},
+                {"name": "attachments", "type": "collection", "default": {},
+                 "displayOptions": {"hide": {"operation": ["update"]}}},
+                {"name": "timeout", "type": "number", "default": 10},
+            ],
+        })
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+    def test_parameters_are_extracted_at_ingest(self):
+        """Testē, ka `properties` tiek normalizēti node_parameters tabulā"""
+        params = NodeParameter.query.filter_by(node_id="n8n-nodes-base.slack").order_by(NodeParameter.position).all()
+        self.assertEqual([p.name for p in params],
+                         ["resource", "operation", "operation", "channel", "attachments", "timeout"])
+        self.assertEqual(json.loads(params[0].options), ["message", "channel"])
+        self.assertTrue(params[3].required)
+
+    def test_required_types_options_and_display_options(self):
+        """Testē obligātos laukus, tipus, opcijas un displayOptions"""
+        validate = self.node_db.validate_node_parameters
+        slack = "n8n-nodes-base.slack"
+
+        self.assertEqual(validate(slack, {"channel": "#general"}), (True, []))
+        self.assertEqual(validate(slack, {}), (False, ["Trūkst obligātā parametra: channel"]))
+        # channel redzams tikai resource=message
+        self.assertEqual(validate(slack, {"resource": "channel", "operation": "archive"}), (True, []))
+
+        valid, errors = validate(slack, {"resource": "channel", "operation": "post"})
+        self.assertFalse(valid)
+        self.assertIn("nederīga vērtība", errors[0])
+
+        valid, errors = validate(slack, {"channel": "#a", "timeout": "ten"})
+        self.assertEqual(errors, ["Parametram 'timeout' jābūt tipa number"])
+        # izteiksmes netiek tipu pārbaudītas
+        self.assertEqual(validate(slack, {"channel": "#a", "timeout": "={{ $json.t }}"}), (True, []))
+        # attachments slēpts pie operation=update
+        self.assertEqual(validate(slack, {"channel": "#a", "operation": "update", "attachments": 5}), (True, []))
+        self.assertFalse(validate(slack, {"channel": "#a", "attachments": 5})[0])
+
+        self.assertEqual(validate("n8n-nodes-base.unknown", {"x": 1}), (True, []))
+
+    def test_validator_is_compiled_once_per_catalog_version(self):
+        """Testē, ka validators tiek kešots un atjaunots pēc ielādes"""
+        validator = self.node_db.get_validator("n8n-nodes-base.slack")
+        self.assertIs(self.node_db.get_validator("n8n-nodes-base.slack"), validator)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            for _ in range(50):
+                self.node_db.validate_node_parameters("n8n-nodes-base.slack", {"channel": "#a"})
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        self.assertEqual(statements, [])
+
+        _write_node(self.nodes_dir, "Extra/Extra.node.json", {"name": "n8n-nodes-base.extra"})
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        self.assertIsNot(self.node_db.get_validator("n8n-nodes-base.slack"), validator)
+
+    def test_property_only_change_recompiles_validator(self):
+        """Testē, ka tikai `properties` izmaiņa (kataloga versija nemainās) atjauno validatoru"""
+        slack, params = "n8n-nodes-base.slack", {"channel": "#a", "timeout": "ten"}
+        path = os.path.join(self.nodes_dir, "Slack/Slack.node.json")
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        self.assertFalse(self.node_db.validate_node_parameters(slack, params)[0])
+        version = self.node_db.catalog.version
+
+        def change_timeout_type(ptype):
+            data["properties"][-1]["type"] = ptype
+            _write_node(self.nodes_dir, "Slack/Slack.node.json", data)
+            os.utime(path, (1, 1))
+
+        change_timeout_type("string")
+        self.node_db.refresh_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(self.node_db.catalog.version, version)
+        self.assertTrue(self.node_db.validate_node_parameters(slack, params)[0])
+
+        change_timeout_type("number")
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        self.assertEqual(self.node_db.catalog.version, version)
+        self.assertFalse(self.node_db.validate_node_parameters(slack, params)[0])
+
+class TestNodeRoutes(NodeDatabaseTestCase):
+    """Testē /api/nodes galapunktus"""
+
+    def setUp(self):
+        super().setUp()
+        self.app.register_blueprint(node_bp, url_prefix='/api')
+        self.client = self.app.test_client()
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+    def test_json_data_is_deferred(self):
+        """Testē, ka saraksta vaicājumi neielādē json_data kolonnu"""
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            NodeDefinition.query.all()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        self.assertNotIn("json_data", statements[-1])
+
+    def test_definition_endpoint_streams_raw_json(self):
+        """Testē neapstrādātās definīcijas galapunktu"""
+        response = self.client.get('/api/nodes/n8n-nodes-base.webhook/definition')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(json.loads(response.data)["displayName"], "Webhook")
+
+        # Lieli JSON tiek lasīti no DB gabalos, nevis vienā virknē
+        raw = self.node_db.get_definition_json("n8n-nodes-base.webhook")
+        chunks = list(self.node_db.iter_definition_json("n8n-nodes-base.webhook", chunk_size=16))
+        self.assertEqual("".join(chunks), raw)
+        self.assertTrue(all(len(chunk) <= 16 for chunk in chunks))
+        self.assertGreater(len(chunks), 1)
+
+        missing = self.client.get('/api/nodes/n8n-nodes-base.missing/definition')
+        self.assertEqual(missing.status_code, 404)
+
+    def test_autocomplete_prefix_and_usage_ranking(self):
+        """Testē prefiksu autokompleti un ranžēšanu pēc lietošanas"""
+        _write_node(self.nodes_dir, "Telegram/Telegram.node.json", {
+            "name": "n8n-nodes-base.telegram", "displayName": "Telegram",
+        })
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+        results = self.client.get('/api/nodes/autocomplete?q=tele').get_json()["results"]
+        self.assertEqual([r["node_id"] for r in results],
+                         ["n8n-nodes-base.telegram", "n8n-nodes-base.telegramTrigger"])
+
+        # display_name vārds un īsais tips
+        ids = [r["node_id"] for r in self.node_db.autocomplete("trig")]
+        self.assertEqual(ids, ["n8n-nodes-base.telegramTrigger"])
+        self.assertEqual(self.node_db.autocomplete("WEBH")[0]["node_id"], "n8n-nodes-base.webhook")
+        self.assertEqual(self.node_db.autocomplete(""), [])
+
+        for _ in range(3):
+            self.node_db.record_usage(["n8n-nodes-base.telegramTrigger"])
+        results = self.client.get('/api/nodes/autocomplete?q=tele&limit=1').get_json()["results"]
+        self.assertEqual(results[0]["node_id"], "n8n-nodes-base.telegramTrigger")
+        self.assertEqual(results[0]["usage"], 3)
+
+    def test_usage_counts_are_persisted(self):
+        """Testē, ka lietojums tiek skaitīts vienreiz uz workflow un saglabāts datubāzē"""
+        self.write_sample_nodes()
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+
+        # Viens workflow ar diviem vienāda tipa mezgliem ir viens lietojuma notikums
+        self.node_db.record_usage(["n8n-nodes-base.telegramTrigger"] * 2)
+        self.node_db.record_usage(["n8n-nodes-base.telegramTrigger", "n8n-nodes-base.webhook"])
+        self.assertEqual(NodeUsageCount.query.get("n8n-nodes-base.telegramTrigger").count, 2)
+        self.assertEqual(NodeUsageCount.query.get("n8n-nodes-base.webhook").count, 1)
+
+        # Cits process (vai restarts) sāk ar tukšu atmiņu un ielādē skaitus no datubāzes
+        node_autocomplete.node_usage.clear()
+        results = self.node_db.autocomplete("tele", limit=1)
+        self.assertEqual(results[0]["node_id"], "n8n-nodes-base.telegramTrigger")
+        self.assertEqual(results[0]["usage"], 2)
+
+    def test_keyset_pagination_and_projection(self):
+        """Testē kursora lapošanu un `fields=` projekciju"""
+        first = self.client.get('/api/nodes?limit=2&fields=node_id,display_name').get_json()
+        self.assertEqual([n["node_id"] for n in first["nodes"]],
+                         ["n8n-nodes-base.airtable", "n8n-nodes-base.telegramTrigger"])
+        self.assertEqual(set(first["nodes"][0]), {"node_id", "display_name"})
+        self.assertEqual(first["next_cursor"], "n8n-nodes-base.telegramTrigger")
+
+        second = self.client.get(f'/api/nodes?limit=2&cursor={first["next_cursor"]}').get_json()
+        self.assertEqual([n["node_id"] for n in second["nodes"]], ["n8n-nodes-base.webhook"])
+        self.assertIsNone(second["next_cursor"])
+
+        bad = self.client.get('/api/nodes?fields=node_id,json_data')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_etag_revalidation(self):
+        """Testē 304 atbildi, kamēr katalogs nav mainījies"""
+        first = self.client.get('/api/nodes')
+        etag = first.headers["ETag"]
+        self.assertEqual(first.status_code, 200)
+
+        cached = self.client.get('/api/nodes', headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+
+        _write_node(self.nodes_dir, "Slack/Slack.node.json", {"name": "n8n-nodes-base.slack"})
+        self.node_db.load_from_folder(self.nodes_dir, workers=1)
+        changed = self.client.get('/api/nodes', headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["ETag"], etag)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for Search Reranking
+Šis modulis testē WorkflowSearchEngine kandidātu pārranžēšanu kolonnās.
+"""
+
+import unittest
+import sys
+import os
+import random
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.workflow_search_algorithm import SearchIntent, SearchQuery, WorkflowSearchEngine
+
+TAGS = ["telegram", "email", "slack", "api", "webhook", "database", "ai"]
+
+
+def reference_rank(results, query):
+    """Sākotnējā (rindu pa rindai) ranžēšana salīdzināšanai"""
+    ranked = []
+    for result in results:
+        complexity = result['metadata']['complexity_score']
+        if query.complexity_preference == 'simple' and complexity > 30:
+            continue
+        if query.complexity_preference == 'complex' and complexity < 50:
+            continue
+        if query.keywords:
+            match = 0.0
+            for keyword in query.keywords:
+                if keyword in result['metadata']['tags']:
+                    match += 1.0
+                elif keyword in result['metadata']['description'].lower():
+                    match += 0.5
+            match /= len(query.keywords)
+        else:
+            match = 0.5
+        ranked.append((result['id'], result['score'] * 0.7 + match * 0.3))
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
+
+
+def candidates(rng, count):
+    return [{
+        "id": f"wf-{i}",
+        "score": round(rng.random(), 2),
+        "metadata": {
+            "name": f"Workflow {i}",
+            "description": " ".join(rng.sample(TAGS + ["Notifications", "Sync", "Bot"], 3)).capitalize(),
+            "tags": rng.sample(TAGS, rng.randint(0, 3)),
+            "complexity_score": rng.randint(0, 100),
+            "nodes_count": rng.randint(1, 20),
+        },
+    } for i in range(count)]
+
+
+class TestColumnarRerank(unittest.TestCase):
+    """Testē, ka NumPy pārranžēšana sakrīt ar sākotnējo algoritmu"""
+
+    def setUp(self):
+        self.engine = WorkflowSearchEngine(None, None, None)
+        self.addCleanup(self.engine.close)
+        self.rng = random.Random(3)
+
+    def query(self, keywords, complexity="medium"):
+        return SearchQuery(" ".join(keywords), SearchIntent.CREATE_NEW, keywords, {}, "en", complexity)
+
+    def test_matches_reference_ranking(self):
+        for keywords in ([], ["telegram"], ["email", "bot", "email"], ["sync", "api", "ai"]):
+            for complexity in ("simple", "medium", "complex"):
+                results = candidates(self.rng, 200)
+                query = self.query(keywords, complexity)
+                expected = reference_rank(results, query)
+
+                ranked = self.engine._filter_and_rank_results(results, query)
+
+                self.assertEqual([r["id"] for r in ranked], [item[0] for item in expected])
+                self.assertEqual([r["adjusted_score"] for r in ranked], [item[1] for item in expected])
+
+    def test_keyword_match_and_reasons(self):
+        result = candidates(self.rng, 1)[0]
+        result["metadata"].update(tags=["telegram"], description="Sends Slack alerts", nodes_count=3)
+        query = self.query(["telegram", "slack", "email"], "simple")
+        result["metadata"]["complexity_score"] = 10
+
+        self.assertAlmostEqual(self.engine._calculate_keyword_match(result, query), 0.5)
+        self.assertEqual(self.engine._generate_match_reasons(result, query),
+                         ["Satur telegram funkcionalitāti", "Vienkāršs workflow", "Kompakts dizains"])
+        self.assertEqual(self.engine._generate_modifications(result, query),
+                         ["Var pievienot slack integrāciju", "Var pievienot email integrāciju"])
+
+    def test_empty_candidates(self):
+        self.assertEqual(self.engine._filter_and_rank_results([], self.query(["telegram"])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for Search Result Cache
+Šis modulis testē meklēšanas rezultātu kešu un tā izmantošanu WorkflowSearchEngine.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.embedding_backends import HashingEmbeddingBackend
+from src.lexical_index import LexicalIndex
+from src.local_vector_index import LocalVectorIndex
+from src.search_result_cache import SearchResultCache, query_signature
+from src.vector_database_design import WorkflowVectorizer, index_workflows
+from src.workflow_blob_store import WorkflowBlobStore
+from src.workflow_search_algorithm import NaturalLanguageProcessor, WorkflowSearchEngine
+from test_lexical_index import WORKFLOWS, CountingBackend, node
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSearchResultCache(unittest.TestCase):
+    """Testē keša līmeņus, TTL un versijas"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = SearchResultCache(max_entries=3, ttl=60, similarity_threshold=0.95, clock=self.clock)
+        nlp = NaturalLanguageProcessor(None)
+        parsed = nlp.parse_query("telegram bot booking")
+        self.signature = query_signature(parsed, "messaging", 5)
+
+    def test_signature_is_canonical(self):
+        nlp = NaturalLanguageProcessor(None)
+        first = nlp.parse_query("telegram bot booking")
+        second = nlp.parse_query("Telegram booking bot")
+
+        self.assertEqual(query_signature(first, "messaging", 5), query_signature(second, "messaging", 5))
+        self.assertNotEqual(query_signature(first, "messaging", 5), query_signature(first, None, 5))
+        self.assertNotEqual(query_signature(first, "messaging", 5), query_signature(first, "messaging", 3))
+
+    def test_exact_tier_ignores_word_order_but_not_words(self):
+        self.cache.put(self.signature, "telegram bot booking", None, 1, ["a"])
+
+        self.assertEqual(self.cache.get(self.signature, "Telegram  booking BOT", 1), ["a"])
+        self.assertIsNone(self.cache.get(self.signature, "telegram bot booking today", 1))
+
+    def test_ttl_and_version_invalidate(self):
+        self.cache.put(self.signature, "telegram bot", None, 1, ["a"])
+
+        self.assertIsNone(self.cache.get(self.signature, "telegram bot", 2))
+        self.cache.put(self.signature, "telegram bot", None, 2, ["b"])
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get(self.signature, "telegram bot", 2))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_near_duplicate_tier(self):
+        self.cache.put(self.signature, "telegram bot booking", [1.0, 0.0, 0.1], 1, ["a"])
+
+        self.assertEqual(self.cache.get_similar(self.signature, [0.98, 0.01, 0.12], 1), ["a"])
+        self.assertIsNone(self.cache.get_similar(self.signature, [0.5, 0.5, 0.0], 1))
+        self.assertIsNone(self.cache.get_similar(self.signature[:-1] + (3,), [1.0, 0.0, 0.1], 1))
+        self.assertIsNone(self.cache.get_similar(self.signature, [1.0, 0.0, 0.1], 2))
+        disabled = SearchResultCache(similarity_threshold=None)
+        disabled.put(self.signature, "x", [1.0, 0.0], 1, ["a"])
+        self.assertIsNone(disabled.get_similar(self.signature, [1.0, 0.0], 1))
+
+    def test_lru_eviction(self):
+        for i, text in enumerate(["a", "b", "c"]):
+            self.cache.put(self.signature, text, [1.0, float(i)], 1, [text])
+        self.cache.get(self.signature, "a", 1)
+        self.cache.put(self.signature, "d", None, 1, ["d"])
+
+        self.assertIsNone(self.cache.get(self.signature, "b", 1))
+        self.assertEqual(self.cache.get(self.signature, "a", 1), ["a"])
+        self.assertEqual(self.cache.stats()["entries"], 3)
+
+
+class TestCachedSearch(unittest.TestCase):
+    """Testē WorkflowSearchEngine ar rezultātu kešu"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backend = CountingBackend()
+        self.vectorizer = WorkflowVectorizer(None, backend=self.backend)
+        self.index = LocalVectorIndex(None, vector_size=256,
+                                      blob_store=WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs")))
+        self.lexical_index = LexicalIndex(None)
+        index_workflows(WORKFLOWS, self.vectorizer, self.index, lexical_index=self.lexical_index)
+        self.cache = SearchResultCache(similarity_threshold=0.5)
+        self.engine = WorkflowSearchEngine(self.index, self.vectorizer, NaturalLanguageProcessor(None),
+                                           lexical_index=self.lexical_index, result_cache=self.cache)
+        self.addCleanup(self.engine.close)
+        self.backend.calls = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reordered_query_is_served_without_embedding(self):
+        first = self.engine.search("telegram bots klientiem", max_results=2)
+
+        timings = {}
+        second = self.engine.search("Klientiem telegram bots", max_results=2, timings=timings)
+
+        # Fona embedding rezultāts netiek gaidīts
+        self.assertNotIn("embedding", timings)
+        self.assertNotIn("vector_search", timings)
+        self.assertEqual([r.workflow_id for r in second], [r.workflow_id for r in first])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_near_duplicate_skips_vector_search(self):
+        self.engine.search("telegram bots klientiem", max_results=2)
+
+        timings = {}
+        results = self.engine.search("telegram bots klientiem steidzami", max_results=2, timings=timings)
+
+        self.assertNotIn("vector_search", timings)
+        self.assertEqual(self.cache.stats()["near_hits"], 1)
+        self.assertEqual(results[0].workflow_name, "Telegram bots")
+
+    def test_unhydrated_search_and_lazy_hydration(self):
+        timings = {}
+        hits = self.engine.search("telegram bots klientiem", max_results=2, timings=timings, hydrate=False)
+
+        self.assertNotIn("hydrate", timings)
+        self.assertTrue(hits and all(hit.workflow_json is None for hit in hits))
+        hydrated = self.engine.hydrate_results(hits, timings)
+        self.assertEqual(hydrated[0].workflow_json["name"], "Telegram bots")
+        self.assertIn("hydrate", timings)
+
+        # Kešā paliek nehidratētie rezultāti; parastā meklēšana tos hidratē
+        results = self.engine.search("telegram bots klientiem", max_results=2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(results[0].workflow_json["name"], "Telegram bots")
+        self.assertIsNone(hits[0].workflow_json)
+
+    def test_parse_and_embedding_overlap_with_cache(self):
+        class SlowBackend(HashingEmbeddingBackend):
+            def embed(self, texts):
+                time.sleep(0.2)
+                return super().embed(texts)
+
+        class SlowParser(NaturalLanguageProcessor):
+            def parse_query(self, text):
+                time.sleep(0.2)
+                return super().parse_query(text)
+
+        vectorizer = WorkflowVectorizer(None, backend=SlowBackend(dimension=256))
+        engine = WorkflowSearchEngine(self.index, vectorizer, SlowParser(None),
+                                      lexical_index=self.lexical_index, result_cache=SearchResultCache())
+        self.addCleanup(engine.close)
+        timings = {}
+
+        results = engine.search("telegram bots klientiem", max_results=1, timings=timings)
+
+        self.assertEqual(results[0].workflow_name, "Telegram bots")
+        self.assertGreaterEqual(timings["parse"], 200)
+        self.assertGreaterEqual(timings["embedding"], 200)
+        # Embedding sākas pirms parsēšanas un keša pārbaudes — kopā tuvāk lēnākajam posmam
+        self.assertLess(timings["total"], 350)
+
+    def test_index_write_invalidates(self):
+        self.engine.search("slack", max_results=2)
+        workflow = {"name": "Slack paziņojumi", "nodes": [node("slack", "Slack")], "connections": {}}
+        index_workflows([workflow], self.vectorizer, self.index, lexical_index=self.lexical_index)
+
+        results = self.engine.search("slack", max_results=2)
+
+        self.assertEqual(results[0].workflow_name, "Slack paziņojumi")
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for Vector Quantization
+Šis modulis testē int8/PQ kvantizāciju: atmiņas samazinājumu un recall@5
+pēc precīzās pārvērtēšanas salīdzinājumā ar pilnās precizitātes meklēšanu.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.local_vector_index import LocalVectorIndex
+from src.vector_database_design import EMBEDDING_SIZE
+from src.vector_quantization import ProductQuantizer, ScalarQuantizer, encode_matrix, normalize_rows, train_quantizer
+from src.workflow_blob_store import WorkflowBlobStore
+from test_local_vector_index import make_vector
+
+DIM = 64
+COUNT = 3000
+K = 5
+# Pieļaujamais recall@5 zudums pret precīzo meklēšanu
+RECALL_TOLERANCE = 0.05
+
+
+def clustered_corpus(count=COUNT, dim=DIM, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(30, dim))
+    return (centers[rng.integers(0, len(centers), count)] + 0.6 * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+class TestQuantizers(unittest.TestCase):
+    """Testē kvantizatorus atsevišķi"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = clustered_corpus()
+        cls.normalized = normalize_rows(cls.matrix)
+
+    def test_scalar_round_trip_error_is_small(self):
+        quantizer = train_quantizer("int8", self.normalized)
+        codes = quantizer.encode(self.normalized)
+
+        self.assertEqual(codes.dtype, np.uint8)
+        error = np.abs(quantizer.decode(codes) - self.normalized).max(axis=0)
+        self.assertTrue(np.all(error <= quantizer.scales / 2 + 1e-6))
+
+    def test_scores_approximate_dot_product(self):
+        query = self.normalized[0]
+        exact = self.normalized @ query
+        for kind, tolerance in (("int8", 0.01), ("pq", 0.15)):
+            quantizer = train_quantizer(kind, self.normalized)
+            codes = encode_matrix(quantizer, self.matrix, np.linalg.norm(self.matrix, axis=1))
+            approximate = quantizer.scores(codes, query)
+            self.assertLess(np.abs(approximate - exact).mean(), tolerance, kind)
+            # ADC rezultāts sakrīt ar dekodētā vektora skalāro reizinājumu
+            np.testing.assert_allclose(approximate, quantizer.decode(codes) @ query, atol=1e-4)
+
+    def test_compression_ratio(self):
+        scalar = train_quantizer("int8", self.normalized)
+        product = train_quantizer("pq", self.normalized)
+
+        self.assertIsInstance(product, ProductQuantizer)
+        self.assertEqual(DIM * 4 // scalar.code_size, 4)
+        self.assertEqual(DIM * 4 // product.code_size, 16)
+
+    def test_pq_memory_at_embedding_dimension(self):
+        matrix = clustered_corpus(count=2048, dim=EMBEDDING_SIZE)
+        normalized = normalize_rows(matrix)
+
+        tracemalloc.start()
+        try:
+            quantizer = train_quantizer("pq", normalized, iterations=2)
+            codes = encode_matrix(quantizer, matrix, np.linalg.norm(matrix, axis=1))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(codes.shape, (2048, EMBEDDING_SIZE // 4))
+        # Pagaidu masīvi paliek ierobežoti (agrāk — ~0,8 GB katrs šim paraugam)
+        self.assertLess(peak, 400 * 1024 * 1024)
+        exact = normalized @ normalized[0]
+        self.assertLess(np.abs(quantizer.scores(codes, normalized[0]) - exact).mean(), 0.15)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            train_quantizer("binary", self.normalized)
+
+
+class TestQuantizedIndex(unittest.TestCase):
+    """Testē lokālo indeksu ar kvantizāciju un pārvērtēšanu"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = clustered_corpus()
+        cls.vectors = [
+            make_vector(f"wf-{i}", row, category="messaging" if i % 3 == 0 else "general")
+            for i, row in enumerate(cls.matrix)
+        ]
+        rng = np.random.default_rng(2)
+        queries = cls.matrix[rng.integers(0, COUNT, 100)]
+        cls.queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.blobs = WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def open_index(self, quantization, path="index"):
+        index = LocalVectorIndex(os.path.join(self.tmpdir.name, path), vector_size=DIM, blob_store=self.blobs,
+                                 quantization=quantization)
+        index.initialize_collection()
+        return index
+
+    def recall(self, index, reference, category_filter=None):
+        approximate = index.search_many(self.queries.tolist(), limit=K, category_filter=category_filter,
+                                        hydrate=False)
+        exact = reference.search_many(self.queries.tolist(), limit=K, category_filter=category_filter,
+                                      hydrate=False)
+        hits = sum(len({r["id"] for r in a} & {r["id"] for r in e}) for a, e in zip(approximate, exact))
+        return hits / (len(self.queries) * K)
+
+    def test_recall_and_memory(self):
+        reference = self.open_index(None, path="exact")
+        reference.add_workflows(self.vectors)
+        for kind, ratio in (("int8", 4), ("pq", 16)):
+            index = self.open_index(kind, path=kind)
+            index.add_workflows(self.vectors)
+
+            stats = index.get_collection_stats()
+            self.assertEqual(stats["quantization"], kind)
+            self.assertEqual(stats["full_precision_bytes"] // stats["index_bytes"], ratio)
+            self.assertGreaterEqual(self.recall(index, reference), 1 - RECALL_TOLERANCE, kind)
+            self.assertGreaterEqual(self.recall(index, reference, "messaging"), 1 - RECALL_TOLERANCE, kind)
+
+    def test_rescored_scores_are_exact(self):
+        index = self.open_index("pq")
+        index.add_workflows(self.vectors)
+
+        results = index.search_similar_workflows(self.matrix[10].tolist(), limit=K, hydrate=False)
+
+        self.assertEqual(results[0]["id"], "wf-10")
+        self.assertAlmostEqual(results[0]["score"], 1.0, places=5)
+        self.assertTrue(all(a["score"] >= b["score"] for a, b in zip(results, results[1:])))
+
+    def test_codes_persist_and_follow_upserts(self):
+        index = self.open_index("int8")
+        index.add_workflows(self.vectors[:2000])
+        index.add_workflows(self.vectors[2000:])
+        index.add_workflows([make_vector("wf-0", -self.matrix[0])])
+
+        # Bez `flush` kodi netiek saglabāti — atverot tie tiek kvantizēti no jauna
+        unflushed = self.open_index("int8")
+        results = unflushed.search_similar_workflows((-self.matrix[0]).tolist(), limit=1, hydrate=False)
+        self.assertEqual(results[0]["id"], "wf-0")
+
+        index.flush()
+        reopened = self.open_index("int8")
+
+        self.assertIsInstance(reopened._quantizer, ScalarQuantizer)
+        self.assertEqual(len(reopened._state.codes), COUNT)
+        np.testing.assert_array_equal(reopened._state.codes, index._state.codes)
+        results = reopened.search_similar_workflows((-self.matrix[0]).tolist(), limit=1, hydrate=False)
+        self.assertEqual(results[0]["id"], "wf-0")
+
+    def test_small_index_is_not_quantized(self):
+        index = self.open_index("pq")
+        index.add_workflows(self.vectors[:100])
+
+        self.assertIsNone(index.get_collection_stats()["quantization"])
+        self.assertEqual(len(index.search_similar_workflows(self.matrix[0].tolist(), limit=K)), K)
+
+
+if __name__ == '__main__':
+    unittest.main()
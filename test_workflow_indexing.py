@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Tests for Workflow Indexing
+Šis modulis testē paketēto workflow vektorizēšanu un indeksēšanu Qdrant.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    CompressionRatio, Disabled, Distance, PointStruct, ProductQuantization, ProductQuantizationConfig,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, VectorParams
+)
+
+from src import embedding_backends
+from src.embedding_backends import (
+    EmbeddingBackend,
+    EmbeddingError,
+    HashingEmbeddingBackend,
+    create_embedding_backend,
+    create_openai_client,
+)
+from src.embedding_cache import EmbeddingCache
+from src.workflow_blob_store import WorkflowBlobStore, content_hash
+from src.vector_database_design import (
+    EMBEDDING_SIZE,
+    PAYLOAD_INDEXES,
+    QdrantCollectionConfig,
+    QdrantWorkflowDatabase,
+    WorkflowVectorizer,
+    index_workflows,
+    iter_workflow_files,
+)
+
+
+class FakeEmbeddings:
+    """Aizstāj `openai_client.embeddings`; pieraksta katra pieprasījuma ievades"""
+
+    def __init__(self, fail_on=None):
+        self.requests = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def create(self, model, input):
+        inputs = input if isinstance(input, list) else [input]
+        with self._lock:
+            self.requests.append(list(inputs))
+        if self.fail_on and any(self.fail_on in text for text in inputs):
+            raise RuntimeError("API kļūda")
+        data = [SimpleNamespace(embedding=[float(len(text) % 7 + 1)] + [0.1] * (EMBEDDING_SIZE - 1))
+                for text in inputs]
+        return SimpleNamespace(data=data)
+
+
+def fake_client(fail_on=None):
+    return SimpleNamespace(embeddings=FakeEmbeddings(fail_on=fail_on))
+
+
+def sample_workflow(i):
+    return {
+        "name": f"Workflow {i}",
+        "nodes": [
+            {"type": "n8n-nodes-base.telegramTrigger", "name": "Telegram", "parameters": {"updates": ["message"]}},
+            {"type": "n8n-nodes-base.set", "name": f"Set {i}", "parameters": {"value": f"v{i}"}},
+        ],
+        "connections": {},
+    }
+
+
+class TestBatchedEmbeddings(unittest.TestCase):
+    """Testē embedding pieprasījumu paketēšanu"""
+
+    def test_texts_are_grouped_into_batches(self):
+        client = fake_client()
+        vectorizer = WorkflowVectorizer(client)
+        texts = [f"teksts {i}" for i in range(1200)]
+
+        vectors = vectorizer.generate_embeddings(texts)
+
+        self.assertEqual(len(vectors), 1200)
+        sizes = sorted(len(batch) for batch in client.embeddings.requests)
+        self.assertEqual(sum(sizes), 1200)
+        self.assertLessEqual(max(sizes), vectorizer.backend.max_batch_size)
+        self.assertEqual(len(sizes), 3)
+
+    def test_token_budget_splits_long_texts(self):
+        client = fake_client()
+        vectorizer = WorkflowVectorizer(client)
+        # ~60k tokenu katrs → katrs savā pieprasījumā
+        texts = ["a" * 240_000 + str(i) for i in range(3)]
+
+        vectorizer.generate_embeddings(texts)
+
+        self.assertEqual(sorted(len(batch) for batch in client.embeddings.requests), [1, 1, 1])
+
+    def test_duplicates_and_cached_texts_are_not_sent(self):
+        client = fake_client()
+        cache = EmbeddingCache(path=None)
+        vectorizer = WorkflowVectorizer(client, cache=cache)
+        vectorizer.generate_embedding("jau kešā")
+
+        vectors = vectorizer.generate_embeddings(["jau kešā", "jauns", "jauns"])
+
+        self.assertEqual(client.embeddings.requests, [["jau kešā"], ["jauns"]])
+        self.assertEqual(vectors[1], vectors[2])
+
+    def test_failed_batch_raises_and_keeps_successful_batches(self):
+        client = fake_client(fail_on="slikts")
+        cache = EmbeddingCache(path=None)
+        vectorizer = WorkflowVectorizer(client, cache=cache)
+        texts = ["slikts"] + [f"labs {i}" for i in range(600)]
+
+        with self.assertRaises(EmbeddingError):
+            vectorizer.generate_embeddings(texts)
+
+        self.assertIsNotNone(cache.get(vectorizer.model, "labs 599"))
+
+
+class TestHashingBackend(unittest.TestCase):
+    """Testē lokālo embedding backend"""
+
+    def test_deterministic_and_normalized(self):
+        first = HashingEmbeddingBackend(dimension=256).embed(["Telegram bots ar OpenAI"])[0]
+        second = HashingEmbeddingBackend(dimension=256).embed(["Telegram bots ar OpenAI"])[0]
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 256)
+        self.assertAlmostEqual(sum(x * x for x in first), 1.0, places=5)
+
+    def test_related_texts_are_closer(self):
+        backend = HashingEmbeddingBackend()
+        query, related, other = backend.embed(["telegram bot", "Node types: telegramTrigger", "gmail postgres"])
+
+        def dot(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        self.assertGreater(dot(query, related), dot(query, other))
+
+    def test_backend_must_implement_embed(self):
+        class Incomplete(EmbeddingBackend):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_without_api_key_uses_local_backend(self):
+        env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+        for configured in ("", "local"):
+            with mock.patch.dict(os.environ, env, clear=True), \
+                    mock.patch.object(embedding_backends, "DEFAULT_BACKEND", configured):
+                client = create_openai_client()
+                backend = create_embedding_backend(client)
+
+            self.assertIsNone(client)
+            self.assertIsInstance(backend, HashingEmbeddingBackend)
+            vectors = WorkflowVectorizer(client, backend=backend).generate_embeddings(["telegram bot"])
+            self.assertEqual(len(vectors[0]), backend.dimension)
+
+
+class TestIndexWorkflows(unittest.TestCase):
+    """Testē index_workflows konveijeru ar Qdrant atmiņas režīmā"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = QdrantWorkflowDatabase(client=QdrantClient(":memory:"),
+                                               blob_store=WorkflowBlobStore(self.tmpdir.name))
+        self.database.initialize_collection()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_index_stream_in_chunks(self):
+        client = fake_client()
+        vectorizer = WorkflowVectorizer(client)
+
+        stats = index_workflows((sample_workflow(i) for i in range(25)), vectorizer, self.database, chunk_size=10)
+
+        self.assertEqual(stats, {"indexed": 25, "failed": 0})
+        self.assertEqual(len(client.embeddings.requests), 3)
+        self.assertEqual(self.database.client.count(self.database.collection_name).count, 25)
+
+    def test_failed_embeddings_are_skipped(self):
+        vectorizer = WorkflowVectorizer(fake_client(fail_on="Set 3"))
+
+        stats = index_workflows([sample_workflow(3)], vectorizer, self.database)
+
+        self.assertEqual(stats, {"indexed": 0, "failed": 1})
+
+    def test_failed_batch_does_not_drop_chunk(self):
+        vectorizer = WorkflowVectorizer(fake_client(fail_on="Set 3"))
+        vectorizer.backend.max_batch_size = 4
+        failed = []
+
+        stats = index_workflows((sample_workflow(i) for i in range(10)), vectorizer, self.database,
+                                failed=failed)
+
+        # Neizdodas tikai pakete ar "Set 3" (workflow 0–3); pārējās tiek ierakstītas
+        self.assertEqual(stats, {"indexed": 6, "failed": 4})
+        self.assertEqual([workflow["name"] for workflow in failed], [f"Workflow {i}" for i in range(4)])
+        self.assertEqual(self.database.client.count(self.database.collection_name).count, 6)
+
+    def test_index_with_local_backend_and_search(self):
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend())
+        workflows = [sample_workflow(i) for i in range(5)]
+        workflows.append({
+            "name": "Gmail uz Postgres",
+            "nodes": [{"type": "n8n-nodes-base.gmailTrigger", "name": "Gmail"},
+                      {"type": "n8n-nodes-base.postgres", "name": "Postgres"}],
+            "connections": {},
+        })
+
+        stats = index_workflows(workflows, vectorizer, self.database)
+        self.assertEqual(stats, {"indexed": 6, "failed": 0})
+
+        query = vectorizer.generate_embedding("gmail trigger postgres")
+        hits = self.database.client.query_points(self.database.collection_name, query=query, limit=1).points
+        self.assertEqual(hits[0].payload["name"], "Gmail uz Postgres")
+
+    def test_search_many_matches_single_queries(self):
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend())
+        index_workflows([sample_workflow(i) for i in range(6)], vectorizer, self.database)
+        queries = vectorizer.generate_embeddings(["telegram", "workflow 3", "gmail"])
+
+        batched = self.database.search_many(queries, limit=3, hydrate=False)
+
+        self.assertEqual(len(batched), 3)
+        for query, results in zip(queries, batched):
+            single = self.database.search_similar_workflows(query, limit=3, hydrate=False)
+            self.assertEqual([r["id"] for r in results], [r["id"] for r in single])
+        self.assertEqual(self.database.search_many([]), [])
+
+    def test_payload_is_slim_and_results_hydrate_lazily(self):
+        vectorizer = WorkflowVectorizer(None, backend=HashingEmbeddingBackend())
+        index_workflows([sample_workflow(i) for i in range(3)], vectorizer, self.database)
+        query = vectorizer.generate_embedding("telegram")
+
+        results = self.database.search_similar_workflows(query, limit=3, hydrate=False)
+
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertNotIn("workflow_json", result)
+            self.assertNotIn("json_content", result["metadata"])
+        hydrated = self.database.hydrate(results[:1])
+        self.assertEqual(content_hash(hydrated[0]["workflow_json"]), hydrated[0]["metadata"]["content_hash"])
+        self.assertEqual(hydrated[0]["workflow_json"]["name"], hydrated[0]["metadata"]["name"])
+
+    def test_legacy_payload_and_missing_blob(self):
+        vector = [1.0] + [0.0] * (EMBEDDING_SIZE - 1)
+        legacy = sample_workflow(7)
+        self.database.client.upsert(self.database.collection_name, points=[
+            PointStruct(id=1, vector=vector, payload={"name": "Vecais", "json_content": json.dumps(legacy)}),
+            PointStruct(id=2, vector=vector, payload={"name": "Pazudis", "content_hash": "0" * 64}),
+        ])
+
+        results = self.database.search_similar_workflows(vector, limit=5)
+
+        self.assertEqual([result["workflow_json"] for result in results], [legacy])
+        self.assertEqual(self.database.get_workflow_by_id(1)["workflow_json"], legacy)
+        self.assertIsNone(self.database.get_workflow_by_id(2))
+
+    def test_iter_workflow_files_skips_invalid(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for i in range(3):
+                with open(os.path.join(folder, f"wf{i}.json"), "w", encoding="utf-8") as fh:
+                    json.dump(sample_workflow(i), fh)
+            with open(os.path.join(folder, "bojats.json"), "w", encoding="utf-8") as fh:
+                fh.write("{nav json")
+            with open(os.path.join(folder, "saraksts.json"), "w", encoding="utf-8") as fh:
+                json.dump([1, 2], fh)
+
+            names = sorted(workflow["name"] for workflow in iter_workflow_files(folder))
+
+        self.assertEqual(names, ["Workflow 0", "Workflow 1", "Workflow 2"])
+
+
+class TestQdrantCollectionConfig(unittest.TestCase):
+    """Testē kolekcijas iestatījumus, payload indeksus un esošas kolekcijas migrāciju"""
+
+    def setUp(self):
+        self.client = QdrantClient(":memory:")
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def open_database(self, config, **kwargs):
+        database = QdrantWorkflowDatabase(client=self.client, vector_size=8, config=config,
+                                          blob_store=WorkflowBlobStore(self.tmpdir.name), **kwargs)
+        # Lokālais Qdrant iestatījumus un payload indeksus ignorē, tāpēc tiek pārbaudīti klienta izsaukumi
+        client = self.client
+        with mock.patch.object(client, "create_collection", wraps=client.create_collection) as create, \
+                mock.patch.object(client, "create_payload_index", wraps=client.create_payload_index) as index, \
+                mock.patch.object(client, "update_collection", wraps=client.update_collection) as update:
+            self.assertTrue(database.initialize_collection())
+        return {"create": create, "index": index, "update": update}
+
+    def test_new_collection_uses_config(self):
+        config = QdrantCollectionConfig(hnsw_m=24, hnsw_ef_construct=200, indexing_threshold=5000,
+                                        vectors_on_disk=True)
+        calls = self.open_database(config)
+
+        created = calls["create"].call_args.kwargs
+        self.assertEqual((created["hnsw_config"].m, created["hnsw_config"].ef_construct), (24, 200))
+        self.assertEqual(created["optimizers_config"].indexing_threshold, 5000)
+        self.assertTrue(created["vectors_config"].on_disk)
+        self.assertEqual({call.kwargs["field_name"] for call in calls["index"].call_args_list}, set(PAYLOAD_INDEXES))
+        calls["update"].assert_not_called()
+
+    def test_existing_collection_is_migrated(self):
+        self.client.create_collection("n8n_workflows", vectors_config=VectorParams(size=8, distance=Distance.COSINE))
+
+        calls = self.open_database(QdrantCollectionConfig(hnsw_m=32, indexing_threshold=1000))
+
+        calls["create"].assert_not_called()
+        changes = calls["update"].call_args.kwargs
+        self.assertEqual(changes["hnsw_config"].m, 32)
+        self.assertEqual(changes["optimizers_config"].indexing_threshold, 1000)
+        self.assertNotIn("vectors_config", changes)
+        self.assertEqual(calls["index"].call_count, len(PAYLOAD_INDEXES))
+
+    def test_quantization_parameters_are_migrated(self):
+        self.client.create_collection("n8n_workflows", vectors_config=VectorParams(size=8, distance=Distance.COSINE))
+        int8 = ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99,
+                                                                  always_ram=True))
+        pq = ProductQuantization(product=ProductQuantizationConfig(compression=CompressionRatio.X16,
+                                                                   always_ram=True))
+        pq32 = ProductQuantization(product=ProductQuantizationConfig(compression=CompressionRatio.X32,
+                                                                     always_ram=True))
+        cases = [(int8, "pq", ProductQuantization), (pq32, "pq", ProductQuantization), (pq, "pq", None),
+                 (pq, "int8", ScalarQuantization), (int8, None, Disabled)]
+
+        for existing, wanted, expected in cases:
+            # Lokālais Qdrant kvantizāciju neglabā — tiek aizstāta get_collection atbilde
+            info = self.client.get_collection("n8n_workflows")
+            info.config.quantization_config = existing
+            with mock.patch.object(self.client, "get_collection", return_value=info):
+                calls = self.open_database(QdrantCollectionConfig(), quantization=wanted)
+
+            changes = calls["update"].call_args.kwargs if calls["update"].called else {}
+            if expected is None:
+                self.assertNotIn("quantization_config", changes)
+            elif expected is Disabled:
+                self.assertEqual(changes["quantization_config"], Disabled.DISABLED)
+            else:
+                self.assertIsInstance(changes["quantization_config"], expected)
+                self.assertNotEqual(changes["quantization_config"], existing)
+
+    def test_dimension_mismatch_fails_initialization(self):
+        self.client.create_collection("n8n_workflows", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+
+        database = QdrantWorkflowDatabase(client=self.client, vector_size=8, config=QdrantCollectionConfig())
+
+        self.assertFalse(database.initialize_collection())
+
+    def test_from_env(self):
+        environ = {"QDRANT_HNSW_M": "8", "QDRANT_VECTORS_ON_DISK": "1",
+                   "QDRANT_PAYLOAD_INDEXES": "category:keyword, complexity_score:integer"}
+        with mock.patch.dict(os.environ, environ):
+            config = QdrantCollectionConfig.from_env()
+
+        self.assertEqual(config.hnsw_m, 8)
+        self.assertTrue(config.vectors_on_disk)
+        self.assertEqual(config.payload_indexes, {"category": "keyword", "complexity_score": "integer"})
+        self.assertEqual(QdrantCollectionConfig().payload_indexes, PAYLOAD_INDEXES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for Workflow Routes
+Šis modulis testē workflow meklēšanas API ar Flask testa klientu.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+from flask import Flask
+
+# Pievieno repozitorija sakni Python path, lai strādātu `src.*` imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.lexical_index import LexicalIndex
+from src.local_vector_index import LocalVectorIndex
+from src.vector_database_design import WorkflowVectorizer, index_workflows
+from src.workflow_blob_store import WorkflowBlobStore
+from src.workflow_search_algorithm import NaturalLanguageProcessor, WorkflowSearchEngine
+from test_lexical_index import WORKFLOWS, CountingBackend
+
+try:
+    from src.routes import workflow as workflow_routes
+    ROUTES_IMPORT_ERROR = None
+except SyntaxError as e:  # maršruti importē src.multilingual_support
+    workflow_routes = None
+    ROUTES_IMPORT_ERROR = f"src.routes.workflow nav importējams: {e}"
+
+
+@unittest.skipIf(workflow_routes is None, ROUTES_IMPORT_ERROR)
+class WorkflowRoutesTestCase(unittest.TestCase):
+    """Kopīgs iestatījums: meklēšanas dzinējs virs lokālā indeksa un Flask lietotne"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.backend = CountingBackend()
+        vectorizer = WorkflowVectorizer(None, backend=self.backend)
+        index = LocalVectorIndex(None, vector_size=256,
+                                 blob_store=WorkflowBlobStore(os.path.join(self.tmpdir.name, "blobs")))
+        lexical_index = LexicalIndex(None)
+        index_workflows(WORKFLOWS, vectorizer, index, lexical_index=lexical_index)
+        self.engine = WorkflowSearchEngine(index, vectorizer, NaturalLanguageProcessor(None),
+                                           lexical_index=lexical_index)
+        self.addCleanup(self.engine.close)
+
+        # initialize_components neko nedara, kad komponenti jau ir iestatīti
+        patcher = mock.patch.multiple(workflow_routes, _node_db=mock.sentinel.node_db,
+                                      _search_engine=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = Flask(__name__)
+        app.register_blueprint(workflow_routes.workflow_bp, url_prefix='/api/workflow')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class TestSearchStream(WorkflowRoutesTestCase):
+    """Testē /search/stream formātus un notikumu secību"""
+
+    def read_ndjson(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def read_sse(self, response):
+        events = []
+        for block in response.get_data(as_text=True).split("\n\n"):
+            if not block:
+                continue
+            lines = block.split("\n")
+            self.assertTrue(lines[0].startswith("event: "), block)
+            self.assertTrue(lines[1].startswith("data: "), block)
+            events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+        return events
+
+    def test_ndjson_event_order(self):
+        response = self.client.post('/api/workflow/search/stream',
+                                    json={"query": "telegram bots", "max_results": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        events = self.read_ndjson(response)
+        self.assertEqual([event["event"] for event in events],
+                         ["hits"] + ["workflow"] * events[0]["results_count"] + ["done"])
+        hits = events[0]["results"]
+        self.assertEqual(hits[0]["workflow_name"], "Telegram bots")
+        self.assertNotIn("workflow_json", hits[0])
+        self.assertEqual([event["workflow_id"] for event in events[1:-1]], [hit["workflow_id"] for hit in hits])
+        self.assertEqual(events[1]["workflow_json"]["name"], "Telegram bots")
+        self.assertIn("hydrate", events[-1]["timings"])
+
+    def test_sse_from_accept_header(self):
+        response = self.client.post('/api/workflow/search/stream', json={"query": "telegram bots"},
+                                    headers={"Accept": "text/event-stream"})
+
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = self.read_sse(response)
+        self.assertEqual(events[0][0], "hits")
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual({name for name, _ in events[1:-1]}, {"workflow"})
+        self.assertEqual(len(events), events[0][1]["results_count"] + 2)
+
+    def test_format_parameter_overrides_accept(self):
+        response = self.client.post('/api/workflow/search/stream',
+                                    json={"query": "telegram bots", "format": "ndjson"},
+                                    headers={"Accept": "text/event-stream"})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(self.read_ndjson(response)[0]["event"], "hits")
+
+        response = self.client.post('/api/workflow/search/stream', json={"query": "telegram bots", "format": "sse"})
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual(self.read_sse(response)[0][0], "hits")
+
+    def test_invalid_requests(self):
+        response = self.client.post('/api/workflow/search/stream', json={"query": "telegram", "format": "xml"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("xml", response.get_json()["error"])
+
+        response = self.client.post('/api/workflow/search/stream', json={"format": "sse"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestSearchBatch(WorkflowRoutesTestCase):
+    """Testē /search/batch validāciju un atbildes formu"""
+
+    def test_results_per_query(self):
+        queries = ["telegram bots", "google sheets", "telegram bots"]
+        self.backend.calls = 0
+        response = self.client.post('/api/workflow/search/batch', json={"queries": queries, "max_results": 2})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["queries_count"], len(queries))
+        self.assertEqual([entry["query"] for entry in data["results"]], queries)
+        for entry in data["results"]:
+            self.assertEqual(set(entry), {"query", "results_count", "results"})
+            self.assertEqual(entry["results_count"], len(entry["results"]))
+            self.assertLessEqual(entry["results_count"], 2)
+            self.assertIn("workflow_json", entry["results"][0])
+        self.assertEqual(data["results"][0]["results"][0]["workflow_name"], "Telegram bots")
+        self.assertEqual(data["results"][0]["results"], data["results"][2]["results"])
+        self.assertIn("embedding", data["timings"])
+        self.assertEqual(self.backend.calls, 1)
+
+    def test_invalid_queries(self):
+        too_many = ["telegram"] * (workflow_routes.MAX_BATCH_QUERIES + 1)
+        for body in ({}, {"queries": "telegram bots"}, {"queries": []},
+                     {"queries": ["telegram", 3]}, {"queries": too_many}):
+            with self.subTest(body=str(body)[:60]):
+                response = self.client.post('/api/workflow/search/batch', json=body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.get_json())
+        self.assertIn(str(workflow_routes.MAX_BATCH_QUERIES), response.get_json()["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()